@@ -602,7 +602,9 @@ class TlmMonitor(gevent.Greenlet):
                     log.error(f"Skipping packet with id {message[0]}")
                     continue
 
-                pkt = tlm.Packet(defn=self._defns[message[0]], data=message[1])
+                pkt = tlm.Packet(
+                    defn=self._defns[message[0]], data=message[1], copy=False
+                )
 
                 pkt_name = pkt._defn.name
                 if pkt_name in self._pktbufs:
@@ -617,9 +619,10 @@ class TlmMonitor(gevent.Greenlet):
 class Instrument(object):
     def __init__(self, cmdport=None, packets=None):
         """"""
-        tlmdict = tlm.getDefaultDict()
+        registry = tlm.getDefaultRegistry()
+        tlmdict = registry.tlmdict
         if packets is None:
-            packets = list(tlmdict.keys())
+            defns = registry
         else:
             if not isinstance(packets, collections.abc.Iterable):
                 packets = [packets]
@@ -632,9 +635,7 @@ class Instrument(object):
                     )
                 else:
                     cln_pkts.append(pkt)
-            packets = cln_pkts
-
-        defns = {tlmdict[k].uid: tlmdict[k] for k in packets}
+            defns = {tlmdict[k].uid: tlmdict[k] for k in cln_pkts}
 
         if len(defns.keys()) == 0:
             msg = (
@@ -16,7 +16,6 @@
 Inserts telemetry into a database from one or more PCAP files.
 """
 import argparse
-import os
 import struct
 
 import ait
@@ -66,6 +65,11 @@ def main():
                 "PCAP header)."
             ),
         },
+        "--batch-size": {
+            "type": int,
+            "default": 1000,
+            "help": "Number of packets to insert per database transaction",
+        },
         "file": {"nargs": "+", "help": "File(s) containing telemetry packets"},
     }
 
@@ -86,12 +90,7 @@ def main():
         elif args.backend == "influx":
             dbconn = db.InfluxDBBackend()
 
-        if args.backend == "sqlite" and (
-            args.database == ":memory:" or not os.path.exists(args.database)
-        ):
-            dbconn.create(database=args.database)
-        else:
-            dbconn.connect(database=args.database)
+        dbconn.connect(database=args.database, batch_size=args.batch_size)
 
         for filename in args.file:
             log.info("Processing %s" % filename)
@@ -116,7 +115,8 @@ def main():
         log.error(str(e))
 
     finally:
-        dbconn.close()
+        if dbconn:
+            dbconn.close()
 
     values = npackets, args.packet, args.database
     log.info("Inserted %d %s packets into database %s." % values)
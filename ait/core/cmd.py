@@ -20,7 +20,6 @@ Dictionaries contain command and argument definitions.
 import os
 import struct
 from importlib.resources import files
-from io import IOBase
 
 import yaml
 
@@ -487,18 +486,14 @@ class CmdDict(dict):
         if self.filename is None:
             if os.path.isfile(content):
                 self.filename = content
-                stream = open(self.filename, "rb")
+                cmds = util.load_yaml(self.filename)
             else:
-                stream = content
+                cmds = yaml.safe_load(content)
 
-            cmds = yaml.safe_load(stream)
             cmds = handle_includes(cmds)
             for cmd in cmds:
                 self.add(cmd)
 
-            if isinstance(stream, IOBase):
-                stream.close()
-
     def toJSON(self):  # noqa
         return {name: defn.toJSON() for name, defn in self.items()}
 
@@ -16,23 +16,96 @@
 The ait.db module provides a general database storage layer for
 commands and telemetry with several backends.
 """
+
+import collections
 import datetime as dt
+import heapq
 import importlib
 import itertools
 import math
 import os.path
+import queue
 import sqlite3
+import threading
+import weakref
 from abc import ABCMeta
 from abc import abstractmethod
+from time import monotonic
+
+import gevent
+import gevent.event
+import gevent.monkey
+import gevent.threadpool
 
 import ait
 from ait.core import cfg
 from ait.core import cmd
 from ait.core import dmc
+from ait.core import dtype
 from ait.core import evr
 from ait.core import log
 from ait.core import tlm
 
+# Thread primitives safe for threadpool threads even when monkey
+# patched, which replaces queue.Queue with a greenlet-only queue.
+_get_ident = gevent.monkey.get_original("_thread", "get_ident")
+_ThreadQueue = gevent.monkey.get_original("queue", "Queue")
+
+
+class _ThreadChannel:
+    """Passes items from a threadpool thread to a greenlet in the thread
+    that created the channel.
+
+    The thread blocks on a bounded thread queue, and wakes the greenlet
+    through an async watcher on its hub. Exceptions put on the channel
+    are raised by :meth:`get`.
+    """
+
+    def __init__(self, maxsize=2):
+        self._queue = _ThreadQueue(maxsize=maxsize)
+        self._ready = gevent.event.Event()
+        self._watcher = gevent.get_hub().loop.async_()
+        self._watcher.start(self._ready.set)
+        self.stopped = False
+
+    def put(self, item):
+        """Puts item on the channel, blocking while it is full. Called by
+        the thread. Returns False once the channel is stopped.
+        """
+        self._queue.put(item)
+        self._watcher.send()
+        return not self.stopped
+
+    def get(self):
+        """Returns the next item on the channel, waiting for one without
+        blocking other greenlets.
+        """
+        while True:
+            self._ready.clear()
+            try:
+                item = self._queue.get_nowait()
+                break
+            except queue.Empty:
+                self._ready.wait()
+
+        if isinstance(item, Exception):
+            raise item
+
+        return item
+
+    def stop(self):
+        """Stops the channel, unblocking the thread, which should return
+        after its next :meth:`put`.
+        """
+        self.stopped = True
+        self._watcher.stop()
+
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
 
 class AITDBResult:
     """AIT Database result wrapper.
@@ -118,6 +191,57 @@ class AITDBResult:
         )
 
 
+# The summary of the values of a field over one bucket of time, as
+# returned by :meth:`GenericBackend.query_downsampled`. min, max and
+# mean are None if the field has no numeric values in the bucket.
+Bucket = collections.namedtuple(
+    "Bucket", ["min", "max", "mean", "first", "last", "count"]
+)
+
+
+class _BucketStats:
+    """Accumulates the values of one field over one bucket of time."""
+
+    __slots__ = ["count", "first", "last", "max", "min", "numeric", "total"]
+
+    def __init__(self):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.max = None
+        self.min = None
+        self.numeric = 0
+        self.total = 0
+
+    def add(self, value):
+        """Adds a value (in time order) to the bucket. None is ignored."""
+        if value is None:
+            return
+
+        if self.count == 0:
+            self.first = value
+
+        self.last = value
+        self.count += 1
+
+        if isinstance(value, (int, float)) and not (
+            isinstance(value, float) and math.isnan(value)
+        ):
+            if self.numeric == 0:
+                self.min = self.max = value
+            else:
+                self.min = min(self.min, value)
+                self.max = max(self.max, value)
+
+            self.total += value
+            self.numeric += 1
+
+    def bucket(self):
+        """Returns the :data:`Bucket` summarizing the values added."""
+        mean = self.total / self.numeric if self.numeric else None
+        return Bucket(self.min, self.max, mean, self.first, self.last, self.count)
+
+
 class GenericBackend(object):
     """Generic database backend abstraction
 
@@ -156,6 +280,9 @@ class GenericBackend(object):
         insert
             Insert a packet into the database
 
+        flush
+            Write any inserts buffered by the backend to the database
+
         query
             Take a string defining a database query and return the results. The
             format of the results is backend specific.
@@ -163,6 +290,14 @@ class GenericBackend(object):
         query_packets
             Query for packet types with optional filters.
 
+        query_fields
+            Query for the values of individual fields of a packet type
+            over a time range.
+
+        query_downsampled
+            Query for the values of individual fields of a packet type
+            summarized over fixed-width buckets of a time range.
+
         close
             Close the connection to the database instance and handle any cleanup
     """
@@ -195,6 +330,14 @@ class GenericBackend(object):
         """Insert a record into the database."""
         pass
 
+    def flush(self, **kwargs):
+        """Write any buffered inserts to the database instance.
+
+        Backends that write every insert immediately need not override
+        this.
+        """
+        pass
+
     @abstractmethod
     def query(self, query, **kwargs):
         """Query the database instance and return results."""
@@ -210,6 +353,146 @@ class GenericBackend(object):
         """
         pass
 
+    def query_fields(
+        self, packet, fields, start_time=None, end_time=None, raw=False, **kwargs
+    ):
+        """Query the database instance for field values of a packet type
+
+        Return an :class:`AITDBResult` with **results** set to a generator
+        of ``(time, value, ...)`` tuples, one value per name in fields, in
+        time order. Values are engineering units unless raw is True.
+
+        This implementation decodes every packet returned by
+        :meth:`query_packets`. Backends that store fields individually
+        should override it.
+        """
+        res = self.query_packets(
+            packets=[packet],
+            start_time=start_time,
+            end_time=end_time,
+            yield_packet_time=True,
+            **kwargs,
+        )
+        results = (
+            (t, *[pkt._getattr(name, raw=raw) for name in fields])
+            for t, pkt in res.get_packets()
+        )
+
+        return AITDBResult(query=res.query, results=results, errors=res.errors)
+
+    def query_downsampled(
+        self,
+        packet,
+        fields,
+        start_time=None,
+        end_time=None,
+        buckets=None,
+        width=None,
+        raw=False,
+        **kwargs,
+    ):
+        """Query the database instance for field values of a packet type
+        summarized over fixed-width buckets of time
+
+        The time range is divided into either a number of buckets or
+        buckets of a given width. Return an :class:`AITDBResult` with
+        **results** set to a generator of ``(time, Bucket, ...)`` tuples,
+        one :data:`Bucket` per name in fields, for each bucket holding
+        values, in time order. Time is the start of the bucket.
+
+        This implementation summarizes the values returned by
+        :meth:`query_fields`. Backends that can aggregate values
+        themselves should override it.
+
+        Arguments:
+            buckets: The number of buckets to divide the time range into.
+
+            width: The width of each bucket, as a
+                :class:`datetime.timedelta` or seconds. Overrides buckets.
+
+        Raises:
+            ValueError: If neither buckets nor width is given.
+        """
+        start, end, width = self._buckets(start_time, end_time, buckets, width)
+        res = self.query_fields(packet, fields, start, end, raw, **kwargs)
+
+        if res.results is None:
+            return res
+
+        return AITDBResult(
+            query=res.query,
+            results=self._downsample(res.results, start, width),
+            errors=res.errors,
+        )
+
+    @staticmethod
+    def _buckets(start_time, end_time, buckets, width):
+        """Returns the (start, end, width) of the buckets dividing a query
+        time range, with start and end as UTC datetimes defaulting to the
+        GPS Epoch and the current time.
+        """
+        start = dmc.GPS_Epoch if start_time is None else start_time
+        end = dt.datetime.utcnow() if end_time is None else end_time
+        start, end = (
+            t if t.tzinfo else t.replace(tzinfo=dt.timezone.utc) for t in (start, end)
+        )
+
+        if width is not None:
+            if not isinstance(width, dt.timedelta):
+                width = dt.timedelta(seconds=width)
+        elif buckets:
+            width = max((end - start) / buckets, dt.timedelta(microseconds=1))
+        else:
+            msg = "A bucket count or width is required"
+            log.error(msg)
+            raise ValueError(msg)
+
+        if width <= dt.timedelta(0):
+            msg = f"Invalid bucket width {width}"
+            log.error(msg)
+            raise ValueError(msg)
+
+        return start, end, width
+
+    @staticmethod
+    def _downsample(rows, start, width):
+        """Yields a ``(time, Bucket, ...)`` tuple for each bucket of the
+        given time-ordered ``(time, value, ...)`` rows.
+        """
+        index, stats = None, None
+
+        for t, *values in rows:
+            n = (t - start) // width
+
+            if n != index:
+                if stats is not None:
+                    yield (start + index * width, *[s.bucket() for s in stats])
+
+                index, stats = n, [_BucketStats() for _ in values]
+
+            for s, value in zip(stats, values):
+                s.add(value)
+
+        if stats is not None:
+            yield (start + index * width, *[s.bucket() for s in stats])
+
+    @staticmethod
+    def _time_range(start_time, end_time):
+        """Returns the (start, end) query time range as RFC3339 strings,
+        defaulting to the GPS Epoch and the current UTC time.
+        """
+        if start_time is not None:
+            stime = start_time.strftime(dmc.RFC3339_Format)
+        else:
+            stime = dmc.GPS_Epoch.strftime(dmc.RFC3339_Format)
+
+        if end_time is not None:
+            etime = end_time.strftime(dmc.RFC3339_Format)
+        else:
+            etime = dt.datetime.utcnow().strftime(dmc.RFC3339_Format)
+
+        return stime, etime
+
     @classmethod
     @abstractmethod
     def create_packet_from_result(cls, packet_name, result):
@@ -247,6 +530,39 @@ class InfluxDBBackend(GenericBackend):
     def __init__(self):
         """"""
         super(InfluxDBBackend, self).__init__()
+        self._batch_size = 1
+        self._batch_bytes = 1000000
+        self._flush_interval = 1.0
+        self._max_pending = 100000
+        self._retries = 3
+        self._retry_delay = 0.5
+        self._points = collections.deque()
+        self._points_bytes = 0
+        self._points_start = None
+        self._dropped = 0
+        self._points_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._writer = None
+
+    @property
+    def pending(self):
+        """The number of inserted points not yet written to InfluxDB"""
+        return len(self._points)
+
+    @property
+    def dropped(self):
+        """The number of inserted points discarded without being written"""
+        return self._dropped
+
+    @property
+    def background_flush(self):
+        """True if buffered points are written by the background writer,
+        at least every flush interval, so :meth:`flush` need not be
+        called periodically.
+        """
+        return self._writer is not None
 
     def connect(self, **kwargs):
         """Connect to an InfluxDB instance
@@ -280,6 +596,40 @@ class InfluxDBBackend(GenericBackend):
           The database name for the connection. Passed as either
           the config key **database.dbname** or the kwargs argument
           **database**. Defaults to **ait**.
+
+        batch size, batch bytes
+          The number of points, and approximate size in bytes of their
+          fields, to buffer before writing them to InfluxDB in a single
+          request. Passed as either the config keys
+          **database.batch_size** and **database.batch_bytes** or the
+          kwargs arguments of the same name. Default to **1**, i.e. each
+          insert is written immediately, and **1000000**.
+
+        flush interval
+          The maximum number of seconds a point may remain buffered
+          before it is written. Passed as either the config key
+          **database.flush_interval** or the kwargs argument
+          **flush_interval**. Defaults to **1.0**.
+
+        max pending
+          The maximum number of points to buffer while writes are
+          failing. The oldest points are dropped beyond this. Passed as
+          either the config key **database.max_pending** or the kwargs
+          argument **max_pending**. Defaults to **100000**.
+
+        retries, retry delay
+          The number of times a failed write is retried, and the delay
+          in seconds before the first retry, doubled for each one after.
+          Passed as either the config keys **database.retries** and
+          **database.retry_delay** or the kwargs arguments of the same
+          name. Default to **3** and **0.5**.
+
+        When batch size is greater than one, inserts only buffer points
+        and a background writer sends them, so inserting is not slowed
+        by the round trip to InfluxDB. Buffered points are written on
+        :meth:`flush` and :meth:`close`. :attr:`pending` and
+        :attr:`dropped` count the points waiting to be written and the
+        points discarded after failed writes.
         """
         host = kwargs.get("host", ait.config.get("database.host", "localhost"))
         port = kwargs.get("port", ait.config.get("database.port", 8086))
@@ -287,6 +637,17 @@ class InfluxDBBackend(GenericBackend):
         pw = kwargs.get("pw", ait.config.get("database.pw", "root"))
         dbname = kwargs.get("database", ait.config.get("database.dbname", "ait"))
 
+        for name, default in (
+            ("batch_size", 1),
+            ("batch_bytes", 1000000),
+            ("flush_interval", 1.0),
+            ("max_pending", 100000),
+            ("retries", 3),
+            ("retry_delay", 0.5),
+        ):
+            value = kwargs.get(name, ait.config.get(f"database.{name}", default))
+            setattr(self, f"_{name}", value)
+
         self._conn = self._backend.InfluxDBClient(host, port, un, pw)
 
         if dbname not in [v["name"] for v in self._conn.get_list_database()]:
@@ -294,6 +655,11 @@ class InfluxDBBackend(GenericBackend):
 
         self._conn.switch_database(dbname)
 
+        if self._batch_size > 1 and self._writer is None:
+            self._closed.clear()
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
     def create(self, **kwargs):
         """Create a database in a connected InfluxDB instance
 
@@ -330,7 +696,9 @@ class InfluxDBBackend(GenericBackend):
                 Optional parameter specifying the time value to use when inserting
                 the record into the database. Default case does not provide a time
                 value so Influx defaults to the current time when inserting the
-                record.
+                record. Buffered points are instead stamped with the current UTC
+                time when buffered, so points written in one batch keep distinct
+                times.
 
             tags
                 Optional kwargs argument for specifying a dictionary of tags to
@@ -339,9 +707,10 @@ class InfluxDBBackend(GenericBackend):
         """
         fields = {}
         pd = packet._defn
+        raw = pd.decode_all(packet._data, raw=True, packet=packet)
 
         for defn in pd.fields:
-            val = getattr(packet.raw, defn.name)
+            val = raw[defn.name]
 
             if pd.history and defn.name in pd.history:
                 val = getattr(packet.history, defn.name)
@@ -355,6 +724,9 @@ class InfluxDBBackend(GenericBackend):
 
         tags = kwargs.get("tags", {})
 
+        if time is None and self._batch_size > 1:
+            time = dt.datetime.utcnow()
+
         if isinstance(time, dt.datetime):
             # time = time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
             time = time.strftime(dmc.RFC3339_Format)
@@ -364,7 +736,91 @@ class InfluxDBBackend(GenericBackend):
         if time:
             data["time"] = time
 
-        self._conn.write_points([data])
+        if self._batch_size <= 1:
+            self._conn.write_points([data])
+            return
+
+        size = len(pd.name) + sum(len(k) + len(str(v)) + 2 for k, v in fields.items())
+
+        with self._points_lock:
+            if not self._points:
+                self._points_start = monotonic()
+
+            self._points.append(data)
+            self._points_bytes += size
+
+            if len(self._points) > self._max_pending:
+                self._points.popleft()
+                self._dropped += 1
+
+            full = (
+                len(self._points) >= self._batch_size
+                or self._points_bytes >= self._batch_bytes
+                or monotonic() - self._points_start >= self._flush_interval
+            )
+
+        if full:
+            if self._writer is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def flush(self, **kwargs):
+        """Write all buffered points to InfluxDB
+
+        Points are written in requests of at most batch size points.
+        Writes that fail are retried with exponential backoff. Points
+        that still cannot be written, or that InfluxDB rejects as
+        invalid, are dropped and counted in :attr:`dropped`.
+        """
+        with self._flush_lock:
+            with self._points_lock:
+                self._points_bytes = 0
+                self._points_start = monotonic()
+
+            while True:
+                with self._points_lock:
+                    count = min(len(self._points), max(self._batch_size, 1))
+                    points = [self._points.popleft() for _ in range(count)]
+
+                if not points:
+                    break
+
+                self._write(points)
+
+    def _write(self, points):
+        """Write points to InfluxDB, retrying failed requests"""
+        delay = self._retry_delay
+
+        for attempt in itertools.count():
+            try:
+                self._conn.write_points(points)
+                return
+            except self._backend.exceptions.InfluxDBClientError as e:
+                # Requests InfluxDB rejects will be rejected again.
+                error = e
+                break
+            except Exception as e:
+                error = e
+                if attempt >= self._retries:
+                    break
+
+                log.warn(f"db.InfluxDBBackend write failed, retrying: {e}")
+                # Not gevent.sleep, as this may run in the writer thread.
+                # Returns early on close.
+                self._closed.wait(delay)
+                delay *= 2
+
+        self._dropped += len(points)
+        log.error(f"db.InfluxDBBackend dropped {len(points)} points: {error}")
+
+    def _write_loop(self):
+        """Write buffered points whenever a batch fills or the flush
+        interval elapses, until closed."""
+        while not self._closed.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
 
     def _query(self, query, **kwargs):
         """Query the database and return results
@@ -503,9 +959,242 @@ class InfluxDBBackend(GenericBackend):
             query=query_string, packets=influx_results_gen(db_res, **kwargs)
         )
 
+    def query_fields(
+        self, packet, fields, start_time=None, end_time=None, raw=False, **kwargs
+    ):
+        """Query the database for field values of a packet type over a
+        time range.
+
+        Field values are read directly from the query results without
+        creating packets, so only the requested fields are selected.
+        Engineering units values of fields with DN to EU conversions,
+        and derivations, are computed from a packet created from the
+        result row, and require all of its fields to be selected.
+
+        Results are read in pages of ``fetch_size`` rows, with one query
+        per page starting at the last time read, so large time ranges are
+        not held in memory at once.
+
+        Arguments:
+            packet: The packet name to query.
+
+            fields: An iterable of the field (or derivation) names to
+                query.
+
+            start_time: A :class:`datetime.datetime` object defining the query time
+                range start inclusively. (default: The start of the GPS time Epoch)
+
+            end_time: A :class:`datetime.datetime` object defining the query time
+                range end inclusively. (default: The current UTC Zulu time).
+
+            raw: If True, raw field values are returned instead of
+                engineering units. (default: False)
+
+        Additional Keyword Arguments:
+            fetch_size: The number of rows read per query. (default: 10000)
+
+        Returns:
+            An :class:`AITDBResult` with **results** set to a generator of
+                ``(time, value, ...)`` tuples in time order. Otherwise,
+                **errors** will contain any encountered errors.
+
+        Raises:
+            ValueError: If the packet type or a field name cannot be
+                located in the telemetry dictionary.
+        """
+        pkt_defn = tlm.getDefaultRegistry().by_name(packet)
+
+        if pkt_defn is None:
+            msg = f'Invalid packet name "{packet}" provided'
+            log.error(msg)
+            raise ValueError(msg)
+
+        # For each name, its definition and whether its value must be
+        # computed from a packet rather than read from the result row.
+        defns = []
+
+        for name in fields:
+            if name in pkt_defn.fieldmap:
+                defn = pkt_defn.fieldmap[name]
+                converted = defn.dntoeu is not None or defn.expr is not None
+                defns.append((defn, converted and not raw))
+            elif name in pkt_defn.derivationmap:
+                defns.append((pkt_defn.derivationmap[name], True))
+            else:
+                msg = f'Invalid field name "{name}" provided for packet "{packet}"'
+                log.error(msg)
+                raise ValueError(msg)
+
+        computed = any(c for _, c in defns)
+        stime, etime = self._time_range(start_time, end_time)
+        fetch_size = kwargs.pop("fetch_size", 10000)
+        selected = "*" if computed else ", ".join(f'"{d.name}"' for d, _ in defns)
+
+        def page_query(start, limit=fetch_size):
+            return (
+                f'SELECT {selected} FROM "{packet}" '
+                f"WHERE time {start} AND time <= '{etime}' "
+                f"ORDER BY time ASC LIMIT {limit}"
+            )
+
+        query = page_query(f">= '{stime}'")
+
+        try:
+            points = list(self._query(query, **kwargs).get_points(measurement=packet))
+        except self._backend.exceptions.InfluxDBClientError as e:
+            log.error(f"db.InfluxDBBackend.query failed with exception: {e}")
+            return AITDBResult(query=query, errors=[str(e)])
+
+        def value(point, pkt, defn, compute):
+            if compute:
+                return pkt._getattr(defn.name, raw=raw)
+
+            val = point.get(defn.name)
+
+            if not raw and val is not None and defn.enum is not None:
+                val = defn.enum.get(val, val)
+
+            return val
+
+        def influx_fields_gen(points):
+            skip = 0
+
+            while points:
+                # Each page starts at the last time read, rather than at an
+                # OFFSET, which Influx would scan from the range start.
+                # Series with different tags may share that time, so the
+                # points already read at it are skipped.
+                last = points[-1]["time"]
+                seen = sum(1 for point in points if point["time"] == last)
+
+                for point in points[skip:]:
+                    pkt = None
+                    if computed:
+                        pkt = InfluxDBBackend.create_packet_from_result(pkt_defn, point)
+
+                    yield (
+                        dmc.rfc3339_str_to_datetime(point["time"]),
+                        *[value(point, pkt, d, c) for d, c in defns],
+                    )
+
+                if len(points) < fetch_size + skip:
+                    break
+
+                skip = seen
+                page = self._query(
+                    page_query(f">= '{last}'", fetch_size + skip), **kwargs
+                )
+                points = list(page.get_points(measurement=packet))
+
+        return AITDBResult(query=query, results=influx_fields_gen(points))
+
+    def query_downsampled(
+        self,
+        packet,
+        fields,
+        start_time=None,
+        end_time=None,
+        buckets=None,
+        width=None,
+        raw=False,
+        **kwargs,
+    ):
+        """Query the database for field values of a packet type
+        summarized over fixed-width buckets of time.
+
+        If the requested values are stored by InfluxDB, i.e. they are raw
+        or the fields have no DN to EU conversion or enumeration, the
+        buckets are computed by InfluxDB with a ``GROUP BY time()``
+        query. Otherwise values are summarized as in
+        :meth:`GenericBackend.query_downsampled`.
+
+        Arguments:
+            buckets: The number of buckets to divide the time range into.
+
+            width: The width of each bucket, as a
+                :class:`datetime.timedelta` or seconds. Overrides buckets.
+
+        Returns:
+            An :class:`AITDBResult` with **results** set to a generator of
+                ``(time, Bucket, ...)`` tuples in time order. Otherwise,
+                **errors** will contain any encountered errors.
+
+        Raises:
+            ValueError: If the packet type name cannot be located in the
+                telemetry dictionary, or neither buckets nor width is
+                given.
+        """
+        pkt_defn = tlm.getDefaultRegistry().by_name(packet)
+
+        if pkt_defn is None:
+            msg = f'Invalid packet name "{packet}" provided'
+            log.error(msg)
+            raise ValueError(msg)
+
+        start, end, width = self._buckets(start_time, end_time, buckets, width)
+        fields = list(fields)
+        stored = all(
+            name in pkt_defn.fieldmap
+            and (
+                raw
+                or (
+                    pkt_defn.fieldmap[name].dntoeu is None
+                    and pkt_defn.fieldmap[name].expr is None
+                    and pkt_defn.fieldmap[name].enum is None
+                )
+            )
+            for name in fields
+        )
+
+        if not stored:
+            return super(InfluxDBBackend, self).query_downsampled(
+                packet, fields, start, end, width=width, raw=raw, **kwargs
+            )
+
+        stime, etime = self._time_range(start, end)
+        epoch = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+        micros = max(width // dt.timedelta(microseconds=1), 1)
+        offset = (start - epoch) // dt.timedelta(microseconds=1) % micros
+        aggregates = ["min", "max", "mean", "first", "last", "count"]
+        selected = ", ".join(
+            f'{agg}("{name}") AS "{name}_{agg}"'
+            for name in fields
+            for agg in aggregates
+        )
+        query = (
+            f'SELECT {selected} FROM "{packet}" '
+            f"WHERE time >= '{stime}' AND time <= '{etime}' "
+            f"GROUP BY time({micros}u, {offset}u) fill(none)"
+        )
+
+        try:
+            db_res = self._query(query, epoch="u", **kwargs)
+        except self._backend.exceptions.InfluxDBClientError as e:
+            log.error(f"db.InfluxDBBackend.query failed with exception: {e}")
+            return AITDBResult(query=query, errors=[str(e)])
+
+        def influx_buckets_gen(db_res):
+            for point in db_res.get_points(measurement=packet):
+                yield (
+                    epoch + dt.timedelta(microseconds=point["time"]),
+                    *[
+                        Bucket(*[point.get(f"{name}_{agg}") for agg in aggregates])
+                        for name in fields
+                    ],
+                )
+
+        return AITDBResult(query=query, results=influx_buckets_gen(db_res))
+
     def close(self, **kwargs):
-        """Close the database connection"""
+        """Write any buffered points and close the database connection"""
+        if self._writer is not None:
+            self._closed.set()
+            self._wake.set()
+            self._writer.join()
+            self._writer = None
+
         if self._conn:
+            self.flush()
             self._conn.close()
 
     @ait.deprecated(  # type: ignore
@@ -579,9 +1268,8 @@ class InfluxDBBackend(GenericBackend):
             as the default value in the Packet or set to None if it's a CMD / EVR type.
         """
         if isinstance(packet_id, str):
-            try:
-                pkt_defn = tlm.getDefaultDict()[packet_id]
-            except KeyError:
+            pkt_defn = tlm.getDefaultRegistry().by_name(packet_id)
+            if pkt_defn is None:
                 log.error(f"Unknown packet name {packet_id} Unable to unpack ResultSet")
                 return None
         elif isinstance(packet_id, tlm.PacketDefinition):
@@ -637,10 +1325,19 @@ class InfluxDBBackend(GenericBackend):
 class SQLiteBackend(GenericBackend):
     _backend = "sqlite3"
     _conn = None
+    _column_types = {"int": "INTEGER", "float": "REAL", "str": "TEXT"}
 
     def __init__(self):
         """"""
         super(SQLiteBackend, self).__init__()
+        self._batch_size = 1
+        self._flush_interval = 1.0
+        self._buffer = {}
+        self._buffered = 0
+        self._buffer_start = None
+        self._schema = "blob"
+        self._eu_columns = False
+        self._columns = {}
 
     def connect(self, **kwargs):
         """Connect to a SQLite instance
@@ -652,14 +1349,95 @@ class SQLiteBackend(GenericBackend):
           The database name of file to "connect" to. Passed as either
           the config key **database.dbname** or the kwargs argument
           **database**. Defaults to **ait.db**.
+
+        batch size
+          The maximum number of inserts to buffer in memory before
+          writing them to the database in a single transaction. Passed
+          as either the config key **database.batch_size** or the
+          kwargs argument **batch_size**. Defaults to **1**, i.e. each
+          insert is committed immediately.
+
+        flush interval
+          The maximum number of seconds an insert may remain buffered
+          before the buffer is written, checked on each insert. Passed
+          as either the config key **database.flush_interval** or the
+          kwargs argument **flush_interval**. Defaults to **1.0**.
+          Together with batch size this bounds the data lost on a crash.
+
+        journal mode, synchronous
+          The SQLite ``journal_mode`` and ``synchronous`` pragmas set on
+          connect. Passed as either the config keys
+          **database.journal_mode** and **database.synchronous** or the
+          kwargs arguments of the same name. Default to **WAL** and
+          **NORMAL**.
+
+        schema
+          The layout of packet tables created by :meth:`create`. Passed
+          as either the config key **database.schema** or the kwargs
+          argument **schema**. Either **blob**, storing only the packet
+          data, or **columns**, additionally storing the raw value of
+          each field in its own column (named for the field) so
+          :meth:`query_fields` can read single fields without decoding
+          packets. Defaults to **blob**.
+
+        eu columns
+          If True, the **columns** schema also stores the engineering
+          units value of each non-array field in a column named
+          ``<field>.eu``. Passed as either the config key
+          **database.eu_columns** or the kwargs argument **eu_columns**.
+          Defaults to **False**.
+
+        Connections also provide two deterministic SQL functions for
+        decoding fields from stored packet data, so queries can filter
+        on field values and tables can have expression indexes:
+
+          ``ait_field(packet_name, PKTDATA, field_name)``
+            The engineering units value of the field (or derivation).
+
+          ``ait_raw(packet_name, PKTDATA, field_name)``
+            The raw value of the field (or derivation).
+
+        Both return NULL for an unknown packet or field name, or data
+        that cannot be decoded. Array fields return their raw bytes and
+        times are returned as RFC3339 strings. For example::
+
+            SELECT time FROM "1553_HS_Packet"
+            WHERE ait_field('1553_HS_Packet', PKTDATA, 'Voltage_A') > 10
         """
 
         dbname = kwargs.get("database", ait.config.get("database.dbname", "ait.db"))
         db_exists = os.path.isfile(dbname)
 
+        self._batch_size = kwargs.get(
+            "batch_size", ait.config.get("database.batch_size", 1)
+        )
+        self._flush_interval = kwargs.get(
+            "flush_interval", ait.config.get("database.flush_interval", 1.0)
+        )
+        journal_mode = kwargs.get(
+            "journal_mode", ait.config.get("database.journal_mode", "WAL")
+        )
+        synchronous = kwargs.get(
+            "synchronous", ait.config.get("database.synchronous", "NORMAL")
+        )
+        self._schema = kwargs.get("schema", ait.config.get("database.schema", "blob"))
+        self._eu_columns = kwargs.get(
+            "eu_columns", ait.config.get("database.eu_columns", False)
+        )
+
+        if self._schema not in ("blob", "columns"):
+            msg = f'Unknown database.schema "{self._schema}"'
+            raise cfg.AitConfigError(msg)
+
         self._conn = self._backend.connect(dbname)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._create_functions()
+
         if not db_exists:
             self.create()
+        else:
+            self._create_indexes()
 
     def create(self, **kwargs):
         """Create packet tables in the connected database
@@ -684,12 +1462,159 @@ class SQLiteBackend(GenericBackend):
                 should be made.
         """
         time_def = "time DATETIME DEFAULT(STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')), "
+        column_defs = "".join(
+            f', "{column}" {decl}'.rstrip()
+            for column, decl, _, _ in self._field_columns(packet_defn)
+        )
         sql = 'CREATE TABLE IF NOT EXISTS "%s" (%s)' % (
             packet_defn.name,
-            time_def + "PKTDATA BLOB NOT NULL",
+            time_def + "PKTDATA BLOB NOT NULL" + column_defs,
         )
 
         self._conn.execute(sql)
+        self._create_index(packet_defn.name)
+        self._conn.commit()
+
+    def _field_columns(self, packet_defn):
+        """Returns a list of (column name, declared type, field
+        definition, eu) for the field columns of the given
+        PacketDefinition, which is empty unless the **columns** schema
+        is in use.
+        """
+        if self._schema != "columns":
+            return []
+
+        columns = self._columns.get(packet_defn.name)
+
+        if columns is None or columns[0] is not packet_defn:
+            fields = []
+
+            for defn in packet_defn.fields:
+                ftype = defn.type
+                if isinstance(ftype, dtype.ArrayType):
+                    fields.append((defn.name, "BLOB", defn, False))
+                    continue
+
+                # Complex types (e.g. TIME64) decode raw values of a
+                # different kind than their struct, so are left untyped.
+                decl = ""
+                if getattr(ftype, "_plain", False):
+                    decl = SQLiteBackend._column_types.get(ftype._kind, "")
+
+                fields.append((defn.name, decl, defn, False))
+                if self._eu_columns:
+                    fields.append((defn.name + ".eu", "", defn, True))
+
+            columns = self._columns[packet_defn.name] = packet_defn, fields
+
+        return columns[1]
+
+    @staticmethod
+    def _column_value(packet, defn, eu):
+        """Returns the value of the given field of packet as stored in
+        its column.
+        """
+        if not eu and isinstance(defn.type, dtype.ArrayType):
+            return bytes(packet._data[defn.slice()])
+
+        return SQLiteBackend._sql_value(packet._getattr(defn.name, raw=not eu))
+
+    def _create_functions(self):
+        """Registers the ait_field() and ait_raw() SQL functions with the
+        connection.  See :meth:`connect`.
+        """
+        decoders = {}
+
+        def field_value(packet_name, data, name, raw):
+            key = packet_name, name, raw
+            decoder = decoders.get(key)
+
+            if decoder is None or decoder[0] is not registry.by_name(packet_name):
+                decoder = decoders[key] = self._field_decoder(packet_name, name, raw)
+
+            if decoder[1] is None or data is None:
+                return None
+
+            # An exception would abort the whole query, so rows that
+            # cannot be decoded (e.g. truncated data) yield NULL instead.
+            try:
+                value = decoder[1](data)
+            except Exception:
+                return None
+
+            return self._sql_value(value)
+
+        registry = tlm.getDefaultRegistry()
+        self._conn.create_function(
+            "ait_field",
+            3,
+            lambda packet_name, data, name: field_value(packet_name, data, name, False),
+            deterministic=True,
+        )
+        self._conn.create_function(
+            "ait_raw",
+            3,
+            lambda packet_name, data, name: field_value(packet_name, data, name, True),
+            deterministic=True,
+        )
+
+    @staticmethod
+    def _field_decoder(packet_name, name, raw):
+        """Returns (PacketDefinition, decode) for the given packet and
+        field or derivation name, where decode(data) returns the field
+        value or is None if the packet or field is unknown.
+        """
+        packet_defn = tlm.getDefaultRegistry().by_name(packet_name)
+        if packet_defn is None:
+            return None, None
+
+        defn = packet_defn.fieldmap.get(name)
+
+        if defn is not None and isinstance(defn.type, dtype.ArrayType):
+            indices = defn.slice()
+            return packet_defn, lambda data: bytes(data[indices])
+        elif (
+            defn is not None
+            and defn.when is None
+            and (raw or (defn.dntoeu is None and defn.expr is None))
+        ):
+            return packet_defn, lambda data: defn.decode(data, raw)
+        elif defn is not None or name in packet_defn.derivationmap:
+            context = packet_defn.decoder._context
+            return packet_defn, lambda data: context(data)._getattr(name, raw)
+
+        return packet_defn, None
+
+    @staticmethod
+    def _sql_value(value):
+        """Returns value as a type SQLite can store."""
+        if value is None or isinstance(value, (int, float, str, bytes)):
+            return value
+        elif isinstance(value, dt.datetime):
+            return value.strftime(dmc.RFC3339_Format)
+        else:
+            return str(value)
+
+    def _create_index(self, table):
+        """Creates an index on the time column of the given table."""
+        self._conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_time" ON "{table}" (time)'
+        )
+
+    def _create_indexes(self):
+        """Creates any missing time indexes on the packet tables of an
+        existing database.  Tables created before time indexes were
+        added are migrated on connect.
+        """
+        tables = self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+        tlmdict = tlm.getDefaultDict()
+
+        for (table,) in list(tables):
+            if table in tlmdict:
+                self._create_index(table)
+
         self._conn.commit()
 
     def insert(self, packet, time=None, **kwargs):
@@ -700,23 +1625,74 @@ class SQLiteBackend(GenericBackend):
                 The :class:`ait.core.tlm.Packet` instance to insert into
                 the database
 
+        If a batch size greater than one was given to :meth:`connect`
+        the insert is buffered and written by :meth:`flush`, which is
+        called once the buffer is full or its oldest insert is older
+        than the flush interval.
+
+        Buffered inserts without a time are stamped with the current
+        UTC time when buffered, rather than when written.
         """
+        if time is None and self._batch_size > 1:
+            time = dt.datetime.utcnow()
         if isinstance(time, dt.datetime):
             time = time.strftime(dmc.RFC3339_Format)
 
-        sql = (
-            f'INSERT INTO "{packet._defn.name}" (PKTDATA, time) VALUES (?, ?)'
-            if time
-            else f'INSERT INTO "{packet._defn.name}" (PKTDATA) VALUES (?)'
-        )
-        values = (
-            (sqlite3.Binary(packet._data), time)
-            if time
-            else (sqlite3.Binary(packet._data))
-        )
+        # Buffered rows outlive this call, so snapshot data that may be a
+        # mutable buffer (e.g. of a Packet created with copy=False).
+        if self._batch_size > 1:
+            data = bytes(packet._data)
+        else:
+            data = sqlite3.Binary(packet._data)
 
-        self._conn.execute(sql, values)
-        self._conn.commit()
+        columns = "PKTDATA, time" if time else "PKTDATA"
+        values = (data, time) if time else (data,)
+
+        for column, _, defn, eu in self._field_columns(packet._defn):
+            columns += f', "{column}"'
+            values += (self._column_value(packet, defn, eu),)
+
+        params = ", ".join("?" * len(values))
+        sql = f'INSERT INTO "{packet._defn.name}" ({columns}) VALUES ({params})'
+
+        if self._batch_size <= 1:
+            self._conn.execute(sql, values)
+            self._conn.commit()
+            return
+
+        if self._buffered == 0:
+            self._buffer_start = monotonic()
+
+        self._buffer.setdefault(sql, []).append(values)
+        self._buffered += 1
+
+        if (
+            self._buffered >= self._batch_size
+            or monotonic() - self._buffer_start >= self._flush_interval
+        ):
+            self.flush()
+
+    def flush(self, **kwargs):
+        """Write all buffered inserts to the database in a single
+        transaction.
+
+        If the transaction fails it is rolled back and the buffered
+        inserts are discarded.
+        """
+        if self._buffered == 0:
+            return
+
+        buffer, buffered = self._buffer, self._buffered
+        self._buffer = {}
+        self._buffered = 0
+
+        try:
+            for sql, rows in buffer.items():
+                self._conn.executemany(sql, rows)
+            self._conn.commit()
+        except self._backend.Error as e:
+            self._conn.rollback()
+            log.error(f"db.SQLiteBackend.flush dropped {buffered} inserts: {e}")
 
     def _query(self, query, **kwargs):
         """Query the database and return results
@@ -787,6 +1763,9 @@ class SQLiteBackend(GenericBackend):
                 provides access to the time field associated with the packet in
                 the database.
 
+            fetch_size: The number of rows read from each packet table at a
+                time. (default: 1000)
+
             **kwargs**: Additional kwargs are passed to the backend query without
                 modification.
 
@@ -814,17 +1793,10 @@ class SQLiteBackend(GenericBackend):
         else:
             packets = list(tlm.getDefaultDict().keys())
 
-        if start_time is not None:
-            stime = start_time.strftime(dmc.RFC3339_Format)
-        else:
-            stime = dmc.GPS_Epoch.strftime(dmc.RFC3339_Format)
-
-        if end_time is not None:
-            etime = end_time.strftime(dmc.RFC3339_Format)
-        else:
-            etime = dt.datetime.utcnow().strftime(dmc.RFC3339_Format)
+        stime, etime = self._time_range(start_time, end_time)
 
         yield_packet_time = kwargs.pop("yield_packet_time", False)
+        fetch_size = kwargs.pop("fetch_size", 1000)
 
         results = []
         errs = []
@@ -834,34 +1806,22 @@ class SQLiteBackend(GenericBackend):
             query.append(query_string)
 
             try:
-                results.append((pkt, self._query(query_string)))
+                cursor = self._query(query_string)
+                results.append(self._fetch(pkt, cursor, fetch_size))
             except self._backend.OperationalError as e:
                 log.error(f"db.SQLiteBackend.query failed with exception: {e}")
                 errs.append(str(e))
 
         def sqlite_results_gen(results, **kwargs):
-            from ait.core import dmc
+            # Each table is read in time order, so a k-way merge yields
+            # packets in global time order without loading any table.
+            for t, name, data in heapq.merge(*results, key=lambda r: r[0]):
+                pkt = SQLiteBackend.create_packet_from_result(name, data)
 
-            for packets in itertools.zip_longest(
-                *[r[1] for r in results], fillvalue=None
-            ):
-                pkt_conv = [
-                    (
-                        # strptime throws away timezone, so re-enforce UTC
-                        dmc.rfc3339_str_to_datetime(d[0]),
-                        SQLiteBackend.create_packet_from_result(results[i][0], d[1]),
-                    )
-                    for i, d in enumerate(packets)
-                    if d is not None
-                ]
-
-                pkt_conv.sort(key=lambda x: x[0])
-
-                for t, pkt in pkt_conv:
-                    if yield_packet_time:
-                        yield (t, pkt)
-                    else:
-                        yield pkt
+                if yield_packet_time:
+                    yield (t, pkt)
+                else:
+                    yield pkt
 
         return AITDBResult(
             query="; ".join(query),
@@ -869,16 +1829,228 @@ class SQLiteBackend(GenericBackend):
             errors=errs if len(errs) > 0 else None,
         )
 
+    def query_fields(
+        self, packet, fields, start_time=None, end_time=None, raw=False, **kwargs
+    ):
+        """Query the database for field values of a packet type over a
+        time range.
+
+        If the packet table has a column for each requested field (see
+        the **columns** schema in :meth:`connect`) only those columns
+        are read. Engineering units values require **eu_columns**.
+        Otherwise packets are queried and decoded as in
+        :meth:`GenericBackend.query_fields`.
+
+        Arguments:
+            packet: The packet name to query.
+
+            fields: An iterable of the field names to query.
+
+            start_time: A :class:`datetime.datetime` object defining the query time
+                range start inclusively. (default: The start of the GPS time Epoch)
+
+            end_time: A :class:`datetime.datetime` object defining the query time
+                range end inclusively. (default: The current UTC Zulu time).
+
+            raw: If True, raw field values are returned instead of
+                engineering units. (default: False)
+
+        Additional Keyword Arguments:
+            fetch_size: The number of rows read at a time. (default: 1000)
+
+        Returns:
+            An :class:`AITDBResult` with **results** set to a generator of
+                ``(time, value, ...)`` tuples in time order.
+
+        Raises:
+            ValueError: If the packet type name cannot be located in the
+                telemetry dictionary.
+        """
+        if tlm.getDefaultRegistry().by_name(packet) is None:
+            msg = f'Invalid packet name "{packet}" provided'
+            log.error(msg)
+            raise ValueError(msg)
+
+        fields = list(fields)
+        columns = self._stored_columns(packet, fields, raw)
+
+        if columns is None:
+            return super(SQLiteBackend, self).query_fields(
+                packet, fields, start_time, end_time, raw, **kwargs
+            )
+
+        stime, etime = self._time_range(start_time, end_time)
+        fetch_size = kwargs.pop("fetch_size", 1000)
+        selected = ", ".join(f'"{column}"' for column in columns)
+        query = (
+            f'SELECT time, {selected} FROM "{packet}" '
+            f'WHERE time >= "{stime}" AND time <= "{etime}" ORDER BY time ASC'
+        )
+
+        try:
+            cursor = self._query(query)
+        except self._backend.OperationalError as e:
+            log.error(f"db.SQLiteBackend.query failed with exception: {e}")
+            return AITDBResult(query=query, errors=[str(e)])
+
+        def sqlite_fields_gen(cursor):
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+
+                for row in rows:
+                    yield (dmc.rfc3339_str_to_datetime(row[0]), *row[1:])
+
+        return AITDBResult(query=query, results=sqlite_fields_gen(cursor))
+
+    def query_downsampled(
+        self,
+        packet,
+        fields,
+        start_time=None,
+        end_time=None,
+        buckets=None,
+        width=None,
+        raw=False,
+        **kwargs,
+    ):
+        """Query the database for field values of a packet type
+        summarized over fixed-width buckets of time.
+
+        If the packet table has a column for each requested field (see
+        :meth:`query_fields`) and the values are numeric, i.e. raw or
+        without an enumeration, the buckets are computed by SQLite.
+        Otherwise values are summarized as in
+        :meth:`GenericBackend.query_downsampled`.
+
+        Arguments:
+            buckets: The number of buckets to divide the time range into.
+
+            width: The width of each bucket, as a
+                :class:`datetime.timedelta` or seconds. Overrides buckets.
+
+        Returns:
+            An :class:`AITDBResult` with **results** set to a generator of
+                ``(time, Bucket, ...)`` tuples in time order.
+
+        Raises:
+            ValueError: If the packet type name cannot be located in the
+                telemetry dictionary, or neither buckets nor width is
+                given.
+        """
+        pkt_defn = tlm.getDefaultRegistry().by_name(packet)
+
+        if pkt_defn is None:
+            msg = f'Invalid packet name "{packet}" provided'
+            log.error(msg)
+            raise ValueError(msg)
+
+        start, end, width = self._buckets(start_time, end_time, buckets, width)
+        fields = list(fields)
+        columns = self._stored_columns(packet, fields, raw)
+        numeric = all(
+            name in pkt_defn.fieldmap and (raw or pkt_defn.fieldmap[name].enum is None)
+            for name in fields
+        )
+
+        if columns is None or not numeric:
+            return super(SQLiteBackend, self).query_downsampled(
+                packet, fields, start, end, width=width, raw=raw, **kwargs
+            )
+
+        stime, etime = self._time_range(start, end)
+        fetch_size = kwargs.pop("fetch_size", 1000)
+        bucket = (
+            f"CAST((julianday(time) - julianday('{stime}')) * 86400.0 "
+            f"/ {width.total_seconds()!r} AS INTEGER)"
+        )
+
+        # Partitioning on NULL too makes MIN() of the first and last
+        # values skip NULLs, as for the other aggregates.
+        window = (
+            "ORDER BY time ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING"
+        )
+        values, aggregates = [], []
+
+        for i, column in enumerate(columns):
+            partition = f'PARTITION BY bucket, "{column}" IS NULL'
+            values.append(
+                f'"{column}" AS v{i}, '
+                f'FIRST_VALUE("{column}") OVER ({partition} {window}) AS f{i}, '
+                f'LAST_VALUE("{column}") OVER ({partition} {window}) AS l{i}'
+            )
+            aggregates.append(
+                f"MIN(v{i}), MAX(v{i}), AVG(v{i}), MIN(f{i}), MIN(l{i}), COUNT(v{i})"
+            )
+
+        query = (
+            f"SELECT bucket, {', '.join(aggregates)} FROM ("
+            f"SELECT bucket, {', '.join(values)} FROM ("
+            f'SELECT {bucket} AS bucket, * FROM "{packet}" '
+            f'WHERE time >= "{stime}" AND time <= "{etime}")) '
+            f"GROUP BY bucket ORDER BY bucket"
+        )
+
+        try:
+            cursor = self._query(query)
+        except self._backend.OperationalError as e:
+            log.error(f"db.SQLiteBackend.query failed with exception: {e}")
+            return AITDBResult(query=query, errors=[str(e)])
+
+        def sqlite_buckets_gen(cursor):
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+
+                for n, *stats in rows:
+                    yield (
+                        start + n * width,
+                        *[Bucket(*stats[i : i + 6]) for i in range(0, len(stats), 6)],
+                    )
+
+        return AITDBResult(query=query, results=sqlite_buckets_gen(cursor))
+
+    def _stored_columns(self, packet, fields, raw):
+        """Returns the names of the packet table columns storing the given
+        fields' raw (or engineering units) values, or None if any of the
+        columns does not exist.
+        """
+        columns = [name if raw else name + ".eu" for name in fields]
+
+        try:
+            table_info = self._query(f'PRAGMA table_info("{packet}")')
+            available = {row[1] for row in table_info}
+        except self._backend.OperationalError:
+            available = set()
+
+        return columns if available.issuperset(columns) else None
+
+    @staticmethod
+    def _fetch(packet_name, cursor, size):
+        """Yields (time, packet name, packet data) for each row of
+        cursor, fetching size rows at a time.
+        """
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+
+            for row in rows:
+                # strptime throws away timezone, so re-enforce UTC
+                yield dmc.rfc3339_str_to_datetime(row[0]), packet_name, row[1]
+
     def close(self, **kwargs):
-        """Close the database connection."""
+        """Flush any buffered inserts and close the database connection."""
         if self._conn:
+            self.flush()
             self._conn.close()
 
     @classmethod
     def create_packet_from_result(cls, packet_name, data):
-        try:
-            pkt_defn = tlm.getDefaultDict()[packet_name]
-        except KeyError:
+        pkt_defn = tlm.getDefaultRegistry().by_name(packet_name)
+        if pkt_defn is None:
             log.error(
                 "Unknown packet name {}. Unable to unpack SQLite result".format(
                     packet_name
@@ -887,3 +2059,652 @@ class SQLiteBackend(GenericBackend):
             return None
 
         return tlm.Packet(pkt_defn, data=data)
+
+
+class PartitionedSQLiteBackend(GenericBackend):
+    """Time-partitioned SQLite Backend
+
+    Shards packets by time into one SQLite database file per day or
+    hour, each with the same schema as :class:`SQLiteBackend`. Old data
+    is pruned by deleting whole partition files rather than running
+    ``DELETE``, and queries only open the partitions that overlap the
+    requested time range, reading them in parallel in a gevent threadpool.
+
+    Partitions are named for the start of their time window (e.g.
+    ``20201202.db`` or ``20201202T13.db``) and stored in a single
+    directory.
+    """
+
+    _backend = "sqlite3"
+    _windows = {
+        "day": ("%Y%m%d", dt.timedelta(days=1)),
+        "hour": ("%Y%m%dT%H", dt.timedelta(hours=1)),
+    }
+
+    def __init__(self):
+        """"""
+        super(PartitionedSQLiteBackend, self).__init__()
+        self._directory = None
+        self._format, self._window = self._windows["day"]
+        self._retention = None
+        self._workers = 4
+        self._max_open = 2
+        self._kwargs = {}
+        self._partitions = collections.OrderedDict()
+
+    def connect(self, **kwargs):
+        """Connect to a partitioned SQLite archive
+
+        The archive directory is created first via :func:`create` if it
+        doesn't exist. All other kwargs (e.g. **batch_size** and
+        **schema**) are passed to :meth:`SQLiteBackend.connect` for each
+        partition.
+
+        **Configuration Parameters**
+
+        database name
+          The directory holding the partition files. Passed as either
+          the config key **database.dbname** or the kwargs argument
+          **database**. Defaults to **ait.db.d**.
+
+        partition
+          The time window of each partition, either **day** or
+          **hour**. Passed as either the config key
+          **database.partition** or the kwargs argument **partition**.
+          Defaults to **day**.
+
+        retention
+          The number of most recent partitions to keep. Older partition
+          files are deleted by :meth:`prune`, which is called whenever a
+          new partition is created. Passed as either the config key
+          **database.retention** or the kwargs argument **retention**.
+          Defaults to **None**, i.e. keep all partitions.
+
+        workers
+          The number of partitions queried in parallel. Passed as either
+          the config key **database.workers** or the kwargs argument
+          **workers**. Defaults to **4**.
+
+        max open
+          The number of partitions kept open for writing. Passed as
+          either the config key **database.max_open** or the kwargs
+          argument **max_open**. Defaults to **2**.
+        """
+        kwargs = dict(kwargs)
+        self._directory = kwargs.pop(
+            "database", ait.config.get("database.dbname", "ait.db.d")
+        )
+        partition = kwargs.pop("partition", ait.config.get("database.partition", "day"))
+        self._retention = kwargs.pop(
+            "retention", ait.config.get("database.retention", None)
+        )
+        self._workers = kwargs.pop("workers", ait.config.get("database.workers", 4))
+        self._max_open = max(
+            int(kwargs.pop("max_open", ait.config.get("database.max_open", 2))), 1
+        )
+
+        if partition not in self._windows:
+            msg = f'Unknown database.partition "{partition}"'
+            raise cfg.AitConfigError(msg)
+
+        self._format, self._window = self._windows[partition]
+        self._kwargs = kwargs
+
+        if not os.path.isdir(self._directory):
+            self.create()
+
+    def create(self, **kwargs):
+        """Create the archive directory. Partition files are created on
+        the first insert into their time window.
+        """
+        os.makedirs(self._directory, exist_ok=True)
+
+    def _key(self, time):
+        """Returns the partition key (file name without extension) for
+        the given naive UTC datetime.
+        """
+        return time.strftime(self._format)
+
+    def _path(self, key):
+        return os.path.join(self._directory, key + ".db")
+
+    def _keys(self):
+        """Returns the sorted keys of all partitions in the archive."""
+        keys = []
+
+        for filename in os.listdir(self._directory):
+            key, ext = os.path.splitext(filename)
+            if ext != ".db":
+                continue
+
+            try:
+                dt.datetime.strptime(key, self._format)
+            except ValueError:
+                continue
+
+            keys.append(key)
+
+        return sorted(keys)
+
+    @staticmethod
+    def _utc(time):
+        """Returns time as a naive UTC datetime."""
+        if isinstance(time, str):
+            time = dmc.rfc3339_str_to_datetime(time)
+
+        if time.tzinfo is not None:
+            time = time.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+        return time
+
+    def _partition(self, key):
+        """Returns the connected SQLiteBackend for writing to the given
+        partition, creating the partition if needed.
+        """
+        backend = self._partitions.get(key)
+
+        if backend is not None:
+            self._partitions.move_to_end(key)
+            return backend
+
+        path = self._path(key)
+        created = not os.path.exists(path)
+
+        backend = SQLiteBackend()
+        backend.connect(database=path, **self._kwargs)
+        self._partitions[key] = backend
+
+        while len(self._partitions) > self._max_open:
+            _, old = self._partitions.popitem(last=False)
+            old.close()
+
+        if created:
+            self.prune(keep=key)
+
+        return backend
+
+    def insert(self, packet, time=None, **kwargs):
+        """Insert a packet into the partition for the given time (or the
+        current UTC time).
+
+        Arguments
+            packet
+                The :class:`ait.core.tlm.Packet` instance to insert into
+                the database
+
+        """
+        time = dt.datetime.utcnow() if time is None else self._utc(time)
+        self._partition(self._key(time)).insert(packet, time=time, **kwargs)
+
+    def flush(self, **kwargs):
+        """Write any buffered inserts in open partitions."""
+        for backend in self._partitions.values():
+            backend.flush()
+
+    def prune(self, keep=None, **kwargs):
+        """Delete all but the most recent **retention** partitions.
+
+        The partition with key keep, if given, is never deleted, so that
+        a partition created for an insert older than the retention window
+        is not deleted before it is written. It is deleted by a later
+        prune.
+
+        Returns the keys of the deleted partitions.
+        """
+        if self._retention is None:
+            return []
+
+        keys = self._keys()
+        expired = [k for k in keys[: max(len(keys) - self._retention, 0)] if k != keep]
+
+        for key in expired:
+            backend = self._partitions.pop(key, None)
+            if backend is not None:
+                backend.close()
+
+            for suffix in ("", "-wal", "-shm"):
+                path = self._path(key) + suffix
+                if os.path.exists(path):
+                    os.remove(path)
+
+            log.info(f"Removed expired database partition {key}")
+
+        return expired
+
+    def _overlapping(self, start_time, end_time):
+        """Returns the paths of the partitions overlapping the given time
+        range, in time order.
+        """
+        start = self._utc(start_time) if start_time is not None else None
+        end = self._utc(end_time) if end_time is not None else None
+        paths = []
+
+        for key in self._keys():
+            begin = dt.datetime.strptime(key, self._format)
+
+            if (start is None or begin + self._window > start) and (
+                end is None or begin <= end
+            ):
+                paths.append(self._path(key))
+
+        return paths
+
+    def _reader(self, path):
+        """Returns a SQLiteBackend with a read-only connection to the
+        given partition, for use in the calling thread only.
+        """
+        backend = SQLiteBackend()
+        backend._conn = self._backend.connect(f"file:{path}?mode=ro", uri=True)
+        return backend
+
+    def _query_partition(self, path, packets, start_time, end_time, channel, **kwargs):
+        """Reads the (time, packet) results of querying the given
+        partition in a threadpool thread and puts them on the channel in
+        lists of up to **fetch_size**, followed by None (or the
+        exception raised). Returns early once the channel is stopped.
+        """
+        size = kwargs.get("fetch_size", 1000)
+        put = channel.put
+
+        if channel.stopped:
+            return
+
+        backend = self._reader(path)
+
+        try:
+            res = backend.query_packets(
+                packets, start_time, end_time, yield_packet_time=True, **kwargs
+            )
+            for err in res.errors or []:
+                log.error(f"db.PartitionedSQLiteBackend query of {path} failed: {err}")
+
+            results = res.get_packets()
+            for chunk in iter(lambda: list(itertools.islice(results, size)), []):
+                if not put(chunk):
+                    return
+
+            put(None)
+        except Exception as e:
+            put(e)
+        finally:
+            backend.close()
+
+    def query(self, query, **kwargs):
+        """Query every partition and return the concatenated results
+
+        Returns:
+            An :class:`AITDBResult` with a list of result rows, in
+            partition order, set in **results** or errors recorded in
+            **errors**.
+        """
+        results = []
+        errs = []
+
+        for path in self._overlapping(None, None):
+            backend = self._reader(path)
+            try:
+                res = backend.query(query, **kwargs)
+                if res.errors:
+                    errs.extend(res.errors)
+                else:
+                    results.extend(res.results)
+            finally:
+                backend.close()
+
+        return AITDBResult(
+            query=query, results=results, errors=errs if len(errs) > 0 else None
+        )
+
+    def query_packets(self, packets=None, start_time=None, end_time=None, **kwargs):
+        """Query the database for packet types over a time range.
+
+        Only partitions overlapping the time range are opened. Up to
+        **workers** partitions are read ahead in a gevent threadpool, so
+        other greenlets keep running, while results are consumed, each buffering at most two chunks of
+        **fetch_size** results. Partitions cover disjoint time windows, so
+        results are yielded in time order. See
+        :meth:`SQLiteBackend.query_packets` for arguments. Errors reading
+        a partition are logged.
+        """
+        if packets is not None:
+            tlm_dict = tlm.getDefaultDict()
+            for name in packets:
+                if name not in tlm_dict:
+                    msg = f'Invalid packet name "{name}" provided'
+                    log.error(msg)
+                    raise ValueError(msg)
+
+        yield_packet_time = kwargs.pop("yield_packet_time", False)
+        paths = self._overlapping(start_time, end_time)
+        query = f"{len(paths)} partitions of {self._directory}"
+
+        def read(channel):
+            while True:
+                chunk = channel.get()
+                if chunk is None:
+                    return
+                yield from chunk
+
+        def partitioned_results_gen(paths):
+            # Each partition streams through a small bounded channel, so
+            # at most a few chunks per worker are held in memory.
+            pending = collections.deque()
+            channels = []
+            pool = gevent.threadpool.ThreadPool(self._workers)
+
+            try:
+                for path in paths:
+                    channel = _ThreadChannel()
+                    channels.append(channel)
+                    pool.spawn(
+                        self._query_partition,
+                        path,
+                        packets,
+                        start_time,
+                        end_time,
+                        channel,
+                        **kwargs,
+                    )
+                    pending.append(channel)
+
+                    if len(pending) >= self._workers:
+                        yield from read(pending.popleft())
+
+                while pending:
+                    yield from read(pending.popleft())
+            finally:
+                for channel in channels:
+                    channel.stop()
+                pool.kill()
+
+        def packets_gen(results):
+            for t, pkt in results:
+                yield (t, pkt) if yield_packet_time else pkt
+
+        return AITDBResult(
+            query=query, packets=packets_gen(partitioned_results_gen(paths))
+        )
+
+    def close(self, **kwargs):
+        """Flush and close all open partitions."""
+        while self._partitions:
+            _, backend = self._partitions.popitem()
+            backend.close()
+
+    @classmethod
+    def create_packet_from_result(cls, packet_name, data):
+        return SQLiteBackend.create_packet_from_result(packet_name, data)
+
+
+class ThreadPoolBackend(GenericBackend):
+    """Thread pool Backend wrapper
+
+    Runs the calls of another backend in gevent threadpools so that
+    blocking database work does not stall the gevent hub. Inserts,
+    flushes and other writes run in order on a single writer thread.
+    Queries run on a pool of reader threads, each with its own
+    connection to the database. Query results are read in the reader
+    thread and passed back to the calling greenlet in chunks as they
+    are consumed.
+
+    Only the calling greenlet waits on a call; other greenlets (e.g.
+    realtime telemetry streams) keep running.
+    """
+
+    _backend = "gevent.threadpool"
+
+    def __init__(self):
+        """"""
+        super(ThreadPoolBackend, self).__init__()
+        self._backend_cls = None
+        self._kwargs = {}
+        self._workers = 4
+        self._chunk_size = 1000
+        self._writer = None
+        self._writer_backend = None
+        self._readers = []
+        self._connections = {}
+        self._streams = set()
+
+    def connect(self, **kwargs):
+        """Connect to the wrapped backend's database
+
+        All other kwargs are passed to the wrapped backend's
+        :meth:`connect` for the writer and each reader thread.
+
+        **Configuration Parameters**
+
+        backend
+          The class path of the wrapped backend. Passed as either the
+          config key **database.pool_backend** or the kwargs argument
+          **backend**. Defaults to **ait.core.db.SQLiteBackend**.
+
+        workers
+          The number of reader threads, and so reader connections.
+          Passed as either the config key **database.workers** or the
+          kwargs argument **workers**. Defaults to **4**.
+
+        chunk size
+          The number of query results passed back to the calling
+          greenlet at a time. Passed as either the config key
+          **database.chunk_size** or the kwargs argument
+          **chunk_size**. Defaults to **1000**.
+        """
+        kwargs = dict(kwargs)
+        backend = kwargs.pop(
+            "backend",
+            ait.config.get("database.pool_backend", "ait.core.db.SQLiteBackend"),
+        )
+        self._workers = kwargs.pop("workers", ait.config.get("database.workers", 4))
+        self._chunk_size = kwargs.pop(
+            "chunk_size", ait.config.get("database.chunk_size", 1000)
+        )
+
+        try:
+            mod, cls = backend.rsplit(".", 1)
+            self._backend_cls = getattr(importlib.import_module(mod), cls)
+        except (ImportError, AttributeError, ValueError):
+            msg = f'Could not import (load) database.pool_backend "{backend}"'
+            raise cfg.AitConfigError(msg)
+
+        self._kwargs = kwargs
+        self._writer = self._backend.ThreadPool(1)
+        # One single thread pool per reader, so that each reader's
+        # connection can be closed on its own thread.
+        self._readers = [self._backend.ThreadPool(1) for _ in range(self._workers)]
+        self._writer_backend = self._writer.apply(self._connect)
+
+    def _connect(self):
+        """Returns a new instance of the wrapped backend connected in the
+        calling thread.
+        """
+        backend = self._backend_cls()
+        backend.connect(**self._kwargs)
+        return backend
+
+    def _reader(self):
+        """Returns the calling reader thread's connected backend."""
+        ident = _get_ident()
+        backend = self._connections.get(ident)
+
+        if backend is None:
+            backend = self._connections[ident] = self._connect()
+
+        return backend
+
+    def _reader_pool(self):
+        """Returns the reader threadpool with the fewest pending tasks."""
+        return min(self._readers, key=len)
+
+    def _write(self, method, *args, **kwargs):
+        """Calls the named method of the writer backend on the writer
+        thread and returns its result.
+        """
+        return self._writer.apply(
+            lambda: getattr(self._writer_backend, method)(*args, **kwargs)
+        )
+
+    def create(self, **kwargs):
+        """Create a database in the instance, on the writer thread."""
+        return self._write("create", **kwargs)
+
+    def insert(self, packet, time=None, **kwargs):
+        """Insert a packet into the database, on the writer thread."""
+        return self._write("insert", packet, time=time, **kwargs)
+
+    def flush(self, **kwargs):
+        """Write any buffered inserts, on the writer thread."""
+        return self._write("flush", **kwargs)
+
+    def query(self, query, **kwargs):
+        """Query the database on a reader thread. See the wrapped
+        backend's :meth:`query`.
+
+        Results that are iterators (e.g. SQLite cursors) are read on the
+        reader thread and returned as a generator.
+        """
+        return self._stream("query", query, **kwargs)
+
+    def query_packets(self, packets=None, start_time=None, end_time=None, **kwargs):
+        """Query the database for packet types over a time range on a
+        reader thread. See the wrapped backend's :meth:`query_packets`.
+        """
+        return self._stream("query_packets", packets, start_time, end_time, **kwargs)
+
+    def query_fields(
+        self, packet, fields, start_time=None, end_time=None, raw=False, **kwargs
+    ):
+        """Query the database for field values of a packet type on a
+        reader thread. See the wrapped backend's :meth:`query_fields`.
+        """
+        return self._stream(
+            "query_fields", packet, fields, start_time, end_time, raw, **kwargs
+        )
+
+    def query_downsampled(
+        self,
+        packet,
+        fields,
+        start_time=None,
+        end_time=None,
+        buckets=None,
+        width=None,
+        raw=False,
+        **kwargs,
+    ):
+        """Query the database for summarized field values of a packet
+        type on a reader thread. See the wrapped backend's
+        :meth:`query_downsampled`.
+        """
+        return self._stream(
+            "query_downsampled",
+            packet,
+            fields,
+            start_time,
+            end_time,
+            buckets,
+            width,
+            raw,
+            **kwargs,
+        )
+
+    def _stream(self, method, *args, **kwargs):
+        """Calls the named query method of a reader backend on a reader
+        thread. Returns an :class:`AITDBResult` whose packets or results
+        iterator, if any, is read on that thread and passed back in
+        chunks of **chunk_size** items as it is consumed.
+        """
+        channel = _ThreadChannel()
+        put, get = channel.put, channel.get
+
+        def produce():
+            try:
+                res = getattr(self._reader(), method)(*args, **kwargs)
+            except Exception as e:
+                put(e)
+                return
+
+            packets, results = res._packets, res._results
+            streamed = packets if packets is not None else results
+
+            if streamed is None or iter(streamed) is not streamed:
+                put(res)
+                return
+
+            if not put(res):
+                return
+
+            try:
+                for chunk in iter(
+                    lambda: list(itertools.islice(streamed, self._chunk_size)), []
+                ):
+                    if not put(chunk):
+                        return
+            except Exception as e:
+                put(e)
+                return
+
+            put(None)
+
+        def stop():
+            self._streams.discard(stop)
+            channel.stop()
+
+        def chunks_gen():
+            try:
+                while True:
+                    chunk = get()
+                    if chunk is None:
+                        break
+
+                    yield from chunk
+            finally:
+                stop()
+
+        self._streams.add(stop)
+        self._reader_pool().spawn(produce)
+        gen = chunks_gen()
+        # Stop the reader if the results are discarded unread.
+        weakref.finalize(gen, stop)
+
+        try:
+            res = get()
+        except Exception:
+            stop()
+            raise
+
+        if res._packets is not None and iter(res._packets) is res._packets:
+            return AITDBResult(
+                query=res.query, results=res.results, packets=gen, errors=res.errors
+            )
+        elif res._packets is None and res._results is not None:
+            if iter(res._results) is res._results:
+                return AITDBResult(query=res.query, results=gen, errors=res.errors)
+
+        stop()
+        return res
+
+    def close(self, **kwargs):
+        """Flush and close the writer and every reader connection, then
+        stop the threadpools.
+        """
+        if self._writer is None:
+            return
+
+        self._write("close")
+
+        for stop in list(self._streams):
+            stop()
+
+        def close_reader():
+            backend = self._connections.pop(_get_ident(), None)
+            if backend is not None:
+                backend.close()
+
+        for reader in self._readers:
+            reader.apply(close_reader)
+            reader.kill()
+
+        self._writer.kill()
+        self._writer = None
+        self._readers = []
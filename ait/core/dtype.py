@@ -77,6 +77,11 @@ from typing import Dict, Any
 
 from ait.core import cmd, dmc, log
 
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
 
 # PrimitiveTypes
 #
@@ -178,9 +183,44 @@ class PrimitiveType:
             self._max = 2**self.nbits - 1
             self._min = 0
 
+        self._kind = None
+        self._struct = None
+
+        if self._format is not None:
+            self._struct = struct.Struct(self._format)
+            code = re.sub(r"\W+", "", self._format).lower()
+
+            if self._string:
+                self._kind = "str"
+            elif code in ("b", "h", "i", "l", "q"):
+                self._kind = "int"
+            else:
+                self._kind = "float"
+
+        # Subclasses (e.g. Complex Types) that convert values in encode()
+        # or decode() are packed and unpacked via those methods.
+        cls = type(self)
+        self._plain = (
+            cls.encode is PrimitiveType.encode and cls.decode is PrimitiveType.decode
+        )
+
     def __eq__(self, other):
         return isinstance(other, PrimitiveType) and self._name == other._name
 
+    def __getstate__(self):
+        """Serialize state, replacing the precompiled struct (which cannot
+        be pickled) with its format."""
+        state = dict(self.__dict__)
+        if self._struct is not None:
+            state["_struct"] = self._struct.format
+        return state
+
+    def __setstate__(self, state):
+        """Deserialize state, recompiling the struct."""
+        self.__dict__.update(state)
+        if self._struct is not None:
+            self._struct = struct.Struct(self._struct)
+
     def __repr__(self):
         return "%s('%s')" % (self.__class__.__name__, self.name)
 
@@ -241,15 +281,17 @@ class PrimitiveType:
         Encodes the given value to a bytearray according to this
         PrimitiveType definition.
         """
-        if re.sub(r"\W+", "", self.format).lower() in ("b", "i", "l", "q"):
-            fvalue = int(value)
-        elif self._string:
-            fvalue = value.encode()
+        return bytearray(self._struct.pack(self._coerce(value)))
+
+    def _coerce(self, value):
+        """Converts value to the kind (integer, string or float) expected
+        by this PrimitiveType's struct format."""
+        if self._kind == "int":
+            return int(value)
+        elif self._kind == "str":
+            return value.encode()
         else:
-            fvalue = value
-
-        as_str = struct.pack(self.format, fvalue)
-        return bytearray(as_str)
+            return value
 
     def decode(self, bytestring, raw=False):
         """decode(bytearray, raw=False) -> value
@@ -261,7 +303,33 @@ class PrimitiveType:
         ``decode()`` inteface, but has no effect for PrimitiveType
         definitions.
         """
-        return struct.unpack(self.format, memoryview(bytestring))[0]
+        return self._struct.unpack(memoryview(bytestring))[0]
+
+    def pack_into(self, buffer, offset, value):
+        """pack_into(buffer, offset, value)
+
+        Encodes the given value according to this type definition
+        directly into the writable buffer (e.g. a bytearray) at the
+        given byte offset.
+        """
+        if self._plain:
+            self._struct.pack_into(buffer, offset, self._coerce(value))
+        else:
+            encoded = self.encode(value)
+            buffer[offset : offset + len(encoded)] = encoded
+
+    def unpack_from(self, buffer, offset=0, raw=False):
+        """unpack_from(buffer, offset=0, raw=False) -> value
+
+        Decodes the value at the given byte offset in buffer according
+        to this type definition, without first slicing (copying) the
+        buffer.  See :meth:`decode`.
+        """
+        if self._plain:
+            return self._struct.unpack_from(buffer, offset)[0]
+
+        view = memoryview(buffer)[offset : offset + self.nbytes]
+        return self.decode(view, raw)
 
     def toJSON(self):  # noqa
         return self.name
@@ -314,7 +382,7 @@ PrimitiveTypes = sorted(PrimitiveTypeMap.keys())
 
 
 class ArrayType(object):
-    __slots__ = ["_nelems", "_type"]
+    __slots__ = ["_nelems", "_struct", "_type"]
 
     def __init__(self, elem_type, nelems):
         """Creates a new ArrayType of nelems, each of type elem_type."""
@@ -326,6 +394,15 @@ class ArrayType(object):
 
         self._type = elem_type
         self._nelems = nelems
+        self._struct = None
+
+        # Arrays of numeric primitives are decoded with a single
+        # precompiled struct, e.g. '>512H' for MSB_U16[512].
+        if type(elem_type) is PrimitiveType and not elem_type.string:
+            format = elem_type.format
+            endian = format[0] if format[0] in "<>" else ""
+            code = "%s%d%s" % (endian, nelems, format.lstrip("<>"))
+            self._struct = struct.Struct(code)
 
     def __eq__(self, other):
         """Returns True if two ArrayTypes are equivalent, False otherwise."""
@@ -335,6 +412,11 @@ class ArrayType(object):
             and self.nelems == other.nelems
         )
 
+    def __reduce__(self):
+        """Pickles ArrayTypes by element type and number of elements, as
+        the precompiled struct cannot be pickled."""
+        return (ArrayType, (self._type, self._nelems))
+
     def __repr__(self):
         return "%s('%s')" % (self.__class__.__name__, self.name)
 
@@ -386,9 +468,12 @@ class ArrayType(object):
             index = slice(0, self.nelems)
 
         if isinstance(index, slice):
-            step = 1 if index.step is None else index.step
-            indices = range(index.start, index.stop, step)
-            result = [self.decode_elem(bytes, n, raw) for n in indices]
+            if self._struct is not None:
+                self._assert_nbytes(bytes)
+                result = list(self._struct.unpack_from(bytes)[index])
+            else:
+                indices = range(*index.indices(self.nelems))
+                result = [self.decode_elem(bytes, n, raw) for n in indices]
         else:
             result = self.decode_elem(bytes, index, raw)
 
@@ -407,7 +492,28 @@ class ArrayType(object):
             msg += "but the ArrayType.decode() method received only %d bytes."
             raise IndexError(msg % (self.type.name, index, stop, len(bytes)))
 
-        return self.type.decode(bytes[start:stop], raw)
+        return self.type.unpack_from(bytes, start, raw)
+
+    def _assert_nbytes(self, bytes):
+        """Raise IndexError if bytes is too short to contain this array."""
+        if len(bytes) < self.nbytes:
+            msg = "Decoding %s requires %d bytes, "
+            msg += "but the ArrayType.decode() method received only %d bytes."
+            raise IndexError(msg % (self.name, self.nbytes, len(bytes)))
+
+    def view(self, bytes):
+        """view(bytes) -> numpy.ndarray | None
+
+        Returns a NumPy array of this Array's elements backed by the
+        given sequence of bytes, i.e. without copying or decoding them.
+        Returns None if NumPy is not available or the element type is
+        not a numeric PrimitiveType.
+        """
+        if numpy is None or self._struct is None:
+            return None
+
+        self._assert_nbytes(bytes)
+        return numpy.frombuffer(bytes, dtype=self.type.format, count=self.nelems)
 
     def encode(self, *args):
         """encode(value1[, ...]) -> bytes
@@ -700,6 +806,7 @@ class Time40Type(PrimitiveType):
         self._name = "TIME40"
         self._nbits = 40
         self._nbytes = 5
+        self._struct = struct.Struct(">IB")
 
     @property
     def pdt(self):
@@ -715,10 +822,10 @@ class Time40Type(PrimitiveType):
         if not isinstance(value, datetime.datetime):
             raise TypeError("encode() argument must be a Python datetime")
 
-        coarse = Time32Type().encode(value)
-        fine = Time8Type().encode(value.microsecond / 1e6)
+        coarse = dmc.to_gps_seconds(value)
+        fine = value.microsecond / 1e6 * 256
 
-        return coarse + fine
+        return bytearray(self._struct.pack(int(coarse), int(fine)))
 
     def decode(self, bytes, raw=False):
         """decode(bytearray, raw=False) -> value
@@ -731,13 +838,13 @@ class Time40Type(PrimitiveType):
         seconds and subseconds will be returned as a floating-point
         number instead.
         """
-        coarse = Time32Type().decode(bytes[:4], raw)
-        fine = Time8Type().decode(bytes[4:])
+        coarse, fine = self._struct.unpack(memoryview(bytes))
+        fine /= 256.0
 
-        if not raw:
-            fine = datetime.timedelta(microseconds=fine * 1e6)
+        if raw:
+            return coarse + fine
 
-        return coarse + fine
+        return dmc.to_local_time(coarse) + datetime.timedelta(microseconds=fine * 1e6)
 
 
 class Time64Type(PrimitiveType):
@@ -753,6 +860,7 @@ class Time64Type(PrimitiveType):
 
         self._pdt = self.name
         self._name = "TIME64"
+        self._struct = struct.Struct(">II")
 
     @property
     def pdt(self):
@@ -768,10 +876,10 @@ class Time64Type(PrimitiveType):
         if not isinstance(value, datetime.datetime):
             raise TypeError("encode() argument must be a Python datetime")
 
-        coarse = Time32Type().encode(value)
-        fine = get("MSB_U32").encode(value.microsecond * 1e3)
+        coarse = dmc.to_gps_seconds(value)
+        fine = value.microsecond * 1e3
 
-        return coarse + fine
+        return bytearray(self._struct.pack(int(coarse), int(fine)))
 
     def decode(self, bytes, raw=False):
         """decode(bytearray, False) -> value
@@ -785,15 +893,12 @@ class Time64Type(PrimitiveType):
         seconds and nanoseconds will be returned as a floating-point
         number instead.
         """
-        coarse = Time32Type().decode(bytes[:4], raw)
-        fine = get("MSB_U32").decode(bytes[4:])
+        coarse, fine = self._struct.unpack(memoryview(bytes))
 
         if raw:
-            fine /= 1e9
-        else:
-            fine = datetime.timedelta(microseconds=fine / 1e3)
+            return coarse + fine / 1e9
 
-        return coarse + fine
+        return dmc.to_local_time(coarse) + datetime.timedelta(microseconds=fine / 1e3)
 
 
 # ComplexTypeMap
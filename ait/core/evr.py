@@ -54,16 +54,14 @@ class EVRDict(dict):
             log.warn("EVRDict: Skipping load() attempt after previous initialization")
             return
 
-        if os.path.isfile(content):
-            self.filename = content
-            stream = open(self.filename, "rb")
-        else:
-            stream = content
-
         try:
-            evrs = yaml.safe_load(stream)
+            if os.path.isfile(content):
+                self.filename = content
+                evrs = util.load_yaml(self.filename)
+            else:
+                evrs = yaml.safe_load(content)
         except IOError as e:
-            msg = "Could not load EVR YAML '{}': '{}'".format(stream, str(e))
+            msg = "Could not load EVR YAML '{}': '{}'".format(content, str(e))
             log.error(msg)
             return
 
@@ -184,9 +182,7 @@ class EVRDefn(json.SlotSerializer, object):
                     if fsize == 1 and "MSB_" in fstr:
                         fstr = fstr[4:]
 
-                    d = dtype.PrimitiveType(fstr).decode(
-                        evr_hist_data[cur_byte_index:end_index]
-                    )
+                    d = dtype.get_pdt(fstr).unpack_from(evr_hist_data, cur_byte_index)
 
                 # Some formatters have an undefined data size (such as strings)
                 # and require additional processing to determine the length of
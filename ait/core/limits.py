@@ -69,7 +69,6 @@ For example:
 """
 import os
 from importlib.resources import files
-from io import IOBase
 
 import yaml
 
@@ -203,18 +202,13 @@ class LimitsDict(dict):
         if self.filename is None:
             if os.path.isfile(content):
                 self.filename = content
-                stream = open(self.filename, "rb")
+                limits = util.load_yaml(self.filename)
             else:
-                stream = content
-
-            limits = yaml.safe_load(stream)
+                limits = yaml.safe_load(content)
 
             for lmt in limits:
                 self.add(lmt)
 
-            if isinstance(stream, IOBase):
-                stream.close()
-
     def toJSON(self):  # noqa
         return {name: defn.toJSON() for name, defn in self.items()}
 
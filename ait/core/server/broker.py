@@ -1,10 +1,14 @@
 import gevent.monkey
+import gevent.threadpool
 import zmq.green as zmq
 
 gevent.monkey.patch_all()
 
+import itertools
 from typing import List, Any
 
+import zmq as native_zmq
+
 import ait.core
 import ait.core.server
 from ait.core import log
@@ -16,8 +20,18 @@ class Broker(gevent.Greenlet):
     This broker contains the ZeroMQ context and proxy that connects all
     streams and plugins to each other through publish-subscribe sockets.
     This broker subscribes all ZMQ clients to their input topics.
+
+    By default the proxy is a greenlet forwarding one message at a time.
+    With the config key **server.broker.mode** set to **proxy** it runs
+    :func:`zmq.proxy_steerable` on a dedicated native thread instead, so
+    forwarding does not pass through the gevent hub. In that mode
+    :meth:`pause`, :meth:`resume` and :meth:`stop` steer the proxy, and
+    if **server.broker.capture** names a URL every forwarded message is
+    also published on a PUB socket bound to it.
     """
 
+    _ids = itertools.count()
+
     inbound_streams: List[Any] = []
     outbound_streams: List[Any] = []
     servers: List[Any] = []
@@ -27,6 +41,13 @@ class Broker(gevent.Greenlet):
         self.context = zmq.Context()
         self.XSUB_URL = ZmqConfig.get_xsub_url()
         self.XPUB_URL = ZmqConfig.get_xpub_url()
+        self.mode = ZmqConfig.get_broker_mode()
+        self.CAPTURE_URL = ZmqConfig.get_broker_capture_url()
+        self.CONTROL_URL = f"inproc://ait-broker-control-{next(Broker._ids)}"
+        self.control = None
+
+        if self.mode not in ("greenlet", "proxy"):
+            raise ValueError(f'Unknown server.broker.mode "{self.mode}"')
 
         # Name of the topic associated with external commands
         self.command_topic = ait.config.get("command.topic", ait.DEFAULT_CMD_TOPIC)
@@ -34,6 +55,10 @@ class Broker(gevent.Greenlet):
         gevent.Greenlet.__init__(self)
 
     def _run(self):
+        if self.mode == "proxy":
+            self._run_proxy()
+            return
+
         self._setup_proxy()
         self._subscribe_all()
 
@@ -61,6 +86,70 @@ class Broker(gevent.Greenlet):
         self.poller.register(self.frontend, zmq.POLLIN)
         self.poller.register(self.backend, zmq.POLLIN)
 
+    def _run_proxy(self):
+        # The proxy thread needs plain sockets, but they must share the
+        # underlying context with clients to support inproc:// URLs.
+        context = native_zmq.Context.shadow(self.context.underlying)
+        self.control = context.socket(native_zmq.PAIR)
+        self.control.connect(self.CONTROL_URL)
+
+        pool = gevent.threadpool.ThreadPool(1)
+        proxy = pool.spawn(self._proxy, context)
+        self._subscribe_all()
+
+        log.info("Starting broker proxy thread...")
+        try:
+            proxy.get()
+        finally:
+            self.control.close(linger=0)
+            self.control = None
+            pool.kill()
+            log.info("Broker proxy thread stopped")
+
+    def _proxy(self, context):
+        """Runs the steerable proxy until it is terminated. Called on the
+        proxy thread, which owns all of the proxy's sockets.
+        """
+        frontend = context.socket(native_zmq.XSUB)
+        frontend.bind(self.XSUB_URL)
+
+        backend = context.socket(native_zmq.XPUB)
+        backend.bind(self.XPUB_URL)
+
+        control = context.socket(native_zmq.PAIR)
+        control.bind(self.CONTROL_URL)
+
+        capture = None
+        if self.CAPTURE_URL:
+            capture = context.socket(native_zmq.PUB)
+            capture.bind(self.CAPTURE_URL)
+
+        try:
+            native_zmq.proxy_steerable(frontend, backend, capture, control)
+        finally:
+            for sock in (frontend, backend, control, capture):
+                if sock is not None:
+                    sock.close(linger=0)
+
+    def _steer(self, command):
+        if self.control is None:
+            log.warn(f"Broker proxy is not running, ignoring {command}")
+            return
+
+        self.control.send(command)
+
+    def pause(self):
+        """Pauses forwarding by the broker proxy thread."""
+        self._steer(b"PAUSE")
+
+    def resume(self):
+        """Resumes forwarding by the broker proxy thread."""
+        self._steer(b"RESUME")
+
+    def stop(self):
+        """Terminates the broker proxy thread, ending the broker."""
+        self._steer(b"TERMINATE")
+
     def _subscribe_all(self):
         """
         Subscribes all streams to their input.
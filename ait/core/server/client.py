@@ -50,7 +50,7 @@ class ZMQClient(object):
             log.error(f"{self} unable to encode msg {msg} for send.")
             return
 
-        self.pub.send_multipart(msg)
+        self.pub.send_multipart(msg, copy=False)
         log.debug("Published message from {}".format(self))
 
     def process(self, input_data, topic=None):
@@ -70,6 +70,18 @@ class ZMQClient(object):
             )
         )
 
+    def process_batch(self, messages):
+        """Called with each batch of messages received together.
+        Streams and plugins may override it to handle a batch at once;
+        by default :meth:`process` is called for each message in turn.
+
+        Params:
+            messages:    list of (input_data, topic) tuples, in the order
+                         received
+        """
+        for input_data, topic in messages:
+            self.process(input_data, topic=topic)
+
 
 class ZMQInputClient(ZMQClient, gevent.Greenlet):
     """
@@ -78,8 +90,18 @@ class ZMQInputClient(ZMQClient, gevent.Greenlet):
     ZMQ messages from the input streams it is subscribed to and stays
     open to receiving those messages, calling the process method
     on all messages received.
+
+    After each wakeup up to **batch_size** pending messages are read
+    without blocking and passed to :meth:`process_batch` together. Up to
+    **batch_budget** batches are handled back to back before yielding to
+    other greenlets. Both default to 1, i.e. one message at a time, and
+    are set by the config keys **server.batch.size** and
+    **server.batch.budget** or by a plugin's own config.
     """
 
+    batch_size = None
+    batch_budget = None
+
     def __init__(
         self,
         zmq_context,
@@ -95,20 +117,30 @@ class ZMQInputClient(ZMQClient, gevent.Greenlet):
         self.sub = self.context.socket(zmq.SUB)
         self.sub.connect(zmq_proxy_xpub_url.replace("*", "localhost"))
 
+        if self.batch_size is None:
+            self.batch_size = ait.config.get("server.batch.size", 1)
+        if self.batch_budget is None:
+            self.batch_budget = ait.config.get("server.batch.budget", 1)
+        self.batch_size = max(int(self.batch_size), 1)
+        self.batch_budget = max(int(self.batch_budget), 1)
+
         gevent.Greenlet.__init__(self)
 
     def _run(self):
         try:
             while True:
                 gevent.sleep(0)
-                msg = self.sub.recv_multipart()
-                topic, message = utils.decode_message(msg)
-                if topic is None or message is None:
-                    log.error(f"{self} received invalid topic or message. Skipping")
-                    continue
+                batch = [self.sub.recv_multipart(copy=False)]
+
+                for n in range(self.batch_budget):
+                    if n > 0:
+                        batch = self._drain(self.batch_size)
+                        if not batch:
+                            break
+                    else:
+                        batch += self._drain(self.batch_size - 1)
 
-                log.debug("{} received message from {}".format(self, topic))
-                self.process(message, topic=topic)
+                    self._process_received(batch)
 
         except Exception as e:
             log.error(
@@ -116,6 +148,35 @@ class ZMQInputClient(ZMQClient, gevent.Greenlet):
             )
             raise (e)
 
+    def _drain(self, count):
+        """Returns up to count messages already pending on the socket."""
+        msgs = []
+
+        try:
+            while len(msgs) < count:
+                msgs.append(self.sub.recv_multipart(zmq.NOBLOCK, copy=False))
+        except zmq.Again:
+            pass
+
+        return msgs
+
+    def _process_received(self, msgs):
+        """Decodes received messages and passes the valid ones to
+        :meth:`process_batch`."""
+        messages = []
+
+        for msg in msgs:
+            topic, message = utils.decode_message(msg)
+            if topic is None or message is None:
+                log.error(f"{self} received invalid topic or message. Skipping")
+                continue
+
+            log.debug("%s received message from %s", self, topic)
+            messages.append((message, topic))
+
+        if messages:
+            self.process_batch(messages)
+
 
 class PortOutputClient(ZMQInputClient):
     """
@@ -13,3 +13,11 @@ class ZmqConfig:
     @staticmethod
     def get_xpub_url():
         return ait.config.get("server.xpub", ait.SERVER_DEFAULT_XPUB_URL)
+
+    @staticmethod
+    def get_broker_mode():
+        return ait.config.get("server.broker.mode", "greenlet")
+
+    @staticmethod
+    def get_broker_capture_url():
+        return ait.config.get("server.broker.capture", None)
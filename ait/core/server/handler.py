@@ -8,6 +8,9 @@ class Handler(object):
     from. All custom handlers must implement the handle method, which will
     called by the stream the handler is attached to when the stream receives
     data.
+
+    Handlers may also implement :meth:`handle_batch` to handle many
+    messages at once when their stream is configured to batch input.
     """
 
     __metaclass__ = ABCMeta
@@ -43,3 +46,28 @@ class Handler(object):
                         be the output of the previous handler.
         """
         pass
+
+    def handle_batch(self, inputs):
+        """
+        Handles a list of messages at once. Called instead of
+        :meth:`handle` by streams that batch their input.
+
+        This implementation calls :meth:`handle` for each message and
+        drops messages for which it returns no data. Handlers that can
+        process many messages more efficiently should override it.
+
+        Params:
+            inputs:     list of messages, as they would be passed to
+                        :meth:`handle`
+        Returns:
+            list of the outputs for the messages that were not dropped,
+            in order
+        """
+        outputs = []
+
+        for input_data in inputs:
+            output = self.handle(input_data)
+            if output:
+                outputs.append(output)
+
+        return outputs
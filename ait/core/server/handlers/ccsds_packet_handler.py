@@ -1,4 +1,5 @@
-import binascii
+import collections
+import struct
 
 import ait.core.log
 from ait.core import tlm
@@ -14,8 +15,18 @@ class CCSDSPacketHandler(Handler):
     to get the UID from the default telemetry dictionary. The user data field
     is extracted from the raw binary data, and a tuple of the UID and user data
     field is returned.
+
+    The configured APIDs are expanded at init into a table of the packet
+    UID for each of the 2048 possible APIDs, so mapping a packet is a
+    single lookup. Counts of dropped packets are kept per APID in
+    **unknown_counts** (APID not configured) and **short_counts**
+    (packet shorter than its header states, or than 7 bytes). Packets
+    too short to hold an APID are counted under None.
     """
 
+    APID_COUNT = 2048
+    PRIMARY_HEADER = struct.Struct(">HHH")
+
     def __init__(self, input_type=None, output_type=None, **kwargs):
         """
         Params:
@@ -38,7 +49,8 @@ class CCSDSPacketHandler(Handler):
         )
 
         # Check if all packet names in config are in telemetry dictionary
-        tlm_dict = tlm.getDefaultDict()
+        self._registry = tlm.getDefaultRegistry()
+        tlm_dict = self._registry.tlmdict
         for packet_name in self.packet_types.values():
             if packet_name not in tlm_dict.keys():
                 msg = "CCSDSPacketHandler: Packet name {} not present in telemetry dictionary.".format(
@@ -47,6 +59,39 @@ class CCSDSPacketHandler(Handler):
                 msg += " Available packet types are {}".format(tlm_dict.keys())
                 raise ValueError(msg)
 
+        self._udf_start = self.PRIMARY_HEADER.size + self.packet_secondary_header_length
+        self._apid_uids = self._expand_packet_types()
+        self.unknown_counts = collections.Counter()
+        self.short_counts = collections.Counter()
+
+    def _expand_packet_types(self):
+        """
+        Returns a list mapping each APID to the UID of the first packet
+        type in the config whose APID pattern matches it, or None.
+
+        Raises:
+            ValueError:   If an APID pattern is not 11 '0', '1' or 'X'
+                          characters.
+        """
+        uids = [None] * self.APID_COUNT
+
+        for config_apid, packet_name in reversed(list(self.packet_types.items())):
+            pattern = config_apid[:11]
+            if len(pattern) != 11 or set(pattern) - set("01X"):
+                raise ValueError(
+                    f"CCSDSPacketHandler: Invalid APID pattern {config_apid}"
+                )
+
+            mask = int(pattern.replace("0", "1").replace("X", "0"), 2)
+            value = int(pattern.replace("X", "0"), 2)
+            uid = self._registry.by_name(packet_name).uid
+
+            for apid in range(self.APID_COUNT):
+                if apid & mask == value:
+                    uids[apid] = uid
+
+        return uids
+
     def handle(self, input_data):
         """
         Params:
@@ -54,47 +99,86 @@ class CCSDSPacketHandler(Handler):
         Returns:
             tuple of packet UID and packet data field
         """
+        output, reason = self._extract(input_data)
 
-        # Check if packet length is at least 7 bytes
-        primary_header_length = 6
-        if len(input_data) < primary_header_length + 1:
+        if output is None:
+            ait.core.log.info(reason)
+
+        return output
+
+    def handle_batch(self, inputs):
+        """
+        Params:
+            inputs:    list of CCSDS packets
+        Returns:
+            list of tuples of packet UID and packet data field, for each
+            packet that could be mapped. Dropped packets are logged once
+            per batch.
+        """
+        outputs = []
+        dropped = 0
+        reason = None
+
+        for input_data in inputs:
+            output, why = self._extract(input_data)
+
+            if output is None:
+                dropped += 1
+                reason = why
+            else:
+                outputs.append(output)
+
+        if dropped:
             ait.core.log.info(
-                "CCSDSPacketHandler: Received packet length is less than minimum of 7 bytes."
+                f"CCSDSPacketHandler: Dropped {dropped} of {len(inputs)} "
+                f"packets in batch. Last reason: {reason}"
+            )
+
+        return outputs
+
+    def _extract(self, input_data):
+        """
+        Returns a tuple of (the packet UID and user data field, None), or
+        (None, the reason) if the packet cannot be mapped.
+        """
+
+        # Check if packet length is at least 7 bytes
+        if len(input_data) < self.PRIMARY_HEADER.size + 1:
+            apid = (
+                struct.unpack_from(">H", input_data)[0] & 0x07FF
+                if len(input_data) >= 2
+                else None
+            )
+            self.short_counts[apid] += 1
+            return (
+                None,
+                "CCSDSPacketHandler: Received packet length is less than minimum of 7 bytes.",
             )
-            return
 
-        # Extract APID from packet
-        packet_apid = str(bin(int(binascii.hexlify(input_data[0:2]), 16) & 0x07FF))[
-            2:
-        ].zfill(11)
+        word, _, length = self.PRIMARY_HEADER.unpack_from(input_data)
+        apid = word & 0x07FF
 
-        # Check if packet_apid matches with an APID in the config
-        config_apid = self.comp_apid(packet_apid)
-        if not config_apid:
+        # Map APID to the UID of its packet type in the config
+        packet_uid = self._apid_uids[apid]
+        if packet_uid is None:
+            self.unknown_counts[apid] += 1
             msg = "CCSDSPacketHandler: Packet APID {} not present in config.".format(
-                packet_apid
+                format(apid, "011b")
             )
             msg += " Available packet APIDs are {}".format(self.packet_types.keys())
-            ait.core.log.info(msg)
-            return
-
-        # Map APID to packet name in config to get UID from telemetry dictionary
-        packet_name = self.packet_types[config_apid]
-        tlm_dict = tlm.getDefaultDict()
-        packet_uid = tlm_dict[packet_name].uid
+            return None, msg
 
         # Extract user data field from packet
-        packet_data_length = int(binascii.hexlify(input_data[4:6]), 16) + 1
-        if len(input_data) < primary_header_length + packet_data_length:
-            ait.core.log.info(
-                "CCSDSPacketHandler: Packet data length is less than stated length in packet primary header."
+        packet_length = self.PRIMARY_HEADER.size + length + 1
+        if len(input_data) < packet_length:
+            self.short_counts[apid] += 1
+            return (
+                None,
+                "CCSDSPacketHandler: Packet data length is less than stated length in packet primary header.",
             )
-            return
-        udf_length = packet_data_length - self.packet_secondary_header_length
-        udf_start = primary_header_length + self.packet_secondary_header_length
-        user_data_field = input_data[udf_start : udf_start + udf_length + 1]
+        user_data_field = memoryview(input_data)[self._udf_start : packet_length + 1]
 
-        return (packet_uid, user_data_field)
+        return (packet_uid, user_data_field), None
 
     def comp_apid(self, server_apid):
         """
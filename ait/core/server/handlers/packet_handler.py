@@ -41,3 +41,13 @@ class PacketHandler(Handler):
             tuple of packet UID and message received by stream
         """
         return (self._pkt_defn.uid, input_data)
+
+    def handle_batch(self, inputs):
+        """
+        Params:
+            inputs:       list of messages received by stream
+        Returns:
+            list of tuples of packet UID and message received by stream
+        """
+        uid = self._pkt_defn.uid
+        return [(uid, input_data) for input_data in inputs]
@@ -12,8 +12,8 @@
 # or other export authority as may be required before exporting such
 # information to foreign countries or providing access to foreign persons.
 import importlib
-from collections import defaultdict
 
+import gevent
 import gevent.monkey
 
 gevent.monkey.patch_all()
@@ -34,6 +34,13 @@ class DataArchive(Plugin):
         Creates base packet dictionary for decoding packets with packet UIDs as
         keys and packet definitions as values.
 
+        Inserts are batched by backends that support it (``batch_size``
+        defaults to 1000) and flushed at least every ``flush_interval``
+        seconds (default 1.0) so an idle stream does not leave packets
+        buffered. Backends with a background writer (see
+        :attr:`ait.core.db.InfluxDBBackend.background_flush`) flush on
+        that interval themselves.
+
         Params:
             inputs:      list of names of input streams to plugin
             outputs:     list of names of plugin output streams
@@ -48,14 +55,17 @@ class DataArchive(Plugin):
         super(DataArchive, self).__init__(inputs, outputs, **kwargs)
 
         self.datastore = datastore
-        self.packet_dict = defaultdict(dict)
-        for _k, v in tlm.getDefaultDict().items():
-            self.packet_dict[v.uid] = v
+        self.packet_dict = tlm.getDefaultRegistry()
+        self.flush_interval = kwargs.setdefault("flush_interval", 1.0)
+        kwargs.setdefault("batch_size", 1000)
 
         try:
             mod, cls = self.datastore.rsplit(".", 1)
             self.dbconn = getattr(importlib.import_module(mod), cls)()
             self.dbconn.connect(**kwargs)
+            self._flusher = None
+            if not getattr(self.dbconn, "background_flush", False):
+                self._flusher = gevent.spawn(self._flush)
             log.info("Starting telemetry data archiving")
         except ImportError as e:
             log.error("Could not import specified datastore {}".format(self.datastore))
@@ -82,7 +92,16 @@ class DataArchive(Plugin):
         try:
             uid, pkt = int(input_data[0]), input_data[1]
             defn = self.packet_dict[uid]
-            decoded = tlm.Packet(defn, data=bytearray(pkt))
+            decoded = tlm.Packet(defn, data=pkt, copy=False)
             self.dbconn.insert(decoded, **kwargs)
         except Exception as e:
             log.error("Data archival failed with error: {}.".format(e))
+
+    def _flush(self):
+        """Periodically flushes inserts buffered by the backend."""
+        while True:
+            gevent.sleep(self.flush_interval)
+            try:
+                self.dbconn.flush()
+            except Exception as e:
+                log.error("Data archive flush failed with error: {}.".format(e))
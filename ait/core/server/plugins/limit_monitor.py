@@ -31,9 +31,7 @@ class TelemetryLimitMonitor(Plugin):
             packet, field = k.split(".")
             self.limit_dict[packet][field] = v
 
-        self.packet_dict = defaultdict(dict)
-        for _k, v in tlm.getDefaultDict().items():
-            self.packet_dict[v.uid] = v
+        self.packet_dict = tlm.getDefaultRegistry()
 
         self.notif_thrshld = ait.config.get("notifications.options.threshold", 1)
         self.notif_freq = ait.config.get(
@@ -47,7 +45,7 @@ class TelemetryLimitMonitor(Plugin):
         try:
             pkt_id, pkt_data = int(input_data[0]), input_data[1]
             packet = self.packet_dict[pkt_id]
-            decoded = tlm.Packet(packet, data=bytearray(pkt_data))
+            decoded = tlm.Packet(packet, data=pkt_data, copy=False)
         except Exception as e:
             log.error("TelemetryLimitMonitor: {}".format(e))
             log.error(
@@ -56,8 +54,11 @@ class TelemetryLimitMonitor(Plugin):
             return
 
         if packet.name in self.limit_dict:
-            for field, defn in self.limit_dict[packet.name].items():
-                v = decoded._getattr(field)
+            limit_defns = self.limit_dict[packet.name]
+            values = packet.evaluate_derivations(decoded, names=list(limit_defns))
+
+            for field, defn in limit_defns.items():
+                v = values[field]
 
                 if packet.name not in self.limit_trip_repeats.keys():
                     self.limit_trip_repeats[packet.name] = {}
@@ -196,15 +196,8 @@ class DictUtils(object):
         ait_pkt_def = ait_pkt._defn
         ait_pkt_id = ait_pkt_def.name
 
-        mct_pkt_value_dict = dict()
-
         mct_dict["packet"] = ait_pkt_id
-        mct_dict["data"] = mct_pkt_value_dict
-
-        ait_pkt_fieldmap = ait_pkt_def.fieldmap
-        for ait_field_id in ait_pkt_fieldmap:
-            tlm_pt_value = getattr(ait_pkt, ait_field_id)
-            mct_pkt_value_dict[ait_field_id] = tlm_pt_value
+        mct_dict["data"] = ait_pkt_def.decode_all(ait_pkt._data, packet=ait_pkt)
 
         return mct_dict
 
@@ -398,12 +391,10 @@ class AITOpenMctPlugin(Plugin):
         self._tlmQueue = api.GeventDeque(maxlen=100)
 
         # Load AIT tlm dict and create OpenMCT format of it
-        self._aitTlmDict = tlm.getDefaultDict()
+        self._uidToPktDefMap = tlm.getDefaultRegistry()
+        self._aitTlmDict = self._uidToPktDefMap.tlmdict
         self._mctTlmDict = DictUtils.format_tlmdict_for_openmct(self._aitTlmDict)
 
-        # Create lookup from packet-uid to packet def
-        self._uidToPktDefMap = DictUtils.create_uid_pkt_map(self._aitTlmDict)
-
         # Attempt to initialize database, None if no DB
         self._database = self.load_database(**kwargs)
 
@@ -498,8 +489,7 @@ class AITOpenMctPlugin(Plugin):
             pkt_id, pkt_data = int(input_data[0]), input_data[1]
             packet_def = self._get_tlm_packet_def(pkt_id)
             if packet_def:
-                packet_def = self._uidToPktDefMap[pkt_id]
-                tlm_packet = tlm.Packet(packet_def, data=bytearray(pkt_data))
+                tlm_packet = tlm.Packet(packet_def, data=pkt_data, copy=False)
                 self._process_telem_msg(tlm_packet)
                 processed = True
             else:
@@ -544,10 +534,7 @@ class AITOpenMctPlugin(Plugin):
 
     def _get_tlm_packet_def(self, uid):
         """Return packet definition based on packet unique id"""
-        if uid in self._uidToPktDefMap.keys():
-            return self._uidToPktDefMap[uid]
-        else:
-            return None
+        return self._uidToPktDefMap.get(uid)
 
     def init(self):
         """Initialize the web-server state"""
@@ -735,11 +722,18 @@ class AITOpenMctPlugin(Plugin):
     def get_historical_tlm(self, mct_pkt_id):
         """
         Handling of historical queries.  Time range is retrieved from bottle request query.
+        If the query has the OpenMCT 'minmax' strategy and a size, results are
+        downsampled to a minimum and maximum value per field for size/2 time buckets.
         :param mct_pkt_id_part: OpenMCT id part (single entry or comma-separated list)
         :return: JSON string representing list of result dicts
         """
         start_time_ms = float(bottle.request.query.start)
         end_time_ms = float(bottle.request.query.end)
+        size = bottle.request.query.size
+
+        buckets = None
+        if bottle.request.query.strategy == "minmax" and size.isdigit():
+            buckets = max(int(size) // 2, 1)
 
         # Set the content type of response for OpenMct to know its JSON
         bottle.response.content_type = "application/json"
@@ -754,7 +748,7 @@ class AITOpenMctPlugin(Plugin):
         mct_pkt_id_list = mct_pkt_id.split(",")
 
         results = self.get_historical_tlm_for_range(
-            mct_pkt_id_list, start_time_ms, end_time_ms
+            mct_pkt_id_list, start_time_ms, end_time_ms, buckets
         )
 
         # Dump results to JSON string
@@ -767,13 +761,16 @@ class AITOpenMctPlugin(Plugin):
 
         return json_result
 
-    def get_historical_tlm_for_range(self, mct_pkt_ids, start_epoch_ms, end_epoch_ms):
+    def get_historical_tlm_for_range(
+        self, mct_pkt_ids, start_epoch_ms, end_epoch_ms, buckets=None
+    ):
         """
         Perform a historical query of a list of OpenMCT telemetry ids between
         the start and end time (as milliseconds since Epoch)
         :param mct_pkt_ids: List or openMct telemetry ids
         :param start_epoch_ms: Start time
         :param end_epoch_ms: End time
+        :param buckets: Number of time buckets to downsample results to, or None
         :return: List of result dicts, where each entry contains {timestamp, id, value}.
         """
 
@@ -800,7 +797,7 @@ class AITOpenMctPlugin(Plugin):
         for ait_pkt_id in ait_pkt_fields_dict:
             ait_pkt_field_names = ait_pkt_fields_dict[ait_pkt_id]
             cur_result_list = self.get_historical_tlm_for_packet_fields(
-                ait_pkt_id, ait_pkt_field_names, start_epoch_ms, end_epoch_ms
+                ait_pkt_id, ait_pkt_field_names, start_epoch_ms, end_epoch_ms, buckets
             )
 
             # Add result if non-null and non-empty
@@ -813,7 +810,7 @@ class AITOpenMctPlugin(Plugin):
         return result_list
 
     def get_historical_tlm_for_packet_fields(
-        self, ait_pkt_id, ait_field_names, start_millis, end_millis
+        self, ait_pkt_id, ait_field_names, start_millis, end_millis, buckets=None
     ):
         """
         Perform a historical query for a particular AIT packet type
@@ -821,6 +818,9 @@ class AITOpenMctPlugin(Plugin):
         :param ait_field_names: List of field names to include, use None to include all fields
         :param start_millis: Start time, milliseconds since UNIX epoch
         :param end_millis: End time, milliseconds since UNIX epoch
+        :param buckets: Number of time buckets to downsample to, or None for all values.
+                        Each bucket yields a minimum and maximum measurement per field,
+                        or the last value for non-numeric fields.
         :return: List of OpenMct measurements that satisfy query
         """
 
@@ -865,17 +865,26 @@ class AITOpenMctPlugin(Plugin):
         self.dbg_message(f"Query args : {query_args_str}")
 
         # default response is empty
-        res_pkts = list()
+        res_rows = list()
 
-        # Query packet and time range from database
+        # Query field values and time range from database
         try:
             if self._database:
-                ait_db_result = self._database.query_packets(
-                    packets=packet_ids,
-                    start_time=start_date,
-                    end_time=end_date,
-                    yield_packet_time=True,
-                )
+                if buckets:
+                    ait_db_result = self._database.query_downsampled(
+                        ait_pkt_id,
+                        field_names,
+                        start_time=start_date,
+                        end_time=end_date,
+                        buckets=buckets,
+                    )
+                else:
+                    ait_db_result = self._database.query_fields(
+                        ait_pkt_id,
+                        field_names,
+                        start_time=start_date,
+                        end_time=end_date,
+                    )
 
                 if ait_db_result.errors is not None:
                     log.error(
@@ -885,30 +894,40 @@ class AITOpenMctPlugin(Plugin):
                     )
                     for db_err in ait_db_result.errors:
                         log.error("[OpenMCT] Error: " + str(db_err))
-                elif ait_db_result.has_packets:
-                    res_pkts = list(ait_db_result.get_packets())
+                elif ait_db_result.results is not None:
+                    res_rows = list(ait_db_result.results)
 
                 # Debug result size
                 self.dbg_message(
                     f"Number of results for query "
-                    f"{query_args_str} : {len(res_pkts)}"
+                    f"{query_args_str} : {len(res_rows)}"
                 )
 
         except Exception as e:
             log.error("[OpenMCT] Database query failed.  Error: " + str(e))
             return None
 
-        for cur_pkt_time, cur_pkt in res_pkts:
+        for cur_pkt_time, *cur_values in res_rows:
             # Convert datetime to Javascript timestamp (in milliseconds)
             cur_timestamp_sec = datetime.datetime.timestamp(cur_pkt_time)
             unix_timestamp_msec = int(cur_timestamp_sec) * 1000
 
             # Add a record for each requested field for this timestamp
-            for cur_field_name in field_names:
-                record = {"timestamp": unix_timestamp_msec}
-                record["id"] = DictUtils.create_mct_pkt_id(ait_pkt_id, cur_field_name)
-                record["value"] = getattr(cur_pkt, cur_field_name)
-                result_list.append(record)
+            for cur_field_name, cur_value in zip(field_names, cur_values):
+                mct_field_id = DictUtils.create_mct_pkt_id(ait_pkt_id, cur_field_name)
+
+                if not buckets:
+                    field_values = [cur_value]
+                elif cur_value.min is None:
+                    field_values = [cur_value.last]
+                else:
+                    field_values = [cur_value.min, cur_value.max]
+
+                for field_value in field_values:
+                    record = {"timestamp": unix_timestamp_msec}
+                    record["id"] = mct_field_id
+                    record["value"] = field_value
+                    result_list.append(record)
 
         return result_list
 
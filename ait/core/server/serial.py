@@ -2,6 +2,7 @@ import datetime
 import enum
 import importlib
 import inspect
+import struct
 import traceback
 
 import msgpack  # type: ignore
@@ -524,6 +525,11 @@ class SerialHooks(object):
 
 
 class Serializer:
+    # Header frame of a (uid, packet bytes) telemetry message sent as
+    # separate frames: a magic number and the signed 64-bit packet uid.
+    TELEMETRY_MAGIC = b"AITt"
+    TELEMETRY_HEADER = struct.Struct(">4sq")
+
     def __init__(self):
         # Load the serial registry
         self.registry = SerialRegistryLoader.load_registry()
@@ -535,6 +541,12 @@ class Serializer:
         # Create Hooks instance which handles the extra magic
         self.hooks = SerialHooks(self.registry)
 
+        # Whether telemetry is sent as raw frames (see serialize_frames)
+        # or, as before, a single msgpack frame for older subscribers.
+        self.telemetry_frames = ait.config.get(
+            "server.serialization.telemetry_frames", True
+        )
+
     def serialize(self, obj):
         """
         Serializes obj
@@ -569,3 +581,70 @@ class Serializer:
             log.info(f"Unable to deserialize data.  Error: {err}")
             log.debug(f"Data: {obj}")
         return unpacked
+
+    @staticmethod
+    def is_telemetry(obj):
+        """
+        Returns True if obj is a (uid, packet bytes) telemetry tuple
+        that can be sent without msgpack.
+        """
+        return (
+            type(obj) is tuple
+            and len(obj) == 2
+            and type(obj[0]) is int
+            and isinstance(obj[1], (bytes, bytearray, memoryview))
+            and -(2**63) <= obj[0] < 2**63
+        )
+
+    def serialize_frames(self, obj):
+        """
+        Serializes obj as a list of message frames.
+
+        Telemetry tuples (see :meth:`is_telemetry`) become a header frame
+        holding the uid followed by the packet bytes, so they are sent
+        without msgpack encoding. Mutable packet buffers are copied to
+        bytes first, since the caller may reuse them while the message is
+        being sent. Anything else, or telemetry if
+        **server.serialization.telemetry_frames** is false, becomes a
+        single frame serialized by :meth:`serialize`, or None if that
+        fails.
+        """
+        if self.telemetry_frames and self.is_telemetry(obj):
+            uid, data = obj
+            if not (
+                isinstance(data, bytes)
+                or isinstance(data, memoryview)
+                and data.readonly
+            ):
+                data = bytes(data)
+            return [self.TELEMETRY_HEADER.pack(self.TELEMETRY_MAGIC, uid), data]
+
+        packed = self.serialize(obj)
+        return None if packed is None else [packed]
+
+    def deserialize_frames(self, frames):
+        """
+        Deserializes the message frames produced by :meth:`serialize_frames`.
+
+        Frames may be bytes or :class:`zmq.Frame` objects. The packet data
+        of a telemetry message is returned as a memoryview of its frame.
+
+        Raises:
+            ValueError: If the frames are not a valid message
+        """
+        if len(frames) == 1:
+            return self.deserialize(self._buffer(frames[0]))
+
+        if len(frames) == 2:
+            header = self._buffer(frames[0])
+            if len(header) == self.TELEMETRY_HEADER.size:
+                magic, uid = self.TELEMETRY_HEADER.unpack(header)
+                if magic == self.TELEMETRY_MAGIC:
+                    return (uid, memoryview(self._buffer(frames[1])))
+
+        raise ValueError(f"Unrecognized message of {len(frames)} frames")
+
+    @staticmethod
+    def _buffer(frame):
+        """Returns the buffer of a zmq.Frame, or frame if it is bytes."""
+        return getattr(frame, "buffer", frame)
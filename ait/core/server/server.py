@@ -74,7 +74,12 @@ class Server(object):
         # Subscribe process-plugin output streams to plugin names
         self._subscribe_process_plugins_outputs()
 
-        gevent.joinall(self.greenlets)
+        try:
+            gevent.joinall(self.greenlets)
+        finally:
+            # Handle messages still waiting in partly filled batches.
+            for stream in self.inbound_streams + self.outbound_streams:
+                stream.flush_batch()
 
     def _subscribe_process_plugins_outputs(self):
         """
@@ -250,6 +255,20 @@ class Server(object):
 
         return stream_handlers
 
+    def _get_stream_batch_args(self, config):
+        """
+        Returns the Stream batching kwargs set in a stream's config by the
+        optional **batch-count** and **batch-latency** keys.
+        """
+        batch_args = {}
+
+        if "batch-count" in config:
+            batch_args["batch_count"] = int(config["batch-count"])
+        if "batch-latency" in config:
+            batch_args["batch_latency"] = float(config["batch-latency"])
+
+        return batch_args
+
     def _create_inbound_stream(self, config=None):
         """
         Creates an inbound stream from its config.
@@ -272,6 +291,7 @@ class Server(object):
 
         # Create ZMQ args re-using the Broker's context
         zmq_args_dict = self._create_zmq_args(True)
+        batch_args = self._get_stream_batch_args(config)
 
         if type(stream_input[0]) is int:
             return PortInputStream(
@@ -279,6 +299,7 @@ class Server(object):
                 stream_input,
                 stream_handlers,
                 zmq_args=zmq_args_dict,
+                **batch_args,
             )
         else:
             return ZMQStream(
@@ -286,6 +307,7 @@ class Server(object):
                 stream_input,
                 stream_handlers,
                 zmq_args=zmq_args_dict,
+                **batch_args,
             )
 
     def _create_outbound_stream(self, config=None):
@@ -315,6 +337,7 @@ class Server(object):
 
         # Create ZMQ args re-using the Broker's context
         zmq_args_dict = self._create_zmq_args(True)
+        batch_args = self._get_stream_batch_args(config)
 
         if type(stream_output) is int:
             ostream = PortOutputStream(
@@ -323,6 +346,7 @@ class Server(object):
                 stream_output,
                 stream_handlers,
                 zmq_args=zmq_args_dict,
+                **batch_args,
             )
         else:
             if stream_output is not None:
@@ -335,6 +359,7 @@ class Server(object):
                 stream_input,
                 stream_handlers,
                 zmq_args=zmq_args_dict,
+                **batch_args,
             )
 
         # Set the cmd subscriber field for the stream
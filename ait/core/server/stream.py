@@ -1,3 +1,5 @@
+import gevent
+
 import ait.core.log
 from .client import PortInputClient
 from .client import PortOutputClient
@@ -10,8 +12,16 @@ class Stream:
     It calls its handlers to execute on all input messages sequentially,
     and validates the handler workflow if handler input and output
     types were specified.
+
+    If **batch_count** is greater than 1 input messages are instead
+    accumulated until that many are waiting, or the oldest has waited
+    **batch_latency** seconds, and each handler is called once for the
+    whole batch via :meth:`Handler.handle_batch
+    <ait.core.server.handler.Handler.handle_batch>`.
     """
 
+    DEFAULT_BATCH_LATENCY = 0.05
+
     def __init__(self, name, inputs, handlers, zmq_args=None, **kwargs):
         """
         Params:
@@ -21,6 +31,11 @@ class Stream:
                         if input is string, stream or plugin name to receive
                             messages from
             handlers:   list of handlers (empty list if no handlers for stream)
+            batch_count:    (optional) number of messages to accumulate
+                            before handling them as a batch. Defaults to 1,
+                            i.e. no batching.
+            batch_latency:  (optional) maximum seconds a message waits in a
+                            partial batch. Defaults to 0.05.
             zmq_args:   (optional) dict containing the follow keys:
                             zmq_context
                             zmq_proxy_xsub_url
@@ -35,6 +50,12 @@ class Stream:
         self.name = name
         self.inputs = inputs if inputs is not None else []
         self.handlers = handlers
+        self.batch_count = max(int(kwargs.pop("batch_count", None) or 1), 1)
+        self.batch_latency = kwargs.pop("batch_latency", None)
+        if self.batch_latency is None:
+            self.batch_latency = self.DEFAULT_BATCH_LATENCY
+        self._batch = []
+        self._batch_timer = None
 
         if zmq_args is None:
             zmq_args = {}
@@ -64,26 +85,96 @@ class Stream:
         Publishes final output data.
         Terminates all handler calls and does not publish data if None is received from a single handler.
 
+        If the stream batches input the message is added to the current
+        batch instead.
+
         Params:
             input_data:  message received by stream
             topic:       name of plugin or stream message received from,
                          if applicable
         """
+        if self.batch_count > 1:
+            self._add_to_batch([input_data])
+            return
+
         for handler in self.handlers:
             output = handler.handle(input_data)
 
             if output:
                 input_data = output
             else:
-                msg = (
-                    type(handler).__name__
-                    + " returned no data and caused the handling process to end."
+                ait.core.log.debug(
+                    "%s returned no data and caused the handling process to end.",
+                    type(handler).__name__,
                 )
-                ait.core.log.info(msg)
                 return
 
         self.publish(input_data)
 
+    def process_batch(self, messages):
+        """
+        Handles messages received together. If the stream batches input
+        they are added to the current batch, otherwise each is processed
+        in turn.
+
+        Params:
+            messages:    list of (input_data, topic) tuples
+        """
+        if self.batch_count > 1:
+            self._add_to_batch([input_data for input_data, _ in messages])
+        else:
+            for input_data, topic in messages:
+                self.process(input_data, topic=topic)
+
+    def process_inputs(self, inputs):
+        """
+        Invokes each handler's :meth:`handle_batch` in sequence on a
+        list of messages and publishes each final output.
+
+        Params:
+            inputs:      list of messages received by stream
+        """
+        for handler in self.handlers:
+            inputs = handler.handle_batch(inputs)
+
+            if not inputs:
+                return
+
+        for output in inputs:
+            self.publish(output)
+
+    def _add_to_batch(self, inputs):
+        self._batch.extend(inputs)
+
+        if len(self._batch) >= self.batch_count:
+            self.flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = gevent.spawn_later(self.batch_latency, self.flush_batch)
+
+    def flush_batch(self):
+        """
+        Handles all accumulated messages now and cancels the batch
+        latency timer. Called when a batch fills or its latency expires,
+        and when the stream stops so a partly filled batch is not lost.
+        """
+        if self._batch_timer is not None:
+            if self._batch_timer is not gevent.getcurrent():
+                self._batch_timer.kill(block=False)
+            self._batch_timer = None
+
+        batch, self._batch = self._batch, []
+
+        if batch:
+            self.process_inputs(batch)
+
+    def _run(self):
+        # Greenlet streams handle a partly filled batch when they stop,
+        # including when killed.
+        try:
+            super(Stream, self)._run()
+        finally:
+            self.flush_batch()
+
     def valid_workflow(self):
         """
         Return true if each handler's output type is the same as
@@ -106,8 +197,14 @@ class PortInputStream(Stream, PortInputClient):
     This stream type listens for messages from a UDP port and publishes to a ZMQ socket.
     """
 
-    def __init__(self, name, inputs, handlers, zmq_args=None):
-        super(PortInputStream, self).__init__(name, inputs, handlers, zmq_args)
+    def __init__(self, name, inputs, handlers, zmq_args=None, **kwargs):
+        super(PortInputStream, self).__init__(
+            name, inputs, handlers, zmq_args, **kwargs
+        )
+
+    def stop(self, timeout=None):
+        super(PortInputStream, self).stop(timeout=timeout)
+        self.flush_batch()
 
 
 class ZMQStream(Stream, ZMQInputClient):
@@ -116,8 +213,8 @@ class ZMQStream(Stream, ZMQInputClient):
     to a ZMQ socket.
     """
 
-    def __init__(self, name, inputs, handlers, zmq_args=None):
-        super(ZMQStream, self).__init__(name, inputs, handlers, zmq_args)
+    def __init__(self, name, inputs, handlers, zmq_args=None, **kwargs):
+        super(ZMQStream, self).__init__(name, inputs, handlers, zmq_args, **kwargs)
 
 
 class PortOutputStream(Stream, PortOutputClient):
@@ -126,7 +223,7 @@ class PortOutputStream(Stream, PortOutputClient):
     publishes to a UDP port.
     """
 
-    def __init__(self, name, inputs, output, handlers, zmq_args=None):
+    def __init__(self, name, inputs, output, handlers, zmq_args=None, **kwargs):
         super(PortOutputStream, self).__init__(
-            name, inputs, handlers, zmq_args, output=output
+            name, inputs, handlers, zmq_args, output=output, **kwargs
         )
@@ -29,11 +29,21 @@ def encode_message(topic, data):
             Serialized data object
         ]
 
+    (uid, packet bytes) telemetry tuples are instead encoded as:
+        [
+            Bytes object of String (UTF-8),
+            Header bytes holding the uid,
+            Packet bytes
+        ]
+
+    unless disabled by ``server.serialization.telemetry_frames``.
+
     If encoding fails None will be returned.
 
     """
     try:
-        enc = [bytes(topic, "utf-8"), serializer.serialize(data)]
+        frames = serializer.serialize_frames(data)
+        enc = None if frames is None else [bytes(topic, "utf-8"), *frames]
     # TODO: This should be way less generic than Exception
     except Exception:
         enc = None
@@ -45,6 +55,8 @@ def decode_message(msg):
     """Decode a message received via 0MQ
 
     Given a message received from `recv_multipart`, decode the components.
+    Frames may be bytes or, if received with ``copy=False``,
+    :class:`zmq.Frame` objects.
 
     Returns a tuple of the form:
         (
@@ -52,13 +64,15 @@ def decode_message(msg):
             Deserialized data object
         )
 
+    Telemetry tuples are returned as (uid, memoryview of packet bytes).
+
     If decoding fails a tuple of None objects will be returned.
     """
-    [topic, data] = msg
+    topic, *data = msg
 
     try:
-        tpc = topic.decode("utf-8")
-        msg = serializer.deserialize(data)
+        tpc = bytes(getattr(topic, "buffer", topic)).decode("utf-8")
+        msg = serializer.deserialize_frames(data)
     # TODO: This should be way less generic than Exception
     except Exception:
         tpc = None
@@ -442,11 +442,9 @@ class FSWTabDict(dict):
         if self.filename is None:
             self.filename = filename
 
-        stream = open(self.filename, "rb")
-        for doc in yaml.safe_load_all(stream):
+        for doc in util.load_yaml(self.filename, all_documents=True):
             for table in doc:
                 self.add(table)
-        stream.close()
 
 
 class FSWTabDictCache(object):
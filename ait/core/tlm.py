@@ -18,12 +18,13 @@ The ait.core.tlm module provides telemetry fields and telemetry
 dictionaries.  Dictionaries contain packet, header, data, and field
 definitions.
 """
+import ast
 import collections.abc
+import copy
 import csv
 import os
 import struct
 from importlib.resources import files
-from io import IOBase
 
 import yaml
 
@@ -33,6 +34,11 @@ from ait.core import json
 from ait.core import log
 from ait.core import util
 
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
 
 class WordArray:
     """WordArrays are somewhat analogous to Python bytearrays, but
@@ -109,26 +115,74 @@ class FieldList(collections.abc.Sequence):
     FieldLists encapsulate a packet field array so that it behaves
     like a Python list (or more generally a sequence) when accessed.
 
+    Arrays of numeric primitives that need no enumeration or DN to EU
+    conversion are backed by a NumPy view of the packet data (see
+    :meth:`dtype.ArrayType.view`), created on first access.  Elements
+    are returned as Python values and ``numpy.asarray()`` returns the
+    view itself.  All other arrays are decoded element by element.
+
     A FieldList should not be created directly.  It's created internally
     by the private Packet field accessor _getattr().
     """
 
-    __slots__ = ["_defn", "_packet", "_raw"]
+    __slots__ = ["_defn", "_packet", "_raw", "_view"]
 
     def __init__(self, packet, defn, raw):
         self._packet = packet
         self._defn = defn
         self._raw = raw
+        self._view = None
+
+    def __array__(self, dtype=None, copy=None):
+        array = self._array()
+
+        if array is None:
+            array = numpy.array(self[:])
+
+        return array if dtype is None else array.astype(dtype)
 
     def __eq__(self, other):
         return (
             isinstance(other, collections.abc.Sequence)
             and len(self) == len(other)
-            and all(self[n] == other[n] for n in range(len(self)))
+            and self[:] == list(other)
         )
 
     def __getitem__(self, key):
-        return self._packet._getattr(self._defn.name, self._raw, key)
+        array = self._array()
+
+        if array is None or not isinstance(key, (int, slice)):
+            return self._packet._getattr(self._defn.name, self._raw, key)
+
+        return array[key].tolist()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def _array(self):
+        """Returns the NumPy view backing this FieldList, or None if its
+        elements must be decoded individually.
+        """
+        data = self._packet._data
+
+        if self._view is None or self._view[0] is not data:
+            defn = self._defn
+            plain = isinstance(defn, FieldDefinition)
+            converted = plain and (
+                defn.enum is not None
+                or defn.dntoeu is not None
+                or defn.expr is not None
+            )
+            plain = (
+                plain
+                and defn.when is None
+                and defn.mask is None
+                and (self._raw or not converted)
+            )
+            view = defn.type.view(memoryview(data)[defn.slice()]) if plain else None
+            self._view = data, view
+
+        return self._view[1]
 
     def __len__(self):
         return self._defn.type.nelems
@@ -152,6 +206,9 @@ class DerivationDefinition(json.SlotSerializer):
 
         self.equation = createPacketExpression(self.equation)  # noqa
 
+        if self.when:
+            self.when = createPacketExpression(self.when)  # noqa
+
     def __repr__(self):
         return util.toRepr(self)
 
@@ -320,11 +377,19 @@ class FieldDefinition(json.SlotSerializer):
         FieldDefinition is an ArrayType), then only the element(s) at
         the specified position(s) will be decoded.
         """
-        if index is not None and isinstance(self.type, dtype.ArrayType):
+        if isinstance(self.type, dtype.ArrayType):
             value = self.type.decode(bytes[self.slice()], index, raw)
+
+            if isinstance(value, list):
+                return [self._convert(elem, raw) for elem in value]
         else:
-            value = self.type.decode(bytes[self.slice()], raw)
+            value = self.type.unpack_from(bytes, self.slice().start, raw)
+
+        return self._convert(value, raw)
 
+    def _convert(self, value, raw):
+        """Applies this Field Definition's bit mask, shift and (unless raw
+        is True) enumeration to the given decoded value."""
         # Apply bit mask if needed
         if self.mask is not None:
             value &= self.mask
@@ -395,22 +460,133 @@ class FieldDefinition(json.SlotSerializer):
         return valid
 
 
+class PacketCache:
+    """PacketCache
+
+    A PacketCache memoizes the decoded raw and EU values of a single
+    Packet so that each field is decoded at most once, no matter how
+    many times it is read.  Cached values are invalidated when a field
+    is set on the Packet, but only those whose value depends (directly
+    or via DN to EU conversions, derivations or guards) on the bytes
+    written.  Values that depend on packet history are never cached.
+
+    At most maxsize values are held.  When full, the oldest value is
+    evicted.  The hits, misses, evictions and invalidations counters
+    are available via :attr:`stats`.
+
+    A PacketCache should not be created directly.  It's created by
+    passing ``cache=True`` (or a maximum size) to :class:`Packet`.
+    """
+
+    __slots__ = [
+        "_decoder",
+        "_values",
+        "evictions",
+        "hits",
+        "invalidations",
+        "maxsize",
+        "misses",
+    ]
+
+    DefaultMaxSize = 256
+
+    def __init__(self, defn, maxsize=None):
+        """Creates a new PacketCache for Packets of the given Packet
+        Definition."""
+        self._decoder = defn.decoder
+        self._values = {}
+        self.maxsize = PacketCache.DefaultMaxSize if maxsize is None else maxsize
+        self.evictions = 0
+        self.hits = 0
+        self.invalidations = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Returns the number of values currently cached."""
+        return len(self._values)
+
+    @property
+    def stats(self):
+        """Cache statistics as a dictionary."""
+        return {
+            "size": len(self._values),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def clear(self):
+        """Removes all cached values."""
+        self._values.clear()
+
+    def invalidate(self, indices):
+        """Removes all cached values that depend on the bytes in the given
+        slice of packet data.
+        """
+        written = ((1 << (indices.stop - indices.start)) - 1) << indices.start
+        stale = [key for key, (_, extent) in self._values.items() if extent & written]
+
+        for key in stale:
+            del self._values[key]
+
+        self.invalidations += len(stale)
+
+    def lookup(self, packet, fieldname, raw=False):
+        """Returns the value of the given packet field name, decoding and
+        caching it on first access.
+        """
+        key = (fieldname, raw)
+        entry = self._values.get(key, None)
+
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        value = packet._compute(fieldname, raw)
+        extent = self._decoder.extent(fieldname, raw)
+
+        if extent is not None and self.maxsize > 0:
+            if len(self._values) >= self.maxsize:
+                del self._values[next(iter(self._values))]
+                self.evictions += 1
+            self._values[key] = (value, extent)
+
+        return value
+
+
 class Packet:
     """Packet"""
 
-    def __init__(self, defn, data=None):
+    _cache = None
+
+    def __init__(self, defn, data=None, cache=False, copy=True):
         """Creates a new Packet based on the given Packet Definition and
         binary (raw) packet data.
+
+        If cache is True (or a maximum number of values), decoded field
+        values are memoized in a :class:`PacketCache`.
+
+        If copy is False, data (``bytes``, ``bytearray``, or
+        ``memoryview``) is wrapped as-is rather than copied.  Read-only
+        data is copied into a new bytearray the first time a field is
+        set (copy-on-write).
         """
         object.__setattr__(self, "_defn", defn)
 
         if data is None:
             data = bytearray(self.nbytes)
-        elif not isinstance(data, bytearray):
+        elif copy or not isinstance(data, (bytes, bytearray, memoryview)):
             data = bytearray(data)
 
         object.__setattr__(self, "_data", data)
 
+        if cache:
+            maxsize = None if cache is True else cache
+            object.__setattr__(self, "_cache", createPacketCache(defn, maxsize))  # noqa
+
         if defn.history:
             defn.history.add(self)
 
@@ -429,6 +605,9 @@ class Packet:
         bytes = defn.encode(value)
         indices = defn.slice()
 
+        if not isinstance(self._data, bytearray):
+            object.__setattr__(self, "_data", bytearray(self._data))
+
         if defn.mask is not None:
             # If a mask is defined on the FieldDefinition (defn),
             # defn.encode() will return the encoded value
@@ -454,6 +633,9 @@ class Packet:
 
         self._data[indices] = bytes
 
+        if self._cache is not None:
+            self._cache.invalidate(indices)
+
     def _assert_field(self, fieldname):
         """Raise AttributeError when Packet has no field with the given
         name."""
@@ -467,6 +649,15 @@ class Packet:
         If raw is True, the field value is only decoded.  That is no
         enumeration substituions or DN to EU conversions are applied.
         """
+        if self._cache is not None and index is None:
+            return self._cache.lookup(self, fieldname, raw)
+
+        return self._compute(fieldname, raw, index)
+
+    def _compute(self, fieldname, raw=False, index=None):
+        """Returns the value of the given packet field name, bypassing any
+        PacketCache.  See :meth:`_getattr`.
+        """
         self._assert_field(fieldname)
         value = None
 
@@ -515,7 +706,7 @@ class Packet:
         return WordArray(self._data)
 
     def toJSON(self):  # noqa
-        return {name: getattr(self, name) for name in self._defn.fieldmap}
+        return self._defn.decode_all(self._data, packet=self)
 
     def validate(self, messages=None):
         """Returns True if the given Packet is valid, False otherwise.
@@ -525,6 +716,27 @@ class Packet:
         return self._defn.validate(self, messages)
 
 
+class _PacketValues:
+    """Memoizes every value computed for a Packet, regardless of its
+    dependencies.  Used in place of a :class:`PacketCache` by
+    :meth:`PacketDefinition.evaluate_derivations`, whose Packet does
+    not change during evaluation.
+    """
+
+    __slots__ = ["values"]
+
+    def __init__(self):
+        self.values = {}
+
+    def lookup(self, packet, fieldname, raw=False):
+        key = (fieldname, raw)
+
+        if key not in self.values:
+            self.values[key] = packet._compute(fieldname, raw)
+
+        return self.values[key]
+
+
 class PacketContext:
     """PacketContext
 
@@ -561,6 +773,539 @@ class PacketContext:
         return result
 
 
+class PacketDecoder:
+    """PacketDecoder
+
+    A PacketDecoder decodes every field of a Packet Definition in a
+    single pass over raw packet data.  It is compiled once per Packet
+    Definition and is accessible via :attr:`PacketDefinition.decoder`.
+
+    Fields of plain primitive types that share a byte order and do not
+    overlap are decoded together with one precompiled
+    :class:`struct.Struct`.  Masks, shifts and enumerations are then
+    applied in a single loop.  Complex and array types are decoded via
+    their FieldDefinition, and fields that require a ``when`` guard or
+    DN to EU conversion are evaluated in the context of a Packet.
+    """
+
+    __slots__ = ["_batch", "_defn", "_extents", "_names", "_plans"]
+
+    def __init__(self, defn):
+        """Creates a new PacketDecoder for the given Packet Definition."""
+        self._defn = defn
+        self._names = list(defn.fieldmap)
+        self._plans = {raw: self._compile(raw) for raw in (False, True)}
+        self._batch = {}
+        self._extents = {}
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self._defn.name)
+
+    def _compile(self, raw):
+        """Returns the (structs, direct, evaluated) decode plan for the
+        given raw setting.
+        """
+        groups = []
+        direct = []
+        evaluated = []
+
+        for pos, defn in enumerate(self._defn.fieldmap.values()):
+            index = None
+            if isinstance(defn.type, dtype.ArrayType):
+                index = slice(0, defn.type.nelems)
+
+            converted = defn.dntoeu is not None or defn.expr is not None
+
+            if defn.when is not None or (converted and not raw):
+                evaluated.append((pos, defn.name, index))
+            elif not self._compilable(defn):
+                direct.append((pos, defn, index))
+            else:
+                self._group(groups, pos, defn)
+
+        structs = []
+        for group in groups:
+            prefix = group["endian"] or ">"
+            enums = not raw
+            entries = tuple(
+                (pos, defn.mask, defn.shift, defn.enum if enums else None)
+                for pos, defn in group["fields"]
+            )
+            structs.append((struct.Struct(prefix + "".join(group["format"])), entries))
+
+        return structs, direct, evaluated
+
+    @staticmethod
+    def _compilable(defn):
+        """Returns True if the given FieldDefinition can be decoded as part
+        of a precompiled struct, False otherwise.
+        """
+        if type(defn.type) is not dtype.PrimitiveType:
+            return False
+
+        indices = defn.slice()
+        return indices.stop - indices.start == defn.type.nbytes
+
+    @staticmethod
+    def _group(groups, pos, defn):
+        """Adds the given FieldDefinition to the first struct group with a
+        compatible byte order that ends at or before the field starts,
+        creating a new group if none exists.
+        """
+        start = defn.slice().start
+        format = defn.type.format
+        endian = format[0] if format[0] in "<>" else None
+        code = format.lstrip("<>")
+
+        for group in groups:
+            compatible = endian is None or group["endian"] in (None, endian)
+            if compatible and group["stop"] <= start:
+                break
+        else:
+            group = {"endian": None, "stop": 0, "format": [], "fields": []}
+            groups.append(group)
+
+        if start > group["stop"]:
+            group["format"].append("%dx" % (start - group["stop"]))
+
+        group["endian"] = group["endian"] or endian
+        group["stop"] = start + defn.type.nbytes
+        group["format"].append(code)
+        group["fields"].append((pos, defn))
+
+    def _context(self, data):
+        """Returns a Packet wrapping data for use as an evaluation context.
+
+        The Packet is created without copying data or updating the
+        Packet Definition history.
+        """
+        packet = object.__new__(Packet)
+        object.__setattr__(packet, "_defn", self._defn)
+        object.__setattr__(packet, "_data", data)
+        return packet
+
+    def decode(self, data, raw=False, packet=None):
+        """Decodes all fields in the given raw packet data and returns a
+        dictionary mapping field names to values.
+
+        If raw is True, no enumeration substitutions or DN to EU
+        conversions are applied.  The optional packet is used as the
+        context for evaluating DN to EU conversions and ``when``
+        guards.  If omitted, data is wrapped as needed.
+        """
+        structs, direct, evaluated = self._plans[bool(raw)]
+        values = [None] * len(self._names)
+
+        for compiled, entries in structs:
+            for (pos, mask, shift, enum), value in zip(
+                entries, compiled.unpack_from(data)
+            ):
+                if mask is not None:
+                    value &= mask
+                if shift:
+                    value >>= shift
+                if enum is not None:
+                    value = enum.get(value, value)
+                values[pos] = value
+
+        for pos, defn, index in direct:
+            values[pos] = defn.decode(data, raw, index)
+
+        if evaluated:
+            if packet is None:
+                packet = self._context(data)
+
+            for pos, name, index in evaluated:
+                values[pos] = packet._getattr(name, raw, index)
+
+        return dict(zip(self._names, values))
+
+    def extent(self, name, raw=False):
+        """Returns the bytes on which the value of the given field or
+        derivation name depends, as an integer bitmask with one bit per
+        byte of packet data, or None if the value also depends on state
+        outside the packet (e.g. packet history).
+        """
+        key = (name, raw)
+
+        if key not in self._extents:
+            self._extents[key] = 0
+            self._extents[key] = self._extent(name, raw)
+
+        return self._extents[key]
+
+    def _extent(self, name, raw):
+        """Computes :meth:`extent` for the given name."""
+        if name == "raw":
+            return -1
+        elif name == "history":
+            return None
+
+        exprs = []
+
+        if name in self._defn.derivationmap:
+            defn = self._defn.derivationmap[name]
+            exprs.append(defn.equation)
+            extent = 0
+        else:
+            defn = self._defn.fieldmap[name]
+            indices = defn.slice()
+            extent = ((1 << (indices.stop - indices.start)) - 1) << indices.start
+
+            if not raw and defn.dntoeu is not None:
+                exprs.extend((defn.dntoeu._equation, defn.dntoeu._when))
+            elif not raw and defn.expr is not None:
+                exprs.append(defn.expr)
+
+        exprs.append(defn.when)
+
+        for expr in exprs:
+            if not isinstance(expr, PacketExpression):
+                continue
+
+            for ref, ref_raw in expr.names:
+                if not (
+                    ref in ("raw", "history")
+                    or ref in self._defn.fieldmap
+                    or ref in self._defn.derivationmap
+                ):
+                    continue
+
+                ref_extent = self.extent(ref, ref_raw)
+                if ref_extent is None:
+                    return None
+
+                extent |= ref_extent
+
+        return extent
+
+    def accessor(self, name, raw=False):
+        """Returns a function that, given a Packet, returns the value of the
+        named field (or derivation, or special name "raw" or "history").
+
+        Fields of plain primitive types without guards or conversions
+        are decoded directly from the Packet data with a precompiled
+        :class:`struct.Struct`.  All other names are resolved via
+        :meth:`Packet._getattr`.
+        """
+        defn = self._defn.fieldmap.get(name, None)
+        converted = defn is not None and (
+            defn.dntoeu is not None or defn.expr is not None
+        )
+
+        if (
+            defn is None
+            or defn.when is not None
+            or (converted and not raw)
+            or not self._compilable(defn)
+        ):
+            return lambda packet: packet._getattr(name, raw)
+
+        unpack_from = struct.Struct(defn.type.format).unpack_from
+        offset = defn.slice().start
+        mask = defn.mask
+        shift = defn.shift
+        enum = None if raw else defn.enum
+
+        def access(packet):
+            value = unpack_from(packet._data, offset)[0]
+            if mask is not None:
+                value &= mask
+            if shift:
+                value >>= shift
+            if enum is not None:
+                value = enum.get(value, value)
+            return value
+
+        return access
+
+    def _batch_dtype(self, itemsize):
+        """Returns the NumPy structured dtype for packets of itemsize bytes.
+
+        Only numeric primitive fields (and arrays of them) are included.
+        All other fields are decoded per packet by :class:`PacketColumns`.
+        """
+        if itemsize not in self._batch:
+            names, formats, offsets = [], [], []
+
+            for defn in self._defn.fieldmap.values():
+                ftype = defn.type
+                shape = None
+
+                if isinstance(ftype, dtype.ArrayType):
+                    shape = (ftype.nelems,)
+                    ftype = ftype.type
+
+                if type(ftype) is not dtype.PrimitiveType or ftype.string:
+                    continue
+
+                format = numpy.dtype(ftype.format)
+                names.append(defn.name)
+                formats.append(format if shape is None else (format, shape))
+                offsets.append(defn.slice().start)
+
+            self._batch[itemsize] = numpy.dtype(
+                {
+                    "names": names,
+                    "formats": formats,
+                    "offsets": offsets,
+                    "itemsize": itemsize,
+                }
+            )
+
+        return self._batch[itemsize]
+
+    def columns(self, buffers, nbytes=None):
+        """Returns a :class:`PacketColumns` for a batch of packets, from
+        which field columns may be retrieved and PacketExpressions
+        evaluated over all packets at once.
+
+        The buffers may be either a single contiguous bytes-like object
+        containing back-to-back packets of nbytes each (default: the
+        Packet Definition size) or a sequence of equal-length packets.
+        """
+        if numpy is None:
+            raise ImportError("PacketDecoder.columns() requires NumPy")
+
+        if isinstance(buffers, (bytes, bytearray, memoryview)):
+            data = buffers
+            itemsize = self._defn.nbytes if nbytes is None else nbytes
+        else:
+            buffers = list(buffers)
+            itemsize = len(buffers[0]) if buffers else self._defn.nbytes
+
+            if any(len(buf) != itemsize for buf in buffers):
+                msg = "Packet '%s' batch decode requires equal-length packets."
+                raise ValueError(msg % self._defn.name)
+
+            data = b"".join(buffers)
+
+        if itemsize < self._defn.nbytes or len(data) % itemsize != 0:
+            msg = "Packet '%s' batch decode of %d bytes is not a multiple of "
+            msg += "%d-byte packets (minimum packet size is %d)."
+            values = self._defn.name, len(data), itemsize, self._defn.nbytes
+            raise ValueError(msg % values)
+
+        records = numpy.frombuffer(data, dtype=self._batch_dtype(itemsize))
+        return createPacketColumns(self, data, records)  # noqa
+
+    def decode_batch(self, buffers, raw=False, nbytes=None):
+        """Decodes many packets at once and returns a dictionary mapping
+        field names to NumPy arrays (columns), one element per packet.
+        See :meth:`columns` for the accepted buffers and
+        :class:`PacketColumns` for how values are computed.
+        """
+        columns = self.columns(buffers, nbytes)
+        return {name: columns.column(name, raw) for name in self._names}
+
+
+class PacketColumns:
+    """PacketColumns
+
+    PacketColumns compute field values for a batch of packets as NumPy
+    arrays (columns) and may be used as the symbol table when
+    evaluating PacketExpressions over those columns, much like a
+    PacketContext does for a single Packet.
+
+    Numeric fields are decoded from a NumPy structured array, with
+    masks, shifts, enumerations, DN to EU conversions, derivations and
+    ``when`` guards applied to whole columns.  Values for which a
+    ``when`` guard is False are masked (see :mod:`numpy.ma`).  Fields
+    or expressions that cannot be vectorized (e.g. complex types or
+    functions with conditional logic) are computed one packet at a
+    time, with the same results as :meth:`Packet._getattr`.
+
+    A PacketColumns should not be created directly.  Use
+    :meth:`PacketDecoder.columns`.
+    """
+
+    __slots__ = ["_cache", "_data", "_decoder", "_defn", "_records"]
+
+    def __init__(self, decoder, data, records):
+        self._decoder = decoder
+        self._defn = decoder._defn
+        self._data = data
+        self._records = records
+        self._cache = {False: {}, True: {}}
+
+    def __len__(self):
+        """Returns the number of packets in this batch."""
+        return len(self._records)
+
+    def __getitem__(self, name):
+        """Returns the column for name (used when evaluating expressions)."""
+        if name == "raw":
+            return createRawPacket(_RawColumns(self))  # noqa
+        elif name == "history":
+            return self._defn.history
+        elif name in self._defn.fieldmap or name in self._defn.derivationmap:
+            return self.column(name)
+        else:
+            msg = "Packet '%s' has no field '%s'"
+            raise KeyError(msg % (self._defn.name, name))
+
+    def _rows(self):
+        """Yields each packet in this batch as a Packet evaluation context."""
+        itemsize = self._records.dtype.itemsize
+        view = memoryview(self._data)
+
+        for start in range(0, len(self) * itemsize, itemsize):
+            yield self._decoder._context(view[start : start + itemsize])
+
+    def _objects(self, values):
+        """Returns the given per-packet values as a NumPy object array."""
+        result = numpy.empty(len(self), dtype=object)
+        for n, value in enumerate(values):
+            result[n] = value
+        return result
+
+    def _broadcast(self, value):
+        """Returns value as a column with one element per packet."""
+        value = numpy.asanyarray(value)
+        if value.ndim == 0:
+            value = numpy.full(len(self), value.item(), dtype=value.dtype)
+        return value
+
+    @staticmethod
+    def accessor(name, raw=False):
+        """Returns a function that, given a PacketColumns, returns the column
+        for the named field (or derivation, or special name "raw" or
+        "history").
+        """
+        if name == "raw":
+            return lambda columns: createRawPacket(_RawColumns(columns))  # noqa
+        elif name == "history":
+            return lambda columns: columns._defn.history
+        else:
+            return lambda columns: columns.column(name, raw)
+
+    @staticmethod
+    def symbols(defn):
+        """Returns the given Packet Definition's expression globals with
+        math functions replaced by their vectorized NumPy equivalents.
+        """
+        syms = dict(defn.globals)
+
+        for name in list(syms):
+            ufunc = getattr(numpy, name, None)
+            if isinstance(ufunc, numpy.ufunc):
+                syms[name] = ufunc
+
+        return syms
+
+    def _guard(self, expr):
+        """Returns a boolean column for the given ``when`` expression."""
+        return self._broadcast(self.eval(expr)).astype(bool)
+
+    def _mask(self, value, guard):
+        """Masks the values in column for which guard is False."""
+        if guard is None:
+            return value
+        return numpy.ma.masked_array(value, mask=~guard)
+
+    def _decode(self, defn, raw):
+        """Returns the decoded column for the given FieldDefinition."""
+        if defn.name not in self._records.dtype.names:
+            index = None
+            if isinstance(defn.type, dtype.ArrayType):
+                index = slice(0, defn.type.nelems)
+
+            return self._objects(
+                defn.decode(row._data, raw, index) for row in self._rows()
+            )
+
+        # Widen to native 64-bit values so that column arithmetic matches
+        # the Python int and float arithmetic of Packet._getattr().
+        value = self._records[defn.name]
+        if value.dtype.kind == "f":
+            value = value.astype(numpy.float64)
+        elif value.dtype.itemsize < 8 or value.dtype.kind == "i":
+            value = value.astype(numpy.int64)
+        else:
+            value = value.astype(numpy.uint64)
+
+        if defn.mask is not None:
+            value = value & defn.mask
+
+        if defn.shift > 0:
+            value = value >> defn.shift
+
+        if not raw and defn.enum is not None:
+            keys, inverse = numpy.unique(value, return_inverse=True)
+            enums = self._objects(defn.enum.get(key, key) for key in keys.tolist())
+            value = enums[inverse]
+
+        return value
+
+    def column(self, name, raw=False):
+        """Returns the column of values for the given field or derivation
+        name.
+
+        If raw is True, the field values are only decoded.  That is no
+        enumeration substituions or DN to EU conversions are applied.
+        """
+        cache = self._cache[bool(raw)]
+
+        if name not in cache:
+            if name in self._defn.derivationmap:
+                defn = self._defn.derivationmap[name]
+            else:
+                defn = self._defn.fieldmap[name]
+
+            guard = None if defn.when is None else self._guard(defn.when)
+
+            if isinstance(defn, DerivationDefinition):
+                value = self.eval(defn.equation, guard)
+            elif raw or (defn.dntoeu is None and defn.expr is None):
+                value = self._decode(defn, raw)
+            elif defn.dntoeu is not None:
+                dntoeu = defn.dntoeu
+                if dntoeu._when is not None:
+                    when = self._guard(dntoeu._when)
+                    guard = when if guard is None else guard & when
+                value = self.eval(dntoeu._equation, guard)
+            else:
+                value = self.eval(defn.expr, guard)
+
+            cache[name] = self._mask(value, guard)
+
+        return cache[name]
+
+    def eval(self, expr, guard=None):
+        """Returns the column resulting from evaluating the given
+        PacketExpression over this batch of packets.
+
+        If the expression cannot be evaluated over whole columns, it is
+        evaluated one packet at a time, skipping packets for which the
+        optional boolean guard column is False.
+        """
+        try:
+            func = expr.compile(self._defn, columns=True)
+            with numpy.errstate(all="raise", under="ignore"):
+                return self._broadcast(func(self))
+        except Exception:
+            rows = self._rows()
+
+            if guard is None:
+                return self._objects(expr.eval(row) for row in rows)
+
+            return self._objects(
+                expr.eval(row) if ok else None for row, ok in zip(rows, guard)
+            )
+
+
+class _RawColumns:
+    """Provides raw column access to RawPacket within PacketColumns."""
+
+    __slots__ = ["_columns"]
+
+    def __init__(self, columns):
+        self._columns = columns
+
+    def _getattr(self, fieldname, raw=False, index=None):
+        return self._columns.column(fieldname, raw)
+
+
 class PacketDefinition(json.SlotSerializer):
     """PacketDefinition"""
 
@@ -578,6 +1323,8 @@ class PacketDefinition(json.SlotSerializer):
         "name",
         "derivations",
         "derivationmap",
+        "_decoder",
+        "_graph",
     ]
 
     def __init__(self, *args, **kwargs):
@@ -616,6 +1363,8 @@ class PacketDefinition(json.SlotSerializer):
 
         self._update_globals()
         self._update_bytes(self.fields)
+        self._update_graph()
+        self._decoder = createPacketDecoder(self)  # noqa
 
     def __repr__(self):
         return util.toRepr(self)
@@ -624,13 +1373,14 @@ class PacketDefinition(json.SlotSerializer):
         return {
             name: getattr(self, name)
             for name in PacketDefinition.__slots__
-            if name != "globals"
+            if name not in ("globals", "_decoder", "_graph")
         }
 
     def __setstate__(self, state):
         for s in PacketDefinition.__slots__:
             setattr(self, s, state.get(s, None))
         self._update_globals()
+        self._update_graph()
 
     def _update_bytes(self, defns, start=0):
         """Updates the 'bytes' field in all FieldDefinition.
@@ -665,6 +1415,150 @@ class PacketDefinition(json.SlotSerializer):
             pos = fd.slice()
         return pos.stop
 
+    def _references(self, defn, raw):
+        """Returns the (name, raw) graph nodes directly referenced by the
+        given Field or Derivation Definition.
+        """
+        exprs = [defn.when]
+
+        if isinstance(defn, DerivationDefinition):
+            exprs.append(defn.equation)
+        elif not raw and defn.dntoeu is not None:
+            exprs.extend((defn.dntoeu._equation, defn.dntoeu._when))
+        elif not raw and defn.expr is not None:
+            exprs.append(defn.expr)
+
+        refs = []
+        for expr in exprs:
+            if not isinstance(expr, PacketExpression):
+                continue
+
+            for name, ref_raw in expr.names:
+                if name in self.fieldmap:
+                    refs.append((name, ref_raw))
+                elif name in self.derivationmap:
+                    refs.append((name, False))
+                elif name in ("history", "raw"):
+                    refs.append((name, False))
+
+        return tuple(dict.fromkeys(refs))
+
+    def _update_graph(self):
+        """Builds the dependency graph of fields, derivations and history
+        references in this Packet Definition.
+
+        Each graph node is a (name, raw) tuple mapped to the nodes it
+        references.  Nodes are ordered topologically, i.e. every node
+        follows its dependencies.  An error is logged for each field or
+        derivation that (indirectly) depends on itself, as it cannot be
+        evaluated.
+        """
+        edges = {("history", False): (), ("raw", False): ()}
+
+        for defn in self.fields:
+            for raw in (False, True):
+                edges[(defn.name, raw)] = self._references(defn, raw)
+
+        for defn in self.derivations:
+            edges[(defn.name, False)] = self._references(defn, False)
+
+        graph = {}
+        path = []
+
+        def visit(node):
+            if node in graph:
+                return
+            if node in path:
+                cycle = path[path.index(node) :] + [node]
+                names = " -> ".join(name for name, _ in cycle)
+                msg = f"Packet '{self.name}' has circular dependency: {names}"
+                log.error(msg)
+                return
+
+            path.append(node)
+            for ref in edges[node]:
+                visit(ref)
+            path.pop()
+            graph[node] = edges[node]
+
+        for node in edges:
+            visit(node)
+
+        self._graph = graph
+
+    def evaluate_derivations(self, packet, names=None):
+        """Evaluates the given derivation names (default: all derivations)
+        for the given Packet and returns a dictionary mapping each name
+        to its value.
+
+        Names may also refer to fields, but not to ``raw`` or
+        ``history``.  Only the fields and derivations the given names
+        depend on are computed, each exactly once and in dependency
+        order, so derivations that share (or are built on) other
+        derivations do not re-evaluate them.
+
+        Raises AttributeError if a name is not a field or derivation.
+        """
+        if names is None:
+            names = [defn.name for defn in self.derivations]
+
+        needed = set()
+        pending = []
+
+        for name in names:
+            if name in ("history", "raw"):
+                values = self.name, name
+                raise AttributeError("Packet '%s' has no field '%s'" % values)
+
+            packet._assert_field(name)
+            pending.append((name, False))
+
+        while pending:
+            node = pending.pop()
+            if node not in needed:
+                needed.add(node)
+                pending.extend(self._graph[node])
+
+        context = self.decoder._context(packet._data)
+        memo = _PacketValues()
+        object.__setattr__(context, "_cache", memo)
+
+        for name, raw in self._graph:
+            if (name, raw) in needed and name not in ("history", "raw"):
+                context._getattr(name, raw)
+
+        return {name: memo.values[(name, False)] for name in names}
+
+    @property
+    def decoder(self):
+        """The compiled :class:`PacketDecoder` for this Packet Definition."""
+        if self._decoder is None:
+            self._decoder = createPacketDecoder(self)  # noqa
+        return self._decoder
+
+    def decode_all(self, data, raw=False, packet=None):
+        """Decodes all fields in the given raw packet data according to
+        this Packet Definition and returns a dictionary mapping field
+        names to values.
+
+        If raw is True, no enumeration substitutions or DN to EU
+        conversions are applied.  If data is already wrapped by a
+        Packet, pass it as packet to use it as the context for DN to
+        EU conversions.
+        """
+        return self.decoder.decode(data, raw, packet)
+
+    def decode_batch(self, buffers, raw=False, nbytes=None):
+        """Decodes a batch of packets according to this Packet Definition
+        and returns a dictionary mapping field names to NumPy arrays.
+
+        The buffers may be a single contiguous bytes-like object of
+        back-to-back packets, each nbytes long (default: the size of
+        this Packet Definition), or a sequence of equal-length packets.
+        Requires NumPy.  See :meth:`PacketDecoder.decode_batch`.
+        """
+        return self.decoder.decode_batch(buffers, raw, nbytes)
+
     def _update_globals(self):
         if self.globals is None:
             self.globals = {}
@@ -756,12 +1650,15 @@ class PacketExpression:
 
     """
 
-    __slots__ = ["_code", "_expr"]
+    __slots__ = ["_code", "_compiled", "_expr", "_names", "_tree"]
 
     def __init__(self, expr):
         """Creates a new PacketExpression from the given string expression."""
-        self._code = compile(expr, "<string>", mode="eval")
+        self._tree = ast.parse(expr, "<string>", mode="eval")
+        self._code = compile(self._tree, "<string>", mode="eval")
         self._expr = expr
+        self._compiled = {}
+        self._names = None
 
     def __reduce__(self):
         """Pickles and Unpickles PacketExpressions.
@@ -779,10 +1676,94 @@ class PacketExpression:
     def __str__(self):
         return self._expr
 
+    @property
+    def names(self):
+        """The names referenced by this PacketExpression, as a list of
+        (name, raw) tuples.  References of the form ``raw.name`` have raw
+        set to True.  Names may refer to packet fields, derivations or
+        any other symbol (e.g. constants and functions).
+        """
+        if self._names is None:
+            names = []
+            skip = set()
+
+            for node in ast.walk(self._tree):
+                if (
+                    isinstance(node, ast.Attribute)
+                    and isinstance(node.value, ast.Name)
+                    and node.value.id == "raw"
+                ):
+                    names.append((node.attr, True))
+                    skip.add(node.value)
+                elif isinstance(node, ast.Name) and node not in skip:
+                    names.append((node.id, False))
+
+            self._names = list(dict.fromkeys(names))
+
+        return self._names
+
+    def compile(self, defn, columns=False):
+        """Returns this PacketExpression compiled into a Python function
+        specialized for the given Packet Definition.
+
+        The function takes a single Packet argument.  Each field name
+        referenced in the expression is resolved once, at compile time,
+        to a :meth:`PacketDecoder.accessor`, so evaluation does not go
+        through a PacketContext symbol table.
+
+        If columns is True, the function instead takes a
+        :class:`PacketColumns` argument and evaluates the expression
+        over NumPy columns, with math functions replaced by their NumPy
+        equivalents.
+        """
+        key = (defn, columns)
+
+        if key not in self._compiled:
+            if columns:
+                accessor = PacketColumns.accessor
+                syms = PacketColumns.symbols(defn)
+            else:
+                accessor = defn.decoder.accessor
+                syms = dict(defn.globals)
+
+            names = {"raw", "history"}
+            names.update(defn.fieldmap)
+            names.update(defn.derivationmap)
+
+            xform = _PacketExpressionTransformer(names, accessor, syms)
+            body = xform.visit(copy.deepcopy(self._tree.body))
+            args = ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=xform.ARG)],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            )
+            tree = ast.fix_missing_locations(
+                ast.Expression(body=ast.Lambda(args=args, body=body))
+            )
+
+            self._compiled[key] = eval(compile(tree, "<string>", mode="eval"), syms)
+
+        return self._compiled[key]
+
     def eval(self, packet):
         """Returns the result of evaluating this PacketExpression in the
         context of the given Packet.
         """
+        try:
+            result = self.compile(packet._defn)(packet)
+        except ZeroDivisionError:
+            result = None
+
+        return result
+
+    def interpret(self, packet):
+        """Returns the result of evaluating this PacketExpression in the
+        context of the given Packet, using a PacketContext as the symbol
+        table instead of a compiled function.  This is slower than
+        :meth:`eval` and is primarily useful as a reference.
+        """
         try:
             context = createPacketContext(packet)  # noqa
             result = eval(self._code, packet._defn.globals, context)
@@ -795,6 +1776,55 @@ class PacketExpression:
         return self._expr
 
 
+class _PacketExpressionTransformer(ast.NodeTransformer):
+    """Rewrites PacketExpression field name references (``name`` and
+    ``raw.name``) into calls to precomputed accessor functions, which
+    are added to the given symbol table.
+    """
+
+    ARG = "__ait_packet"
+
+    def __init__(self, names, accessor, syms):
+        self._names = names
+        self._accessor = accessor
+        self._syms = syms
+        self._symbols = {}
+
+    def _access(self, node, name, raw):
+        key = (name, raw)
+
+        if key not in self._symbols:
+            symbol = "__ait_%d" % len(self._symbols)
+            self._syms[symbol] = self._accessor(name, raw)
+            self._symbols[key] = symbol
+
+        call = ast.Call(
+            func=ast.Name(id=self._symbols[key], ctx=ast.Load()),
+            args=[ast.Name(id=self.ARG, ctx=ast.Load())],
+            keywords=[],
+        )
+        return ast.copy_location(call, node)
+
+    def visit_Attribute(self, node):  # noqa
+        value = node.value
+        if (
+            isinstance(node.ctx, ast.Load)
+            and isinstance(value, ast.Name)
+            and value.id == "raw"
+            and node.attr in self._names
+            and node.attr not in ("raw", "history")
+        ):
+            return self._access(node, node.attr, True)
+
+        return self.generic_visit(node)
+
+    def visit_Name(self, node):  # noqa
+        if isinstance(node.ctx, ast.Load) and node.id in self._names:
+            return self._access(node, node.id, False)
+
+        return node
+
+
 class PacketFunction:
     """PacketFunction"""
 
@@ -888,11 +1918,37 @@ class PacketFunction:
 
 
 class PacketHistory:
-    """PacketHistory"""
+    """PacketHistory
+
+    A PacketHistory holds the most recent value of selected fields (or
+    derivations) of a Packet Definition, available to PacketExpressions
+    as ``history.fieldname``.
+
+    Fields decoded directly from packet data are decoded lazily.  Adding
+    a Packet only keeps a copy of its data, which is decoded the next
+    time such a field is read.  Other names (DN to EU conversions,
+    derivations, and names with a ``when`` guard) keep their previous
+    value whenever they evaluate to None, or may accumulate over
+    packets, so they are decoded as each Packet is added.
+
+    If maxlen is set, the raw data of the last maxlen Packets is also
+    kept in a NumPy ring buffer, from which :meth:`values` decodes the
+    recent values of a field all at once.  Requires NumPy.
+    """
 
-    __slots__ = ["_defn", "_dict", "_names"]
+    __slots__ = [
+        "_count",
+        "_defn",
+        "_dict",
+        "_eager",
+        "_latest",
+        "_maxlen",
+        "_names",
+        "_read",
+        "_ring",
+    ]
 
-    def __init__(self, defn, names=None):
+    def __init__(self, defn, names=None, maxlen=None):
         if names is None and defn.history is not None:
             names = defn.history
 
@@ -902,6 +1958,13 @@ class PacketHistory:
         self._defn = defn
         self._names = names
         self._dict = {name: 0 for name in names}
+        self._eager = None
+        self._latest = None
+        self._read = set(names)
+        self._maxlen = None
+        self._ring = None
+        self._count = 0
+        self.maxlen = maxlen
 
     def __contains__(self, fieldname):
         """Returns True if fieldname is in this PacketHistory."""
@@ -910,15 +1973,20 @@ class PacketHistory:
     def __getattr__(self, fieldname):
         """Returns the value of the given packet field name."""
         self._assert_field(fieldname)
-        return self._dict.get(fieldname, None)
+        return self._get(fieldname)
 
     def __getitem__(self, fieldname):
         """Returns packet.fieldname"""
-        return self._dict.get(fieldname, None)
+        return self._get(fieldname) if fieldname in self._names else None
 
     def __getstate__(self):
         """Serialize state, avoiding __getattr__()."""
-        return {s: getattr(self, s) for s in PacketHistory.__slots__}
+        for name in self._names:
+            self._get(name)
+
+        state = {s: getattr(self, s) for s in PacketHistory.__slots__}
+        state["_latest"] = None
+        return state
 
     def __setstate__(self, state):
         """Deserialize state, avoiding __getattr__()."""
@@ -934,12 +2002,103 @@ class PacketHistory:
             values = self._defn.name, name
             raise AttributeError(msg % values)
 
+    def _lazy(self, name):
+        """Returns True if the value of the given field or derivation name
+        may be decoded lazily, False otherwise.
+
+        Only fields decoded directly from packet data, which are never
+        None, are lazy.  Values evaluated from expressions (DN to EU
+        conversions, derivations, or ``when`` guards) may be None, in
+        which case the previous value is kept, so they must be decoded
+        as each Packet is added.
+        """
+        defn = self._defn.fieldmap.get(name)
+        return (
+            defn is not None
+            and defn.when is None
+            and defn.dntoeu is None
+            and defn.expr is None
+        )
+
+    def _get(self, name):
+        """Returns the value of the given name, first decoding it from the
+        most recently added Packet data, if not yet read.
+        """
+        if name not in self._read:
+            self._read.add(name)
+            self._set(self._defn.decoder._context(self._latest), name)
+
+        return self._dict.get(name, None)
+
+    def _set(self, packet, name):
+        value = getattr(packet, name)
+        if value is not None:
+            self._dict[name] = value
+
+    @property
+    def maxlen(self):
+        """The number of Packets kept in the ring buffer, or None if
+        disabled.  Setting maxlen clears the ring buffer.
+        """
+        return self._maxlen
+
+    @maxlen.setter
+    def maxlen(self, value):
+        if value is not None and numpy is None:
+            raise ImportError("PacketHistory maxlen requires NumPy")
+
+        self._maxlen = value
+        self._ring = None
+        self._count = 0
+
     def add(self, packet):
         """Add the given Packet to this PacketHistory."""
-        for name in self._names:
-            value = getattr(packet, name)
-            if value is not None:
-                self._dict[name] = value
+        if self._eager is None:
+            self._eager = [name for name in self._names if not self._lazy(name)]
+
+        for name in self._eager:
+            self._set(packet, name)
+
+        # Packets may wrap a mutable buffer without copying, so snapshot
+        # it to keep lazily decoded values as of this add.
+        self._latest = bytes(packet._data)
+        self._read.clear()
+        self._read.update(self._eager)
+
+        if self._maxlen:
+            nbytes = self._defn.nbytes
+
+            if self._ring is None:
+                self._ring = numpy.zeros((self._maxlen, nbytes), dtype=numpy.uint8)
+
+            data = packet._data[:nbytes]
+            row = self._ring[self._count % self._maxlen]
+            row[: len(data)] = numpy.frombuffer(data, dtype=numpy.uint8)
+            row[len(data) :] = 0
+            self._count += 1
+
+    def values(self, fieldname, raw=False):
+        """Returns the values of the given field or derivation name in the
+        last :attr:`maxlen` Packets added, oldest first, as a NumPy
+        array.  See :meth:`PacketColumns.column`.
+        """
+        self._assert_field(fieldname)
+
+        if not self._maxlen:
+            msg = 'PacketHistory "%s" has no ring buffer (maxlen is not set)'
+            raise ValueError(msg % self._defn.name)
+
+        nbytes = self._defn.nbytes
+
+        if self._ring is None:
+            rows = b""
+        elif self._count <= self._maxlen:
+            rows = self._ring[: self._count].tobytes()
+        else:
+            start = self._count % self._maxlen
+            rows = numpy.roll(self._ring, -start, axis=0).tobytes()
+
+        return self._defn.decoder.columns(rows, nbytes).column(fieldname, raw)
 
     def toJSON(self):  # noqa
         return self._names
@@ -1001,6 +2160,13 @@ class TlmDict(dict):
         """Creates a new packet with the given definition and raw data."""
         return createPacket(self[name], data) if name in self else None  # noqa
 
+    def decode_batch(self, name, buffers, raw=False, nbytes=None):
+        """Decodes a batch of packets with the given definition name into
+        a dictionary of NumPy columns.  See
+        :meth:`PacketDefinition.decode_batch`.
+        """
+        return self[name].decode_batch(buffers, raw, nbytes)
+
     def load(self, content):
         """Loads Packet Definitions from the given YAML content into this
         Telemetry Dictionary.  Content may be either a filename
@@ -1012,22 +2178,151 @@ class TlmDict(dict):
         if self.filename is None:
             if os.path.isfile(content):
                 self.filename = content
-                stream = open(self.filename, "rb")
+                pkts = util.load_yaml(self.filename)
             else:
-                stream = content
+                pkts = yaml.safe_load(content)
 
-            pkts = yaml.safe_load(stream)
             pkts = handle_includes(pkts)
             for pkt in pkts:
                 self.add(pkt)
 
-            if isinstance(stream, IOBase):
-                stream.close()
-
     def toJSON(self):  # noqa
         return {name: defn.toJSON() for name, defn in self.items()}
 
 
+class PacketLayout:
+    """PacketLayout
+
+    Layout metadata precomputed for a single Packet Definition: its
+    uid, name, CCSDS APID (if any), size in bytes, decoder and the
+    byte slice of each field.
+    """
+
+    __slots__ = ["apid", "decoder", "defn", "fields", "name", "nbytes", "uid"]
+
+    def __init__(self, defn):
+        """Creates a new PacketLayout for the given PacketDefinition."""
+        self.defn = defn
+        self.uid = defn.uid
+        self.name = defn.name
+        self.apid = defn.ccsds.apid if defn.ccsds else None
+        self.nbytes = defn.nbytes
+        self.decoder = defn.decoder
+        self.fields = {fd.name: fd.slice() for fd in defn.fields}
+
+    def __repr__(self):
+        return f"PacketLayout({self.name}, uid={self.uid}, nbytes={self.nbytes})"
+
+
+class _TlmRegistryIndex:
+    """An immutable snapshot of a Telemetry Dictionary indexed by uid,
+    name and APID.  A TlmRegistry swaps whole snapshots on reload so
+    readers never observe a partially built index.
+    """
+
+    __slots__ = ["apids", "layouts", "names", "tlmdict", "uids", "version"]
+
+    def __init__(self, tlmdict, version):
+        self.tlmdict = tlmdict
+        self.version = version
+        self.names = dict(tlmdict)
+        self.uids = {}
+        self.apids = {}
+        self.layouts = {}
+
+        for defn in tlmdict.values():
+            if defn.uid in self.uids:
+                log.warn(
+                    "Packets '%s' and '%s' share uid %d",
+                    self.uids[defn.uid].name,
+                    defn.name,
+                    defn.uid,
+                )
+            self.uids[defn.uid] = defn
+            self.layouts[defn.uid] = layout = createPacketLayout(defn)  # noqa
+            if layout.apid is not None:
+                self.apids[layout.apid] = defn
+
+
+class TlmRegistry:
+    """TlmRegistry
+
+    A versioned registry of Packet Definitions with O(1) lookups by
+    uid, name and CCSDS APID, plus precomputed
+    :class:`PacketLayout` metadata.  Plugins and handlers resolve
+    packet uids through the default registry (see
+    :func:`getDefaultRegistry`) rather than building their own maps.
+
+    Indexing a registry (``registry[uid]``) returns the
+    PacketDefinition for the given uid.  :meth:`swap` atomically
+    replaces the underlying dictionary and increments
+    :attr:`version`.
+    """
+
+    __slots__ = ["_index"]
+
+    def __init__(self, tlmdict=None):
+        """Creates a new TlmRegistry for the given Telemetry Dictionary."""
+        self._index = _TlmRegistryIndex(TlmDict() if tlmdict is None else tlmdict, 1)
+
+    def __contains__(self, uid):
+        return uid in self._index.uids
+
+    def __getitem__(self, uid):
+        return self._index.uids[uid]
+
+    def __iter__(self):
+        return iter(self._index.uids)
+
+    def __len__(self):
+        return len(self._index.uids)
+
+    @property
+    def tlmdict(self):
+        """The Telemetry Dictionary currently indexed by this registry."""
+        return self._index.tlmdict
+
+    @property
+    def version(self):
+        """Incremented each time the registry is swapped."""
+        return self._index.version
+
+    def get(self, uid, default=None):
+        """Returns the PacketDefinition for uid or default."""
+        return self._index.uids.get(uid, default)
+
+    def by_apid(self, apid, default=None):
+        """Returns the PacketDefinition with the given CCSDS APID or
+        default.
+        """
+        return self._index.apids.get(apid, default)
+
+    def by_name(self, name, default=None):
+        """Returns the PacketDefinition with the given name or default."""
+        return self._index.names.get(name, default)
+
+    def keys(self):
+        return self._index.uids.keys()
+
+    def items(self):
+        return self._index.uids.items()
+
+    def values(self):
+        return self._index.uids.values()
+
+    def layout(self, uid, default=None):
+        """Returns the :class:`PacketLayout` for uid or default."""
+        return self._index.layouts.get(uid, default)
+
+    def swap(self, tlmdict):
+        """Atomically replaces the indexed Telemetry Dictionary with
+        tlmdict and returns the new version.
+        """
+        index = _TlmRegistryIndex(tlmdict, self._index.version + 1)
+        self._index = index
+        return index.version
+
+
 class TlmDictWriter:
     """TlmDictWriter
 
@@ -1091,8 +2386,33 @@ class TlmDictWriter:
                     csvwriter.writerow(row)
 
 
+# Reset on module reload so definitions of stale classes are not reused.
+DefaultDict = None
+DefaultRegistry = None
+
+
 def getDefaultDict(reload=False):  # noqa
-    return util.getDefaultDict(__name__, "tlmdict", TlmDict, reload)
+    tlmdict = util.getDefaultDict(__name__, "tlmdict", TlmDict, reload)
+
+    if reload and DefaultRegistry is not None:
+        DefaultRegistry.swap(tlmdict)
+
+    return tlmdict
+
+
+def getDefaultRegistry(reload=False):  # noqa
+    """Returns the default :class:`TlmRegistry`, indexing the default
+    Telemetry Dictionary.  The same registry object is returned across
+    reloads; reloading swaps its contents in place.
+    """
+    global DefaultRegistry
+
+    if DefaultRegistry is None:
+        DefaultRegistry = createTlmRegistry(getDefaultDict(reload))  # noqa
+    elif reload:
+        getDefaultDict(reload)
+
+    return DefaultRegistry
 
 
 def getDefaultSchema():  # noqa
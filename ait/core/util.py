@@ -16,6 +16,7 @@ AIT Utilities
 
 The ait.core.util module provides general utility functions.
 """
+import hashlib
 import os
 import pydoc
 import stat
@@ -25,6 +26,9 @@ import time
 import warnings
 import zlib
 
+import msgpack
+import yaml
+
 import ait
 from ait.core import log
 
@@ -120,6 +124,226 @@ def check_yaml_timestamps(yaml_file_name, cache_file_name):
     return False
 
 
+# YAMLCacheVersion
+#
+# Version of the on-disk YAML cache format.  Increment to invalidate
+# all existing cache files.
+#
+YAMLCacheVersion = 2
+
+# Loader used to parse YAML files on a cache miss (LibYAML, if available)
+YAMLCacheLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class _YAMLTagged(object):
+    """A YAML tagged value (e.g. '!Packet'), recorded but not yet
+    constructed."""
+
+    __slots__ = ["tag", "value"]
+
+    def __init__(self, tag, value):
+        self.tag = tag
+        self.value = value
+
+
+class _YAMLReplayNode(object):
+    """Stands in for both the YAML loader and node passed to a YAML
+    constructor when replaying a tagged value from the YAML cache."""
+
+    __slots__ = ["name", "tag", "value"]
+
+    def __init__(self, name, tag, value):
+        self.name = name
+        self.tag = tag
+        self.value = value
+
+    def construct_mapping(self, node, deep=False):
+        return node.value
+
+    construct_scalar = construct_sequence = construct_mapping
+
+
+def _yaml_digest(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _yaml_file_digest(filename):
+    with open(filename, "rb") as stream:
+        return _yaml_digest(stream.read())
+
+
+def _yaml_record(filename, data, depends, all_documents):
+    """Parses the given YAML data (read from filename), recording tagged
+    values and resolving '!include's.  The absolute path and content
+    digest of each included file are appended to depends.
+    """
+
+    class Recorder(YAMLCacheLoader):
+        yaml_constructors = YAMLCacheLoader.yaml_constructors.copy()
+
+    def record(loader, node):
+        if isinstance(node, yaml.MappingNode):
+            value = loader.construct_mapping(node, deep=True)
+        elif isinstance(node, yaml.SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_scalar(node)
+        return _YAMLTagged(node.tag, value)
+
+    def include(loader, node):
+        name = os.path.join(os.path.dirname(filename), node.value)
+        with open(name, "rb") as stream:
+            content = stream.read()
+        depends.append([os.path.abspath(name), _yaml_digest(content)])
+        return _yaml_record(name, content, depends, False)
+
+    for tag in yaml.SafeLoader.yaml_constructors:
+        if tag is not None and tag.startswith("!"):
+            Recorder.add_constructor(tag, record)
+
+    Recorder.add_constructor("!include", include)
+
+    if all_documents:
+        return list(yaml.load_all(data, Loader=Recorder))
+
+    return yaml.load(data, Loader=Recorder)
+
+
+def _yaml_pack(value):
+    if isinstance(value, _YAMLTagged):
+        data = msgpack.packb([value.tag, value.value], default=_yaml_pack)
+        return msgpack.ExtType(1, data)
+
+    raise TypeError("Cannot cache YAML value of type %s" % type(value))
+
+
+def _yaml_unpack(filename, data):
+    """Unpacks cached YAML data, constructing each tagged value with
+    the YAML constructor currently registered for its tag.
+    """
+
+    def construct(code, data):
+        tag, value = msgpack.unpackb(
+            data, ext_hook=construct, strict_map_key=False, use_list=True
+        )
+        if tag not in yaml.SafeLoader.yaml_constructors:
+            msg = "could not determine a constructor for the tag %r" % tag
+            raise yaml.constructor.ConstructorError(None, None, msg)
+
+        node = _YAMLReplayNode(filename, tag, value)
+        return yaml.SafeLoader.yaml_constructors[tag](node, node)
+
+    return msgpack.unpackb(data, ext_hook=construct, strict_map_key=False)
+
+
+def getYAMLCacheDirectory():  # noqa
+    """
+    Returns the directory in which parsed YAML files are cached, or
+    None if caching is disabled (``cache.enabled: false`` in
+    ``config.yaml``).  The directory defaults to ``~/.cache/ait``
+    and may be set via ``cache.directory``.
+    """
+    if not ait.config.get("cache.enabled", True):
+        return None
+
+    default = os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.join("~", ".cache")), "ait"
+    )
+    return expandPath(ait.config.get("cache.directory", default))
+
+
+def load_yaml(filename, all_documents=False):
+    """
+    Loads and returns the YAML content of filename (or a list of each
+    YAML document in filename, if all_documents is True), resolving
+    '!include's.
+
+    The parsed content is cached on disk in a compact binary (MessagePack)
+    form.  Only plain YAML values and tagged values (e.g. '!Packet') are
+    cached, not Python objects.  Tagged values are constructed anew, by
+    their registered YAML constructors, on every load.  There is one
+    cache file per path of filename, named by its hash, which is valid
+    until the content of filename or any file it includes changes and is
+    then replaced.  On a cache miss, YAML is parsed with the LibYAML
+    loader, if available.
+
+    See :func:`getYAMLCacheDirectory`.
+    """
+    directory = getYAMLCacheDirectory()
+
+    if directory is None:
+        return _yaml_safe_load(filename, all_documents)
+
+    with open(filename, "rb") as stream:
+        content = stream.read()
+
+    # Cache files are named by path, not content, so that a changed
+    # file replaces its previous cache file rather than adding another.
+    key = "%s:%s" % (os.path.abspath(filename), all_documents)
+    cachename = os.path.join(directory, _yaml_digest(key.encode()) + ".msgpack")
+    digest = _yaml_digest(content)
+
+    data = None
+
+    try:
+        with open(cachename, "rb") as stream:
+            version, cached, depends, data = msgpack.unpackb(stream.read())
+
+        if (
+            version != YAMLCacheVersion
+            or cached != digest
+            or any(_yaml_file_digest(name) != expected for name, expected in depends)
+        ):
+            data = None
+    except FileNotFoundError:
+        data = None
+    except Exception as e:
+        log.warn('Ignoring invalid YAML cache "%s": %s' % (cachename, e))
+        data = None
+
+    if data is None:
+        depends = []
+        value = _yaml_record(filename, content, depends, all_documents)
+
+        try:
+            data = msgpack.packb(value, default=_yaml_pack)
+        except TypeError as e:
+            # E.g. YAML timestamps, which MessagePack cannot represent.
+            log.debug('Not caching "%s": %s' % (filename, e))
+            return _yaml_safe_load(filename, all_documents)
+
+        _yaml_write(
+            cachename, msgpack.packb([YAMLCacheVersion, digest, depends, data])
+        )
+
+    return _yaml_unpack(filename, data)
+
+
+def _yaml_safe_load(filename, all_documents):
+    """Loads filename with the (uncached) PyYAML SafeLoader."""
+    with open(filename, "rb") as stream:
+        if all_documents:
+            return list(yaml.safe_load_all(stream))
+        return yaml.safe_load(stream)
+
+
+def _yaml_write(cachename, data):
+    """Atomically writes data to the YAML cache file cachename."""
+    directory = os.path.dirname(cachename)
+    tmpname = None
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as stream:
+            stream.write(data)
+        os.replace(tmpname, cachename)
+    except OSError as e:
+        log.warn('Could not write YAML cache "%s": %s' % (cachename, e))
+        if tmpname is not None and os.path.exists(tmpname):
+            os.remove(tmpname)
+
+
 def __init_extensions__(modname, modsyms):  # noqa
     """
     Initializes a module (given its name and :func:`globals()` symbol
@@ -248,7 +472,8 @@ def getDefaultDict(modname, config_key, loader, reload=False, filename=None):  #
     Returns default AIT dictionary for modname
 
     This helper function encapulates the core logic necessary to
-    (re)load and return the default dictionary.
+    (re)load and return the default dictionary.  Dictionaries load
+    their YAML via :func:`load_yaml`, which caches it on disk.
     For example, in ait.core.cmd:
 
     def getDefaultDict(reload=False):
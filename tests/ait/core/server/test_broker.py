@@ -0,0 +1,42 @@
+from unittest import mock
+
+import gevent
+import zmq.green as zmq
+
+import ait.core
+from ait.core.server.broker import Broker
+
+
+def test_proxy_mode_forwards_and_stops():
+    config = {
+        "server.broker.mode": "proxy",
+        "server.xsub": "inproc://test-broker-xsub",
+        "server.xpub": "inproc://test-broker-xpub",
+    }
+
+    with mock.patch.object(ait.config, "get", side_effect=config.get):
+        broker = Broker()
+    broker.inbound_streams = []
+    broker.outbound_streams = []
+    broker.plugins = []
+    broker.start()
+    gevent.sleep(0.1)
+
+    pub = broker.context.socket(zmq.PUB)
+    pub.connect(broker.XSUB_URL)
+    sub = broker.context.socket(zmq.SUB)
+    sub.connect(broker.XPUB_URL)
+    sub.setsockopt_string(zmq.SUBSCRIBE, "topic")
+    gevent.sleep(0.1)
+
+    pub.send_multipart([b"topic", b"data"])
+    with gevent.Timeout(2):
+        assert sub.recv_multipart() == [b"topic", b"data"]
+
+    broker.stop()
+    with gevent.Timeout(2):
+        broker.join()
+    assert broker.control is None
+
+    pub.close()
+    sub.close()
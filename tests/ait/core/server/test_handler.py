@@ -2,6 +2,7 @@ import unittest
 from unittest import mock
 
 from ait.core import tlm
+from ait.core.server.handler import Handler
 from ait.core.server.handlers import CCSDSPacketHandler
 from ait.core.server.handlers import PacketHandler
 
@@ -45,6 +46,35 @@ class TestCCSDSPacketCheck(unittest.TestCase):
         self.assertEqual(packet_uid, result[0])
 
 
+    # Check wildcard APIDs, config order and drop counters
+    def test_ccsds_apid_table(self):
+        handler = CCSDSPacketHandler(
+            packet_types={
+                "01011100111": "CCSDS_HEADER",
+                "XXXXXXXX111": "1553_HS_Packet",
+            }
+        )
+        tlm_dict = tlm.getDefaultDict()
+
+        result = handler.handle(bytearray(b"\x02\xE7\x40\x00\x00\x00\x01"))
+        self.assertEqual(tlm_dict["CCSDS_HEADER"].uid, result[0])
+        self.assertIsInstance(result[1], memoryview)
+        self.assertEqual(b"\x01", result[1])
+
+        result = handler.handle(bytearray(b"\x00\x07\x40\x00\x00\x00\x01"))
+        self.assertEqual(tlm_dict["1553_HS_Packet"].uid, result[0])
+
+        with self.assertLogs("ait", level="INFO"):
+            handler.handle(bytearray(b"\x00\x06\x40\x00\x00\x00\x01"))
+            handler.handle(bytearray(b"\x00\x07\x40\x00\x00\x0F\x01"))
+            handler.handle(bytearray(b"\x00"))
+        self.assertEqual({6: 1}, handler.unknown_counts)
+        self.assertEqual({7: 1, None: 1}, handler.short_counts)
+
+        with self.assertRaises(ValueError):
+            CCSDSPacketHandler(packet_types={"0101110011": "CCSDS_HEADER"})
+
+
 class TestHandlerClassWithInputOutputTypes(object):
     handler = PacketHandler(packet="CCSDS_HEADER", input_type="int", output_type="str")
 
@@ -117,3 +147,29 @@ class TestCCSDSHandlerClassWithoutInputOutputTypes(object):
 
     def test_handler_repr(self):
         assert self.handler.__repr__() == "<handler.CCSDSPacketHandler>"
+
+
+class TestHandleBatch(unittest.TestCase):
+    def test_packet_handler_batch(self):
+        handler = PacketHandler(packet="CCSDS_HEADER")
+        uid = tlm.getDefaultDict()["CCSDS_HEADER"].uid
+        assert handler.handle_batch([b"a", b"b"]) == [(uid, b"a"), (uid, b"b")]
+
+    def test_ccsds_handler_batch(self):
+        handler = CCSDSPacketHandler(packet_types={"01011100111": "CCSDS_HEADER"})
+        uid = tlm.getDefaultDict()["CCSDS_HEADER"].uid
+        good = bytearray(b"\x02\xE7\x40\x00\x00\x00\x01")
+        short = bytearray(b"\x02\xE7\x40\x00\x00\x00")
+
+        with self.assertLogs("ait", level="INFO") as cm:
+            outputs = handler.handle_batch([good, short, short, good])
+
+        assert outputs == [(uid, b"\x01"), (uid, b"\x01")]
+        assert len(cm.output) == 1
+        self.assertIn("Dropped 2 of 4 packets", cm.output[0])
+
+    def test_default_handle_batch(self):
+        handler = PacketHandler(packet="CCSDS_HEADER")
+
+        with mock.patch.object(handler, "handle", side_effect=[None, "b"]):
+            assert Handler.handle_batch(handler, ["a", "b"]) == ["b"]
@@ -193,6 +193,46 @@ def test_tuple(serializer):
     assert nested_tup == decoded
 
 
+def test_telemetry_frames(serializer):
+    """
+    Test case for (uid, packet bytes) tuples, which are sent as a header
+    frame and the packet bytes rather than through msgpack.
+    """
+    data = b"\x01\x02\x03"
+
+    frames = serializer.serialize_frames((42, data))
+    assert len(frames) == 2
+    assert frames[1] is data
+
+    uid, decoded = serializer.deserialize_frames(frames)
+    assert uid == 42
+    assert isinstance(decoded, memoryview)
+    assert decoded == data
+
+    # Other tuples still go through msgpack
+    frames = serializer.serialize_frames((42, "data"))
+    assert len(frames) == 1
+    assert serializer.deserialize_frames(frames) == (42, "data")
+
+    with pytest.raises(ValueError):
+        serializer.deserialize_frames([b"header", data])
+
+    # Mutable buffers are copied, as the caller may reuse them
+    buf = bytearray(data)
+    frames = serializer.serialize_frames((42, buf))
+    buf[0] = 0xFF
+    assert frames[1] == data and type(frames[1]) is bytes
+
+    # Telemetry may be sent as a single msgpack frame, as before
+    serializer.telemetry_frames = False
+    try:
+        frames = serializer.serialize_frames((42, data))
+        assert len(frames) == 1
+        assert serializer.deserialize_frames(frames) == (42, data)
+    finally:
+        serializer.telemetry_frames = True
+
+
 def test_json(serializer):
     """
     Test case for class that serializes to JSON and deserializes
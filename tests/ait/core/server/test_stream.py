@@ -1,9 +1,11 @@
 from unittest import mock
 
+import gevent
 import pytest
 import zmq.green
 
 import ait.core
+import ait.core.server.utils
 from ait.core.server.broker import Broker
 from ait.core.server.handlers import PacketHandler
 from ait.core.server.stream import ZMQStream
@@ -67,3 +69,94 @@ class TestStream:
                 ],
                 zmq_args={"zmq_context": self.broker.context},
             )
+
+
+class TestStreamBatching:
+    def setup_method(self):
+        self.broker = Broker()
+        self.stream = ZMQStream(
+            "some_stream",
+            ["input_stream"],
+            [],
+            zmq_args={"zmq_context": self.broker.context},
+        )
+        self.stream.batch_size = 3
+        self.stream.batch_budget = 2
+
+    def test_drain_batches(self):
+        pending = [
+            ait.core.server.utils.encode_message("input_stream", n) for n in range(7)
+        ]
+
+        def recv_multipart(flags=0, copy=True):
+            if pending:
+                return pending.pop(0)
+            if flags & zmq.green.NOBLOCK:
+                raise zmq.green.Again()
+            raise StopIteration()
+
+        self.stream.sub = mock.Mock()
+        self.stream.sub.recv_multipart.side_effect = recv_multipart
+
+        with mock.patch.object(self.stream, "process_batch") as process_batch:
+            with pytest.raises(StopIteration):
+                self.stream._run()
+
+        batches = [c[0][0] for c in process_batch.call_args_list]
+        assert [[m for m, _ in b] for b in batches] == [[0, 1, 2], [3, 4, 5], [6]]
+        assert all(t == "input_stream" for b in batches for _, t in b)
+
+    def test_process_batch_default(self):
+        with mock.patch.object(self.stream, "process") as process:
+            self.stream.process_batch([(1, "a"), (2, "b")])
+
+        assert process.call_args_list == [
+            mock.call(1, topic="a"),
+            mock.call(2, topic="b"),
+        ]
+
+    def test_batch_by_count(self):
+        self.stream.handlers = [PacketHandler(packet="CCSDS_HEADER")]
+        self.stream.batch_count = 3
+        uid = self.stream.handlers[0]._pkt_defn.uid
+
+        with mock.patch.object(self.stream, "publish") as publish:
+            self.stream.process(b"1")
+            self.stream.process_batch([(b"2", "a"), (b"3", "a")])
+            self.stream.process(b"4")
+
+            assert publish.call_args_list == [
+                mock.call((uid, b"1")),
+                mock.call((uid, b"2")),
+                mock.call((uid, b"3")),
+            ]
+            assert self.stream._batch == [b"4"]
+
+    def test_batch_by_latency(self):
+        self.stream.handlers = [PacketHandler(packet="CCSDS_HEADER")]
+        self.stream.batch_count = 10
+        self.stream.batch_latency = 0.01
+
+        with mock.patch.object(self.stream, "publish") as publish:
+            self.stream.process(b"1")
+            assert publish.call_count == 0
+
+            gevent.sleep(0.05)
+            assert publish.call_count == 1
+            assert self.stream._batch == []
+
+    def test_batch_flushed_on_stop(self):
+        self.stream.handlers = [PacketHandler(packet="CCSDS_HEADER")]
+        self.stream.batch_count = 10
+        self.stream.batch_latency = 60
+
+        with mock.patch.object(self.stream, "publish") as publish:
+            self.stream.start()
+            gevent.sleep(0)
+            self.stream.process(b"1")
+            timer = self.stream._batch_timer
+
+            self.stream.kill()
+            assert publish.call_count == 1
+            assert self.stream._batch == []
+            assert timer.dead
@@ -14,7 +14,11 @@
 import datetime as dt
 import inspect
 import os.path
+import re
+import shutil
 import sqlite3
+import tempfile
+import time
 import unittest
 from unittest import mock
 
@@ -209,6 +213,139 @@ class TestInfluxDBBackend(unittest.TestCase):
 
         os.remove(self.test_yaml_file)
 
+    def test_influx_insert_batched(self):
+        class ClientError(Exception):
+            pass
+
+        with mock.patch("importlib.import_module"):
+            sqlbackend = db.InfluxDBBackend()
+        sqlbackend._backend = mock.MagicMock()
+        sqlbackend._backend.exceptions.InfluxDBClientError = ClientError
+        sqlbackend._conn = mock.MagicMock()
+        sqlbackend._batch_size = 3
+        sqlbackend._flush_interval = 60
+        sqlbackend._retry_delay = 0
+
+        pkt = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+
+        sqlbackend.insert(pkt)
+        time.sleep(0.001)
+        sqlbackend.insert(pkt)
+        time.sleep(0.001)
+        assert not sqlbackend._conn.write_points.called
+        assert sqlbackend.pending == 2
+        assert not sqlbackend.background_flush
+
+        sqlbackend.insert(pkt)
+        assert sqlbackend._conn.write_points.call_count == 1
+        points = sqlbackend._conn.write_points.call_args[0][0]
+        assert len(points) == 3
+        assert sqlbackend.pending == 0
+        sqlbackend._conn.reset_mock()
+
+        # Same-type points in one batch are stamped when buffered, so
+        # InfluxDB does not give them one write time and overwrite them
+        times = [point["time"] for point in points]
+        assert all(times) and len(set(times)) == 3
+
+        # Failed writes are retried, waiting without the gevent hub
+        sqlbackend._conn.write_points.side_effect = [IOError("down"), None]
+        sqlbackend.insert(pkt)
+        with mock.patch.object(sqlbackend, "_closed") as closed:
+            with mock.patch("gevent.sleep") as sleep:
+                sqlbackend.flush()
+            assert closed.wait.called and not sleep.called
+        assert sqlbackend._conn.write_points.call_count == 2
+        assert sqlbackend.dropped == 0
+        sqlbackend._conn.reset_mock()
+
+        # Points are dropped once retries are exhausted
+        sqlbackend._conn.write_points.side_effect = IOError("down")
+        sqlbackend.insert(pkt)
+        sqlbackend.flush()
+        assert sqlbackend._conn.write_points.call_count == 4
+        assert sqlbackend.dropped == 1
+        sqlbackend._conn.reset_mock()
+
+        # Points InfluxDB rejects are not retried
+        sqlbackend._conn.write_points.side_effect = ClientError("bad")
+        sqlbackend.insert(pkt)
+        sqlbackend.close()
+        assert sqlbackend._conn.write_points.call_count == 1
+        assert sqlbackend.dropped == 2
+        assert sqlbackend.pending == 0
+
+    def test_influx_insert_http(self):
+        # Writes to a stand-in for the InfluxDB HTTP API, so this
+        # requires the InfluxDB library. Skip otherwise
+        try:
+            sqlbackend = db.InfluxDBBackend()
+        except cfg.AitConfigError:
+            self.skipTest("Test requires database library to be installed")
+
+        import http.server
+        import json
+        import threading
+
+        writes = []
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(
+                    {
+                        "results": [
+                            {
+                                "statement_id": 0,
+                                "series": [
+                                    {
+                                        "name": "databases",
+                                        "columns": ["name"],
+                                        "values": [["ait"]],
+                                    }
+                                ],
+                            }
+                        ]
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                writes.append(self.rfile.read(length).decode().splitlines())
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.HTTPServer(("localhost", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            sqlbackend.connect(
+                port=server.server_address[1], batch_size=10, flush_interval=60
+            )
+            pkt = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+
+            for _ in range(25):
+                sqlbackend.insert(pkt, time=dt.datetime.utcnow())
+
+            sqlbackend.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert sum(len(lines) for lines in writes) == 25
+        assert len(writes) == 3
+        assert all(line.startswith("1553_HS_Packet ") for line in writes[0])
+        assert sqlbackend.pending == 0
+        assert sqlbackend.dropped == 0
+
     @mock.patch("importlib.import_module")
     def test_influx_query_calldown(self, importlib_mock):
         sqlbackend = db.InfluxDBBackend()
@@ -500,6 +637,117 @@ class TestInfluxDBBackend(unittest.TestCase):
 
         os.remove(self.test_yaml_file)
 
+    @mock.patch("importlib.import_module")
+    def test_query_fields(self, importlib_mock):
+        sqlbackend = db.InfluxDBBackend()
+        sqlbackend._conn = mock.MagicMock()
+
+        # Points 1 to 3 share a time (e.g. in series with different tags)
+        rows = [
+            {
+                "time": f"2020-11-17T21:12:1{min(max(i - 1, 1), 2)}.000000Z",
+                "Voltage_A": i,
+                "Voltage_B": 1,
+                "Current_A": 1234 * i + 2,
+            }
+            for i in range(5)
+        ]
+
+        def query(q, **kwargs):
+            op, start = re.search(r"WHERE time (>=?) '([^']+)'", q).groups()
+            limit = int(re.search(r"LIMIT (\d+)", q).group(1))
+            matched = [
+                r
+                for r in rows
+                if r["time"] > start or op == ">=" and r["time"] == start
+            ]
+            page = mock.MagicMock()
+            page.get_points.return_value = matched[:limit]
+            return page
+
+        # Stored field values are returned without creating packets
+        sqlbackend._query = mock.MagicMock(side_effect=query)
+        with mock.patch.object(db.InfluxDBBackend, "create_packet_from_result") as c:
+            res = sqlbackend.query_fields(
+                "1553_HS_Packet", ["Voltage_A", "Current_A"], raw=True, fetch_size=2
+            )
+            results = list(res.results)
+            assert not c.called
+
+        # Points sharing a time across a page boundary are each read once
+        assert results == [
+            (dmc.rfc3339_str_to_datetime(r["time"]), r["Voltage_A"], r["Current_A"])
+            for r in rows
+        ]
+        queries = [c[0][0] for c in sqlbackend._query.call_args_list]
+        assert queries[0].startswith(
+            'SELECT "Voltage_A", "Current_A" FROM "1553_HS_Packet" '
+        )
+        assert queries[0].endswith("LIMIT 2")
+        assert "WHERE time >= " in queries[0]
+        assert f"WHERE time >= '{rows[1]['time']}' AND " in queries[1]
+        assert "OFFSET" not in queries[1]
+
+        # DN to EU conversions and derivations are computed
+        page = mock.MagicMock()
+        page.get_points.return_value = rows[2:3]
+        sqlbackend._query = mock.MagicMock(return_value=page)
+        res = sqlbackend.query_fields(
+            "1553_HS_Packet", ["Voltage_A", "Current_A", "Volt_Diff"]
+        )
+        assert list(res.results) == [
+            (dmc.rfc3339_str_to_datetime(rows[2]["time"]), 2, 2.0, 1)
+        ]
+        assert sqlbackend._query.call_args[0][0].startswith("SELECT * FROM")
+
+        with pytest.raises(ValueError):
+            sqlbackend.query_fields("1553_HS_Packet", ["not_a_valid_field"])
+
+        with pytest.raises(ValueError):
+            sqlbackend.query_fields("not_a_valid_packet", ["Voltage_A"])
+
+    @mock.patch("importlib.import_module")
+    def test_query_downsampled(self, importlib_mock):
+        sqlbackend = db.InfluxDBBackend()
+        sqlbackend._conn = mock.MagicMock()
+        sqlbackend._query = mock.MagicMock()
+        sqlbackend._query.return_value.get_points.return_value = [
+            {
+                "time": 1606867200000000,
+                "Voltage_A_min": 1,
+                "Voltage_A_max": 4,
+                "Voltage_A_mean": 2.5,
+                "Voltage_A_first": 4,
+                "Voltage_A_last": 1,
+                "Voltage_A_count": 2,
+            }
+        ]
+        start = dt.datetime(2020, 12, 2, tzinfo=dt.timezone.utc)
+
+        res = sqlbackend.query_downsampled(
+            "1553_HS_Packet",
+            ["Voltage_A"],
+            start_time=start,
+            end_time=start + dt.timedelta(seconds=6),
+            buckets=3,
+        )
+        assert list(res.results) == [(start, db.Bucket(1, 4, 2.5, 4, 1, 2))]
+
+        query = sqlbackend._query.call_args[0][0]
+        assert 'min("Voltage_A") AS "Voltage_A_min"' in query
+        assert query.endswith("GROUP BY time(2000000u, 0u) fill(none)")
+        assert sqlbackend._query.call_args[1] == {"epoch": "u"}
+
+        # Engineering units conversions are applied to the field values
+        with mock.patch.object(sqlbackend, "query_fields") as query_fields:
+            query_fields.return_value = db.AITDBResult(
+                results=iter([(start, 1.0), (start + dt.timedelta(seconds=1), 3.0)])
+            )
+            res = sqlbackend.query_downsampled(
+                "1553_HS_Packet", ["Current_A"], start_time=start, width=2
+            )
+            assert list(res.results) == [(start, db.Bucket(1.0, 3.0, 2.0, 1.0, 3.0, 2))]
+
 
 class TestSQLiteBackend(unittest.TestCase):
     test_yaml_file = "/tmp/test.yaml"
@@ -608,8 +856,15 @@ class TestSQLiteBackend(unittest.TestCase):
         sqlbackend._conn = mock.MagicMock()
 
         sqlbackend._create_table(tlmdict["Packet1"])
-        sqlbackend._conn.execute.assert_called_with(
-            "CREATE TABLE IF NOT EXISTS \"Packet1\" (time DATETIME DEFAULT(STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')), PKTDATA BLOB NOT NULL)"
+        sqlbackend._conn.execute.assert_has_calls(
+            [
+                mock.call(
+                    "CREATE TABLE IF NOT EXISTS \"Packet1\" (time DATETIME DEFAULT(STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')), PKTDATA BLOB NOT NULL)"
+                ),
+                mock.call(
+                    'CREATE INDEX IF NOT EXISTS "Packet1_time" ON "Packet1" (time)'
+                ),
+            ]
         )
 
         os.remove(self.test_yaml_file)
@@ -669,6 +924,292 @@ class TestSQLiteBackend(unittest.TestCase):
 
         os.remove(self.test_yaml_file)
 
+    def test_sqlite_insert_batched(self):
+        yaml_doc = """
+        - !Packet
+          name: Packet1
+          fields:
+            - !Field
+              name: col1
+              type: MSB_U16
+        """
+        tlmdict = tlm.TlmDict(yaml_doc)
+        dbname = "/tmp/test_batched.db"
+
+        sqlbackend = db.SQLiteBackend()
+        sqlbackend.connect(database=dbname, batch_size=3, flush_interval=60)
+        sqlbackend.create(tlmdict=tlmdict)
+        reader = sqlite3.connect(dbname)
+        count = 'SELECT COUNT(*) FROM "Packet1"'
+
+        try:
+            journal_mode = sqlbackend._conn.execute("PRAGMA journal_mode")
+            assert journal_mode.fetchone()[0] == "wal"
+
+            pkt = tlm.Packet(tlmdict["Packet1"], b"\x00\x01")
+            sqlbackend.insert(pkt)
+            sqlbackend.insert(pkt, time=dt.datetime.utcnow())
+            assert reader.execute(count).fetchone()[0] == 0
+
+            sqlbackend.insert(pkt)
+            assert reader.execute(count).fetchone()[0] == 3
+
+            sqlbackend.insert(pkt)
+            sqlbackend.flush()
+            assert reader.execute(count).fetchone()[0] == 4
+
+            sqlbackend._flush_interval = 0
+            sqlbackend.insert(pkt)
+            assert reader.execute(count).fetchone()[0] == 5
+
+            sqlbackend._flush_interval = 60
+            sqlbackend.insert(pkt)
+            sqlbackend.close()
+            assert reader.execute(count).fetchone()[0] == 6
+        finally:
+            reader.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(dbname + suffix):
+                    os.remove(dbname + suffix)
+
+    def test_sqlite_insert_batched_time(self):
+        dbname = os.path.join(tempfile.mkdtemp(), "test_batched_time.db")
+        sqlbackend = db.SQLiteBackend()
+        sqlbackend.connect(database=dbname, batch_size=10, flush_interval=60)
+
+        try:
+            pkt = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+            before = dt.datetime.utcnow()
+            sqlbackend.insert(pkt)
+            time.sleep(0.01)
+            sqlbackend.insert(pkt)
+            time.sleep(0.01)
+            sqlbackend.flush()
+
+            rows = sqlbackend._conn.execute(
+                'SELECT time FROM "1553_HS_Packet" ORDER BY time'
+            ).fetchall()
+            times = [dmc.rfc3339_str_to_datetime(t) for t, in rows]
+
+            # Rows are stamped when buffered, not when flushed
+            assert len(times) == 2 and times[0] < times[1]
+            assert before <= times[0].replace(tzinfo=None)
+            assert times[1].replace(tzinfo=None) < dt.datetime.utcnow() - dt.timedelta(
+                seconds=0.005
+            )
+
+            # Buffered rows keep the packet data as of the insert
+            buf = bytearray(pkt._data)
+            mutable = tlm.Packet(pkt._defn, buf, copy=False)
+            sqlbackend.insert(mutable)
+            buf[:] = b"\xff" * len(buf)
+            sqlbackend.flush()
+
+            (data,) = sqlbackend._conn.execute(
+                'SELECT PKTDATA FROM "1553_HS_Packet" ORDER BY time DESC LIMIT 1'
+            ).fetchone()
+            assert data == bytes(pkt._data)
+        finally:
+            sqlbackend.close()
+            shutil.rmtree(os.path.dirname(dbname))
+
+    def test_sqlite_time_index_migration(self):
+        dbname = "/tmp/test_migration.db"
+        conn = sqlite3.connect(dbname)
+        conn.execute('CREATE TABLE "1553_HS_Packet" (time DATETIME, PKTDATA BLOB)')
+        conn.commit()
+
+        sqlbackend = db.SQLiteBackend()
+        try:
+            sqlbackend.connect(database=dbname)
+            indexes = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            ).fetchall()
+            assert indexes == [("1553_HS_Packet_time",)]
+        finally:
+            sqlbackend.close()
+            conn.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(dbname + suffix):
+                    os.remove(dbname + suffix)
+
+    def test_sqlite_query_packets_merge(self):
+        sqlbackend = db.SQLiteBackend()
+        sqlbackend.connect(database=":memory:")
+        tlmdict = tlm.getDefaultDict()
+
+        hs = tlm.Packet(tlmdict["1553_HS_Packet"])
+        header = tlm.Packet(tlmdict["CCSDS_HEADER"])
+        start = dt.datetime(2020, 12, 2, tzinfo=dt.timezone.utc)
+        times = {hs: [0, 1, 2, 5, 6], header: [3, 4, 7]}
+
+        for pkt, seconds in times.items():
+            for n in seconds:
+                sqlbackend.insert(pkt, time=start + dt.timedelta(seconds=n))
+
+        res = sqlbackend.query_packets(
+            packets=["1553_HS_Packet", "CCSDS_HEADER"],
+            yield_packet_time=True,
+            fetch_size=2,
+        )
+        results = list(res.get_packets())
+
+        assert [(t - start).seconds for t, _ in results] == list(range(8))
+        assert [p._defn.name for _, p in results] == [
+            "1553_HS_Packet",
+            "1553_HS_Packet",
+            "1553_HS_Packet",
+            "CCSDS_HEADER",
+            "CCSDS_HEADER",
+            "1553_HS_Packet",
+            "1553_HS_Packet",
+            "CCSDS_HEADER",
+        ]
+
+        sqlbackend.close()
+
+    def test_sqlite_query_fields(self):
+        tlmdict = tlm.getDefaultDict()
+        pkt = tlm.Packet(tlmdict["1553_HS_Packet"])
+        pkt.Voltage_A = 3
+        pkt.Current_A = 1236
+        start = dt.datetime(2020, 12, 2, tzinfo=dt.timezone.utc)
+        fields = ["Voltage_A", "Current_A"]
+
+        for schema in ("blob", "columns"):
+            sqlbackend = db.SQLiteBackend()
+            sqlbackend.connect(database=":memory:", schema=schema, eu_columns=True)
+
+            for n in range(3):
+                sqlbackend.insert(pkt, time=start + dt.timedelta(seconds=n))
+
+            columns = [
+                row[1:3]
+                for row in sqlbackend._conn.execute(
+                    'PRAGMA table_info("1553_HS_Packet")'
+                )
+            ]
+            assert (("Voltage_A", "INTEGER") in columns) == (schema == "columns")
+
+            with mock.patch.object(
+                sqlbackend, "query_packets", wraps=sqlbackend.query_packets
+            ) as query_packets:
+                res = sqlbackend.query_fields(
+                    "1553_HS_Packet",
+                    fields,
+                    start_time=start + dt.timedelta(seconds=1),
+                )
+                rows = list(res.results)
+                assert query_packets.called == (schema == "blob")
+
+            assert rows == [
+                (start + dt.timedelta(seconds=1), 3, 1.0),
+                (start + dt.timedelta(seconds=2), 3, 1.0),
+            ]
+
+            res = sqlbackend.query_fields("1553_HS_Packet", fields, raw=True)
+            assert [row[1:] for row in res.results] == [(3, 1236)] * 3
+
+            sqlbackend.close()
+
+        with pytest.raises(ValueError):
+            sqlbackend.query_fields("not_a_valid_packet", fields)
+
+    def test_sqlite_query_downsampled(self):
+        tlmdict = tlm.getDefaultDict()
+        pkt = tlm.Packet(tlmdict["1553_HS_Packet"])
+        start = dt.datetime(2020, 12, 2, tzinfo=dt.timezone.utc)
+        fields = ["Voltage_A", "Current_A"]
+
+        for schema in ("blob", "columns"):
+            sqlbackend = db.SQLiteBackend()
+            sqlbackend.connect(database=":memory:", schema=schema, eu_columns=True)
+
+            for n, volts in enumerate([4, 1, 7, 2, 9]):
+                pkt.Voltage_A = volts
+                pkt.Current_A = 2 + 1234 * n
+                sqlbackend.insert(
+                    pkt, time=start + dt.timedelta(seconds=n, milliseconds=5)
+                )
+
+            with mock.patch.object(
+                sqlbackend, "query_fields", wraps=sqlbackend.query_fields
+            ) as query_fields:
+                res = sqlbackend.query_downsampled(
+                    "1553_HS_Packet",
+                    fields,
+                    start_time=start,
+                    end_time=start + dt.timedelta(seconds=6),
+                    buckets=3,
+                )
+                rows = list(res.results)
+                assert query_fields.called == (schema == "blob")
+
+            assert rows == [
+                (
+                    start,
+                    db.Bucket(1, 4, 2.5, 4, 1, 2),
+                    db.Bucket(0.0, 1.0, 0.5, 0.0, 1.0, 2),
+                ),
+                (
+                    start + dt.timedelta(seconds=2),
+                    db.Bucket(2, 7, 4.5, 7, 2, 2),
+                    db.Bucket(2.0, 3.0, 2.5, 2.0, 3.0, 2),
+                ),
+                (
+                    start + dt.timedelta(seconds=4),
+                    db.Bucket(9, 9, 9.0, 9, 9, 1),
+                    db.Bucket(4.0, 4.0, 4.0, 4.0, 4.0, 1),
+                ),
+            ]
+
+            res = sqlbackend.query_downsampled(
+                "1553_HS_Packet", ["Voltage_A"], start_time=start, width=10, raw=True
+            )
+            assert list(res.results) == [(start, db.Bucket(1, 9, 4.6, 4, 9, 5))]
+
+            sqlbackend.close()
+
+        with pytest.raises(ValueError):
+            sqlbackend.query_downsampled("1553_HS_Packet", fields)
+
+    def test_sqlite_field_functions(self):
+        tlmdict = tlm.getDefaultDict()
+        sqlbackend = db.SQLiteBackend()
+        sqlbackend.connect(database=":memory:")
+
+        pkt = tlm.Packet(tlmdict["1553_HS_Packet"])
+        for n in range(4):
+            pkt.Voltage_A = n
+            pkt.Current_A = 2 + 1234 * n
+            sqlbackend.insert(pkt)
+
+        conn = sqlbackend._conn
+        sql = """
+            SELECT ait_raw('1553_HS_Packet', PKTDATA, 'Voltage_A'),
+                   ait_field('1553_HS_Packet', PKTDATA, 'Current_A'),
+                   ait_raw('1553_HS_Packet', PKTDATA, 'Current_A'),
+                   ait_field('1553_HS_Packet', PKTDATA, 'Volt_Diff')
+            FROM "1553_HS_Packet"
+            WHERE ait_field('1553_HS_Packet', PKTDATA, 'Voltage_A') > 1
+        """
+        assert conn.execute(sql).fetchall() == [(2, 2.0, 2470, 2), (3, 3.0, 3704, 3)]
+
+        conn.execute(
+            'CREATE INDEX "1553_HS_Packet_Voltage_A" ON "1553_HS_Packet" '
+            "(ait_raw('1553_HS_Packet', PKTDATA, 'Voltage_A'))"
+        )
+
+        sql = """
+            SELECT ait_field('1553_HS_Packet', PKTDATA, 'Missing'),
+                   ait_field('Missing', PKTDATA, 'Voltage_A'),
+                   ait_field('1553_HS_Packet', x'00', 'Voltage_A')
+            FROM "1553_HS_Packet" LIMIT 1
+        """
+        assert conn.execute(sql).fetchall() == [(None, None, None)]
+
+        sqlbackend.close()
+
     def test_sqlite_query_calldown(self):
         sqlbackend = db.SQLiteBackend()
         sqlbackend._conn = mock.MagicMock()
@@ -788,8 +1329,7 @@ class TestSQLiteBackend(unittest.TestCase):
         sqlbackend = db.SQLiteBackend()
         sqlbackend._conn = mock.MagicMock()
 
-        res_mock = mock.MagicMock()
-        res_mock.return_value = [
+        ret_data = [
             ("2020-12-02T00:41:43.199Z", b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"),
             ("2020-12-02T00:41:44.200Z", b"\x00\x01\x00\x01\x00\x01\x00\x01\x00\x01"),
             ("2020-12-02T00:41:45.205Z", b"\x00\x02\x00\x02\x00\x02\x00\x02\x00\x02"),
@@ -797,6 +1337,8 @@ class TestSQLiteBackend(unittest.TestCase):
             ("2020-12-02T00:41:47.216Z", b"\x00\x04\x00\x04\x00\x04\x00\x04\x00\x04"),
             ("2020-12-02T00:41:48.221Z", b"\x00\x05\x00\x05\x00\x05\x00\x05\x00\x05"),
         ]
+        res_mock = mock.MagicMock()
+        res_mock.return_value.fetchmany.side_effect = [ret_data, []]
 
         sqlbackend._query = res_mock
 
@@ -829,7 +1371,7 @@ class TestSQLiteBackend(unittest.TestCase):
             ("2020-12-02T00:41:48.221Z", b"\x00\x05\x00\x05\x00\x05\x00\x05\x00\x05"),
         ]
         res_mock = mock.MagicMock()
-        res_mock.return_value = ret_data
+        res_mock.return_value.fetchmany.side_effect = [ret_data, []]
         sqlbackend._query = res_mock
 
         res = sqlbackend.query_packets(
@@ -846,3 +1388,187 @@ class TestSQLiteBackend(unittest.TestCase):
         for i, test_data in enumerate(ret_data):
             assert dmc.rfc3339_str_to_datetime(ret_data[i][0]) == res_pkts[i][0]
             assert res_pkts[i][1].Voltage_A == i
+
+
+class TestPartitionedSQLiteBackend(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.backend = db.PartitionedSQLiteBackend()
+        self.backend.connect(database=self.directory, partition="hour", retention=3)
+
+    def tearDown(self):
+        self.backend.close()
+        shutil.rmtree(self.directory)
+
+    def test_insert_partitions(self):
+        pkt = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+        start = dt.datetime(2020, 12, 2, 10, 30, tzinfo=dt.timezone.utc)
+
+        for n in range(4):
+            self.backend.insert(pkt, time=start + dt.timedelta(hours=n))
+
+        # Creating the fourth partition prunes the first
+        files = [f for f in os.listdir(self.directory) if f.endswith(".db")]
+        assert sorted(files) == [
+            "20201202T11.db",
+            "20201202T12.db",
+            "20201202T13.db",
+        ]
+        assert len(self.backend._partitions) == self.backend._max_open
+
+    def test_insert_expired(self):
+        self.backend.close()
+        self.backend.connect(
+            database=self.directory, partition="day", retention=1, max_open=3
+        )
+        assert self.backend._max_open == 3
+
+        hs = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+        self.backend.insert(hs, time=dt.datetime(2024, 1, 2))
+
+        # A partition older than the retention window is kept until the
+        # next partition is created
+        self.backend.insert(hs, time=dt.datetime(2024, 1, 1))
+        self.backend.flush()
+        assert self.backend._keys() == ["20240101", "20240102"]
+
+        self.backend.insert(hs, time=dt.datetime(2024, 1, 3))
+        assert self.backend._keys() == ["20240103"]
+
+    def test_query_packets(self):
+        tlmdict = tlm.getDefaultDict()
+        hs = tlm.Packet(tlmdict["1553_HS_Packet"])
+        header = tlm.Packet(tlmdict["CCSDS_HEADER"])
+        start = dt.datetime(2020, 12, 2, 10, 0, tzinfo=dt.timezone.utc)
+
+        for n in range(6):
+            hs.Voltage_A = n
+            pkt = hs if n % 2 else header
+            self.backend.insert(pkt, time=start + dt.timedelta(minutes=30 * n))
+        self.backend.flush()
+
+        with mock.patch.object(
+            self.backend, "_query_partition", wraps=self.backend._query_partition
+        ) as query_partition:
+            res = self.backend.query_packets(
+                start_time=start + dt.timedelta(minutes=80),
+                end_time=start + dt.timedelta(minutes=150),
+                yield_packet_time=True,
+            )
+            results = list(res.get_packets())
+
+            paths = [c[0][0] for c in query_partition.call_args_list]
+            assert [os.path.basename(p) for p in paths] == [
+                "20201202T11.db",
+                "20201202T12.db",
+            ]
+
+        assert [(t - start).seconds // 60 for t, _ in results] == [90, 120, 150]
+        assert [p._defn.name for _, p in results] == [
+            "1553_HS_Packet",
+            "CCSDS_HEADER",
+            "1553_HS_Packet",
+        ]
+        assert results[0][1].Voltage_A == 3
+
+        with pytest.raises(ValueError):
+            self.backend.query_packets(packets=["not_a_valid_packet"])
+
+    def test_query_packets_streamed(self):
+        hs = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+        start = dt.datetime(2020, 12, 2, 10, 0, tzinfo=dt.timezone.utc)
+
+        for n in range(20):
+            hs.Voltage_A = n
+            self.backend.insert(hs, time=start + dt.timedelta(minutes=5 * n))
+        self.backend.flush()
+
+        # Chunks of one packet through bounded queues still yield every
+        # packet, in order
+        res = self.backend.query_packets(packets=["1553_HS_Packet"], fetch_size=1)
+        assert [p.Voltage_A for p in res.get_packets()] == list(range(20))
+
+        # Abandoned results stop their readers
+        res = self.backend.query_packets(packets=["1553_HS_Packet"], fetch_size=1)
+        packets = res.get_packets()
+        assert next(packets).Voltage_A == 0
+        packets.close()
+
+
+class TestThreadPoolBackend(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.backend = db.ThreadPoolBackend()
+        self.backend.connect(
+            database=os.path.join(self.directory, "ait.db"),
+            workers=2,
+            chunk_size=2,
+        )
+
+    def tearDown(self):
+        self.backend.close()
+        shutil.rmtree(self.directory)
+
+    def test_connect_unknown_backend(self):
+        with pytest.raises(cfg.AitConfigError):
+            db.ThreadPoolBackend().connect(backend="ait.core.db.NotABackend")
+
+    def test_query_packets(self):
+        hs = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+        start = dt.datetime(2020, 12, 2, 10, 0, tzinfo=dt.timezone.utc)
+
+        for n in range(5):
+            hs.Voltage_A = n
+            self.backend.insert(hs, time=start + dt.timedelta(minutes=n))
+        self.backend.flush()
+
+        res = self.backend.query_packets(
+            packets=["1553_HS_Packet"], start_time=start, yield_packet_time=True
+        )
+        results = list(res.get_packets())
+
+        assert [p.Voltage_A for _, p in results] == [0, 1, 2, 3, 4]
+        assert [(t - start).seconds // 60 for t, _ in results] == [0, 1, 2, 3, 4]
+
+        res = self.backend.query_fields("1553_HS_Packet", ["Voltage_A"], start)
+        assert [v for _, v in res.results] == [0, 1, 2, 3, 4]
+
+        # Cursors are read on the reader thread
+        res = self.backend.query('SELECT COUNT(*) FROM "1553_HS_Packet"')
+        assert list(res.results) == [(5,)]
+
+        with pytest.raises(ValueError):
+            self.backend.query_packets(packets=["not_a_valid_packet"])
+
+    def test_query_abandoned(self):
+        hs = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+
+        for _ in range(20):
+            self.backend.insert(hs)
+        self.backend.flush()
+
+        # Unread results must not hold reader threads
+        for _ in range(4):
+            res = self.backend.query_packets(packets=["1553_HS_Packet"])
+            next(res.get_packets())
+            del res
+
+        res = self.backend.query_packets(packets=["1553_HS_Packet"])
+        assert len(list(res.get_packets())) == 20
+
+    def test_close(self):
+        hs = tlm.Packet(tlm.getDefaultDict()["1553_HS_Packet"])
+
+        for _ in range(20):
+            self.backend.insert(hs)
+        self.backend.flush()
+
+        # Open a connection on every reader, with their results unread
+        results = [
+            self.backend.query_packets(packets=["1553_HS_Packet"]) for _ in range(2)
+        ]
+        next(results[0].get_packets())
+        assert len(self.backend._connections) == 2
+
+        self.backend.close()
+        assert self.backend._connections == {}
@@ -18,6 +18,7 @@ gevent.monkey.patch_all()
 import base64
 import binascii
 import datetime
+import pickle
 import struct
 
 import pytest
@@ -85,6 +86,8 @@ def testArrayType():
     assert array.decode(bin456, 1) == 5
     assert array.decode(bin456, 2) == 6
     assert array.decode(bin456, slice(1, 3)) == [5, 6]
+    assert array.decode(bin456, slice(None, None, 2)) == [4, 6]
+    assert array.decode(bin456 + b"\x00") == [4, 5, 6]
 
     with pytest.raises(ValueError):
         array.encode(1, 2)
@@ -102,12 +105,31 @@ def testArrayType():
         dtype.ArrayType("U8", "4")
 
 
+def testArrayTypeView():
+    numpy = pytest.importorskip("numpy")
+    array = dtype.ArrayType("LSB_I16", 3)
+    data = bytearray(struct.pack("<hhh", -1, 2, 3))
+
+    view = array.view(data)
+    assert view.dtype == numpy.dtype("<i2")
+    assert view.tolist() == [-1, 2, 3]
+
+    data[0:2] = struct.pack("<h", 7)
+    assert view[0] == 7
+
+    assert dtype.ArrayType("TIME8", 3).view(data) is None
+
+    with pytest.raises(IndexError):
+        array.view(data[:4])
+
+
 def testArrayTime8():
     array = dtype.ArrayType("TIME8", 3)
-    bytestring = b"\x40\x80\xC0"
+    bytestring = b"\x40\x80\xc0"
 
     assert array.decode(bytestring) == [0.25, 0.50, 0.75]
     assert array.decode(bytestring, raw=True) == [64, 128, 192]
+    assert array.decode(bytestring, slice(1, None)) == [0.50, 0.75]
 
 
 def testCMD16():
@@ -190,6 +212,42 @@ def testTIME64():
     assert dt.encode(date) == rawdata
 
 
+def testPackIntoUnpackFrom():
+    buf = bytearray(16)
+
+    dtype.get("MSB_U16").pack_into(buf, 1, 0x0102)
+    dtype.get("LSB_I32").pack_into(buf, 3, -2)
+    dtype.get("MSB_I16").pack_into(buf, 7, 3.0)
+    dtype.get("S4").pack_into(buf, 9, "ab")
+    dtype.get("TIME8").pack_into(buf, 13, 0.5)
+
+    assert buf[1:3] == b"\x01\x02"
+    assert dtype.get("MSB_U16").unpack_from(buf, 1) == 0x0102
+    assert dtype.get("LSB_I32").unpack_from(buf, 3) == -2
+    assert dtype.get("MSB_I16").unpack_from(buf, 7) == 3
+    assert dtype.get("S4").unpack_from(buf, 9) == b"ab\x00\x00"
+    assert dtype.get("TIME8").unpack_from(buf, 13) == 0.5
+    assert dtype.get("TIME8").unpack_from(buf, 13, raw=True) == 128
+
+    date = datetime.datetime(2015, 4, 22, 10, 18, 17, 31250)
+    dt = dtype.get("TIME64")
+    dt.pack_into(buf, 8, date)
+    assert dt.unpack_from(memoryview(buf), 8) == date
+
+    with pytest.raises(struct.error):
+        dtype.get("MSB_U32").unpack_from(buf, 14)
+
+
+def testPickle():
+    for name in ("MSB_U16", "S8", "TIME40", "CMD16", "LSB_F32[4]"):
+        dt = dtype.get(name)
+        copy = pickle.loads(pickle.dumps(dt))
+        assert copy == dt
+        assert copy.decode(bytes(dt.nbytes), raw=True) == dt.decode(
+            bytes(dt.nbytes), raw=True
+        )
+
+
 def testgetdtype():
     dt = dtype.get("TIME32")
     assert isinstance(dt, dtype.Time32Type)
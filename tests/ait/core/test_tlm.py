@@ -15,6 +15,7 @@
 import csv
 import os
 import struct
+from unittest import mock
 
 import pytest
 from gevent import monkey
@@ -447,6 +448,50 @@ def testArray():
     assert packet.A == [1, 2, 3]
 
 
+def testFieldList():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16[3]
+        - !Field
+          name: B
+          type: U8[2]
+          enum:
+            0: IDLE
+            1: BUSY
+    """
+    numpy = pytest.importorskip("numpy")
+    defn = tlm.TlmDict(testFieldList.__doc__)["P"]
+    data = bytearray(struct.pack(">HHHBB", 1, 2, 3, 0, 1))
+    packet = tlm.Packet(defn, data, copy=False)
+
+    values = packet.A
+    assert values._array() is not None
+    assert values == [1, 2, 3]
+    assert list(values) == [1, 2, 3]
+    assert (values[0], values[-1], values[1:]) == (1, 3, [2, 3])
+    assert type(values[0]) is int
+    assert numpy.asarray(values).dtype == numpy.dtype(">u2")
+
+    with pytest.raises(IndexError):
+        values[3]
+
+    # Values are a view of the packet data, not a copy.
+    data[0:2] = struct.pack(">H", 4)
+    assert values == [4, 2, 3]
+
+    # Enumerated arrays are decoded element by element.
+    assert packet.B._array() is None
+    assert packet.B == ["IDLE", "BUSY"]
+    assert packet._getattr("B", raw=True) == [0, 1]
+    assert packet._getattr("B", raw=True)._array() is not None
+
+
 def testAliases():
     """
     # This test will use the following TLM dictionary definitions:
@@ -526,3 +571,626 @@ def testSingleItemList():
     assert defn.fieldmap["foo"].nbytes == 1
     assert defn.fieldmap["bar"].bytes == 1
     assert defn.fieldmap["baz"].bytes == [9, 10]
+
+
+def testDecodeAll():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+          mask: 0x0180
+        - !Field
+          name: B
+          bytes: '@prev'
+          type: MSB_U16
+          mask: 0x007F
+          enum:
+            1: ONE
+        - !Field
+          name: C
+          type: LSB_I32
+        - !Field
+          name: D
+          type: MSB_F32
+          dntoeu:
+            equation: raw.D * 2
+            units: m
+        - !Field
+          name: E
+          type: U8
+          when: C > 0
+        - !Field
+          name: F
+          type: MSB_U16[2]
+        - !Field
+          name: G
+          type: TIME32
+    """
+    defn = tlm.TlmDict(testDecodeAll.__doc__)["P"]
+    data = struct.pack(">H", 0x0181) + struct.pack("<i", -5)
+    data += struct.pack(">fBHHI", 1.5, 7, 3, 4, 1000)
+    packet = tlm.Packet(defn, data)
+
+    decoded = defn.decode_all(data)
+    assert decoded == {name: getattr(packet, name) for name in defn.fieldmap}
+    assert decoded["A"] == 3
+    assert decoded["B"] == "ONE"
+    assert decoded["D"] == 3.0
+    assert decoded["E"] is None
+    assert decoded["F"] == [3, 4]
+
+    raw = defn.decode_all(data, raw=True)
+    assert raw == {name: getattr(packet.raw, name) for name in defn.fieldmap}
+    assert raw["B"] == 1
+    assert raw["D"] == 1.5
+    assert raw["G"] == 1000
+
+    assert packet.toJSON() == decoded
+
+
+def testDecodeBatch():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+          mask: 0x0180
+        - !Field
+          name: B
+          bytes: '@prev'
+          type: MSB_U16
+          mask: 0x007F
+          enum:
+            1: ONE
+        - !Field
+          name: C
+          type: LSB_I32
+        - !Field
+          name: D
+          type: MSB_F32
+          dntoeu:
+            equation: sqrt(raw.D) * 2
+            units: m
+        - !Field
+          name: E
+          type: U8
+          when: C > 0
+        - !Field
+          name: F
+          type: MSB_U16[2]
+        - !Field
+          name: G
+          type: TIME32
+      derivations:
+        - !Derivation
+          name: H
+          equation: C + D
+          type: MSB_F32
+    """
+    numpy = pytest.importorskip("numpy")
+    tlmdict = tlm.TlmDict(testDecodeBatch.__doc__)
+    defn = tlmdict["P"]
+
+    buffers = []
+    for n in range(-2, 3):
+        data = struct.pack(">H", 0x0181 + n) + struct.pack("<i", n)
+        data += struct.pack(">fBHHI", 4.0 * (n + 3), 7, n + 2, 4, 1000 + n)
+        buffers.append(data)
+
+    packets = [tlm.Packet(defn, data) for data in buffers]
+
+    for columns in (
+        tlmdict.decode_batch("P", buffers),
+        defn.decode_batch(b"".join(buffers)),
+    ):
+        assert list(columns) == list(defn.fieldmap)
+        for name, column in columns.items():
+            values = numpy.ma.masked_array(column).tolist(fill_value=None)
+            assert values == [getattr(p, name) for p in packets]
+
+    raw = defn.decode_batch(buffers, raw=True)
+    assert raw["B"].tolist() == [p.raw.B for p in packets]
+    assert raw["D"].tolist() == [p.raw.D for p in packets]
+    assert raw["G"].tolist() == [p.raw.G for p in packets]
+
+    with pytest.raises(ValueError):
+        defn.decode_batch(buffers[0][:-1])
+
+    with pytest.raises(ValueError):
+        defn.decode_batch([buffers[0], buffers[1] + b"\x00"])
+
+
+def testPacketExpressionCompile():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      constants:
+        K: 3
+      functions:
+        Scale(x): x * K
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+          mask: 0x0180
+        - !Field
+          name: B
+          bytes: '@prev'
+          type: MSB_U16
+          mask: 0x007F
+          enum:
+            1: ONE
+        - !Field
+          name: C
+          type: LSB_I32
+          dntoeu:
+            equation: Scale(raw.C) / A
+        - !Field
+          name: D
+          type: TIME32
+      derivations:
+        - !Derivation
+          name: E
+          equation: C + 1 if B == 'ONE' else None
+    """
+    defn = tlm.TlmDict(testPacketExpressionCompile.__doc__)["P"]
+    expressions = [
+        "A + raw.B",
+        "B == 'ONE' and A > 2",
+        "C",
+        "sqrt(abs(raw.C)) + K",
+        "E if E is not None else -1",
+        "raw.D",
+        "raw.history",
+        "A / 0",
+        "[A, B][0] if A else floor(pi)",
+    ]
+
+    for a, b in ((0x0181, 10), (0x0101, 0), (0x0080, -6)):
+        data = struct.pack(">H", a) + struct.pack("<i", b) + struct.pack(">I", 5)
+        packet = tlm.Packet(defn, data)
+
+        for string in expressions:
+            expr = tlm.PacketExpression(string)
+            assert expr.eval(packet) == expr.interpret(packet), string
+
+    assert tlm.PacketExpression("A / 0").eval(packet) is None
+
+    with pytest.raises(NameError):
+        tlm.PacketExpression("Z + 1").eval(packet)
+
+    with pytest.raises(AttributeError):
+        tlm.PacketExpression("raw.Z").eval(packet)
+
+
+def testPacketExpressionCompileColumns():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+        - !Field
+          name: B
+          type: MSB_I16
+          dntoeu:
+            equation: cos(raw.B) * A
+    """
+    numpy = pytest.importorskip("numpy")
+    defn = tlm.TlmDict(testPacketExpressionCompileColumns.__doc__)["P"]
+    buffers = [struct.pack(">Hh", n, -n) for n in range(5)]
+    packets = [tlm.Packet(defn, data) for data in buffers]
+
+    expr = tlm.PacketExpression("B + raw.B * 2 + log1p(A)")
+    columns = defn.decoder.columns(buffers)
+    values = columns.eval(expr)
+
+    assert isinstance(values, numpy.ndarray) and values.dtype == numpy.float64
+    assert expr.compile(defn, columns=True) is expr.compile(defn, columns=True)
+    assert numpy.allclose(values, [expr.interpret(p) for p in packets])
+    assert columns.column("B").tolist() == [p.B for p in packets]
+
+
+def testPacketCache():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+        - !Field
+          name: B
+          type: MSB_U16
+          dntoeu:
+            equation: raw.B * A
+        - !Field
+          name: C
+          type: U8
+          when: A > 1
+        - !Field
+          name: D
+          type: U8
+          dntoeu:
+            equation: raw.D + history.A
+      history:
+        - A
+      derivations:
+        - !Derivation
+          name: E
+          equation: B + 1
+    """
+    defn = tlm.TlmDict(testPacketCache.__doc__)["P"]
+    packet = tlm.Packet(defn, struct.pack(">HHBB", 2, 3, 4, 5), cache=True)
+    cache = packet._cache
+
+    assert tlm.Packet(defn)._cache is None
+    assert defn.decoder.extent("A") == 0b11
+    assert defn.decoder.extent("B", raw=True) == 0b1100
+    assert defn.decoder.extent("E") == 0b1111
+    assert defn.decoder.extent("C") == 0b10011
+    assert defn.decoder.extent("D") is None
+
+    assert (packet.B, packet.E, packet.C) == (6, 7, 4)
+    misses, hits = cache.misses, cache.hits
+    assert (packet.B, packet.E, packet.C) == (6, 7, 4)
+    assert cache.misses == misses and cache.hits == hits + 3
+
+    # Writing C invalidates only C.
+    packet.C = 9
+    assert cache.invalidations == 1
+    assert (packet.B, packet.C) == (6, 9)
+
+    # Writing A invalidates everything that depends on it.
+    packet.A = 1
+    assert (packet.B, packet.E, packet.C) == (3, 4, None)
+
+    # Values that depend on history are never cached.
+    packet.D
+    assert ("D", False) not in cache._values
+
+    small = tlm.Packet(defn, packet._data, cache=2)
+    small.A, small.B, small.C
+    assert len(small._cache) == 2
+    assert small._cache.stats["evictions"] > 0
+
+
+def testPacketNoCopy():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+        - !Field
+          name: B
+          type: U8
+          mask: 0x0F
+    """
+    defn = tlm.TlmDict(testPacketNoCopy.__doc__)["P"]
+    data = struct.pack(">HB", 1, 0xA2)
+    view = memoryview(data)
+
+    assert tlm.Packet(defn, data)._data is not data
+    assert tlm.Packet(defn, data, copy=False)._data is data
+
+    packet = tlm.Packet(defn, view, copy=False)
+    assert packet._data is view
+    assert (packet.A, packet.B) == (1, 2)
+    assert packet.toJSON() == {"A": 1, "B": 2}
+
+    # Setting a field copies read-only data before writing.
+    packet.B = 5
+    assert isinstance(packet._data, bytearray)
+    assert (packet.A, packet.B, packet._data[2]) == (1, 5, 0xA5)
+    assert data == struct.pack(">HB", 1, 0xA2)
+
+    # A bytearray is wrapped and written in place.
+    buf = bytearray(data)
+    packet = tlm.Packet(defn, buf, copy=False)
+    packet.A = 7
+    assert packet._data is buf and buf[:2] == b"\x00\x07"
+
+
+def testEvaluateDerivations():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+        - !Field
+          name: B
+          type: MSB_U16
+          dntoeu:
+            equation: raw.B * 2
+      history:
+        - A
+      derivations:
+        - !Derivation
+          name: C
+          equation: A + B
+        - !Derivation
+          name: D
+          equation: C * C
+        - !Derivation
+          name: E
+          equation: D + history.A
+        - !Derivation
+          name: F
+          equation: A - 10
+          when: A > 10
+    """
+    defn = tlm.TlmDict(testEvaluateDerivations.__doc__)["P"]
+    graph = defn._graph
+    order = list(graph)
+
+    assert graph[("B", False)] == (("B", True),)
+    assert graph[("E", False)] == (("D", False), ("history", False))
+    assert order.index(("C", False)) < order.index(("D", False))
+    assert order.index(("D", False)) < order.index(("E", False))
+
+    packet = tlm.Packet(defn, struct.pack(">HH", 1, 2))
+    assert defn.evaluate_derivations(packet) == {
+        "C": 5,
+        "D": 25,
+        "E": 26,
+        "F": None,
+    }
+    assert defn.evaluate_derivations(packet, names=["D", "A"]) == {"D": 25, "A": 1}
+
+    with mock.patch.object(
+        tlm.PacketExpression,
+        "eval",
+        autospec=True,
+        side_effect=tlm.PacketExpression.eval,
+    ) as evaluate:
+        defn.evaluate_derivations(packet, names=["D"])
+        # B's DN to EU conversion, C and D are each evaluated once.
+        assert evaluate.call_count == 3
+
+    for name in ("Z", "raw", "history"):
+        with pytest.raises(AttributeError):
+            defn.evaluate_derivations(packet, names=[name])
+
+
+def testCircularDerivations():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: U8
+      derivations:
+        - !Derivation
+          name: B
+          equation: A + C
+        - !Derivation
+          name: C
+          equation: B + 1
+    """
+    with mock.patch("ait.core.log.error") as error:
+        defn = tlm.TlmDict(testCircularDerivations.__doc__)["P"]
+        error.assert_called_with("Packet 'P' has circular dependency: B -> C -> B")
+
+    assert set(defn._graph) >= {("A", False), ("B", False), ("C", False)}
+
+
+def testPacketHistory():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+          dntoeu:
+            equation: raw.A * 2
+        - !Field
+          name: B
+          type: U8
+          when: A > 4
+        - !Field
+          name: C
+          type: U8
+          dntoeu:
+            equation: raw.C + history.C
+        - !Field
+          name: D
+          type: U8
+      history:
+        - A
+        - B
+        - C
+        - D
+    """
+    defn = tlm.TlmDict(testPacketHistory.__doc__)["P"]
+    history = defn.history
+
+    assert (history.A, history.B, history.C, history.D) == (0, 0, 0, 0)
+
+    with mock.patch.object(
+        tlm.Packet, "_compute", autospec=True, side_effect=tlm.Packet._compute
+    ) as compute:
+        tlm.Packet(defn, struct.pack(">HBBB", 1, 7, 1, 4))
+        tlm.Packet(defn, struct.pack(">HBBB", 3, 8, 2, 5))
+        # D is decoded lazily, when read, rather than as packets are added.
+        assert "D" not in {call.args[1] for call in compute.call_args_list}
+        assert (history._dict["A"], history._dict["D"]) == (6, 0)
+
+    # B keeps its prior value while its guard is False, and C
+    # accumulates over every packet.
+    assert (history.A, history.B, history.C, history.D) == (6, 8, 3, 5)
+    assert history["C"] == 3 and history["Z"] is None
+
+    with pytest.raises(AttributeError):
+        history.Z
+
+    with pytest.raises(ValueError):
+        history.values("A")
+
+    # Lazily decoded values are those of the Packet when it was added,
+    # even if its buffer is later modified.
+    data = bytearray(struct.pack(">HBBB", 5, 9, 1, 6))
+    pkt = tlm.Packet(defn, data, copy=False)
+    data[4] = 100
+    pkt.D = 200
+    assert history.D == 6
+
+
+def testPacketHistoryNone():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: U8
+          dntoeu:
+            equation: 100 / raw.A
+      derivations:
+        - !Derivation
+          name: B
+          equation: A * 2 if A is not None else None
+          type: MSB_D64
+      history:
+        - A
+        - B
+    """
+    defn = tlm.TlmDict(testPacketHistoryNone.__doc__)["P"]
+    history = defn.history
+
+    # Names that evaluate to None keep their last value, including
+    # derivations that depend on them.
+    tlm.Packet(defn, struct.pack(">B", 4))
+    tlm.Packet(defn, struct.pack(">B", 0))
+    assert (history.A, history.B) == (25.0, 50.0)
+
+
+def testPacketHistoryRingBuffer():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+          dntoeu:
+            equation: raw.A * 2
+      history:
+        - A
+    """
+    pytest.importorskip("numpy")
+    defn = tlm.TlmDict(testPacketHistoryRingBuffer.__doc__)["P"]
+    history = defn.history
+    history.maxlen = 3
+
+    assert history.values("A").tolist() == []
+
+    for n in range(1, 3):
+        tlm.Packet(defn, struct.pack(">H", n))
+
+    assert history.values("A").tolist() == [2, 4]
+
+    for n in range(3, 6):
+        tlm.Packet(defn, struct.pack(">H", n))
+
+    assert history.values("A").tolist() == [6, 8, 10]
+    assert history.values("A", raw=True).tolist() == [3, 4, 5]
+    assert history.A == 10
+
+
+def testTlmRegistry():
+    """
+    # This test will use the following TLM dictionary definitions:
+
+    - !Packet
+      name: P
+      ccsds:
+        apid: 42
+      fields:
+        - !Field
+          name: A
+          type: MSB_U16
+        - !Field
+          name: B
+          type: U8
+
+    - !Packet
+      name: Q
+      fields:
+        - !Field
+          name: C
+          type: MSB_U32
+    """
+    tlmdict = tlm.TlmDict(testTlmRegistry.__doc__)
+    registry = tlm.TlmRegistry(tlmdict)
+    p, q = tlmdict["P"], tlmdict["Q"]
+
+    assert registry.version == 1
+    assert registry.tlmdict is tlmdict
+    assert registry[42] is p
+    assert registry[q.uid] is q
+    assert q.uid in registry
+    assert registry.get(-1) is None
+    assert registry.by_name("Q") is q
+    assert registry.by_name("R") is None
+    assert registry.by_apid(42) is p
+    assert registry.by_apid(q.uid) is None
+    assert sorted(registry.keys()) == sorted([42, q.uid])
+
+    layout = registry.layout(42)
+    assert layout.defn is p
+    assert layout.apid == 42
+    assert layout.nbytes == 3
+    assert layout.fields == {"A": slice(0, 2), "B": slice(2, 3)}
+    assert registry.layout(q.uid).apid is None
+
+    assert registry.swap(tlm.TlmDict()) == 2
+    assert registry.version == 2
+    assert 42 not in registry
+    assert registry.by_name("P") is None
+
+
+def testDefaultRegistryReload():
+    registry = tlm.getDefaultRegistry()
+    version = registry.version
+
+    assert registry.tlmdict is tlm.getDefaultDict()
+    assert tlm.getDefaultRegistry() is registry
+
+    tlmdict = tlm.getDefaultDict(reload=True)
+    assert tlm.getDefaultRegistry() is registry
+    assert registry.version == version + 1
+    assert registry.tlmdict is tlmdict
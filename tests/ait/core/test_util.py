@@ -193,3 +193,64 @@ def test_YAMLError_exception(log_mock):
     e = util.YAMLError(message)
     assert message == e.message
     log_mock.assert_called_with(message)
+
+
+def test_load_yaml(tmp_path):
+    from ait.core import tlm
+
+    main = tmp_path / "tlm.yaml"
+    main.write_text(
+        "- !Packet\n"
+        "  name: P\n"
+        "  fields:\n"
+        "    - !Field\n"
+        "      name: A\n"
+        "      type: U8\n"
+        "      enum:\n"
+        "        0: IDLE\n"
+        "- !include include.yaml\n"
+    )
+    include = tmp_path / "include.yaml"
+    include.write_text("- !Packet\n  name: Q\n")
+    cachedir = tmp_path / "cache"
+
+    def parsed(record):
+        return sum(call.args[0] == str(main) for call in record.call_args_list)
+
+    with mock.patch.object(
+        util, "getYAMLCacheDirectory", return_value=str(cachedir)
+    ), mock.patch.object(util, "_yaml_record", wraps=util._yaml_record) as record:
+        first = tlm.TlmDict(str(main))
+        assert parsed(record) == 1
+        assert len(os.listdir(cachedir)) == 1
+
+        # A warm load constructs definitions anew, without parsing YAML.
+        second = tlm.TlmDict(str(main))
+        assert parsed(record) == 1
+        assert second["P"] is not first["P"]
+        assert second["P"].fieldmap["A"].enum == {0: "IDLE"}
+        assert list(second) == ["P", "Q"]
+
+        # Changing an included file invalidates the cache.
+        include.write_text("- !Packet\n  name: R\n")
+        assert list(tlm.TlmDict(str(main))) == ["P", "R"]
+        assert parsed(record) == 2
+
+        # Changing the file replaces its cache file.
+        main.write_text(main.read_text().replace("IDLE", "STOP"))
+        assert tlm.TlmDict(str(main))["P"].fieldmap["A"].enum == {0: "STOP"}
+        assert parsed(record) == 3
+        assert len(os.listdir(cachedir)) == 1
+
+        # Invalid cache files are ignored (and replaced).
+        cachefile = cachedir / os.listdir(cachedir)[0]
+        cachefile.write_bytes(b"\xc1")
+        with mock.patch("ait.core.log.warn") as warn:
+            assert list(tlm.TlmDict(str(main))) == ["P", "R"]
+            assert warn.called
+        assert parsed(record) == 4
+        assert list(tlm.TlmDict(str(main))) == ["P", "R"]
+        assert parsed(record) == 4
+
+    with mock.patch.object(util, "getYAMLCacheDirectory", return_value=None):
+        assert [defn.name for defn in util.load_yaml(str(include))] == ["R"]
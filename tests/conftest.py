@@ -0,0 +1,14 @@
+import os
+import shutil
+import tempfile
+
+
+def pytest_configure(config):
+    """Caches parsed dictionary YAML in a temporary directory rather than
+    the user's cache directory."""
+    config.ait_cache_home = tempfile.mkdtemp(prefix="ait-test-cache-")
+    os.environ["XDG_CACHE_HOME"] = config.ait_cache_home
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(getattr(config, "ait_cache_home", ""), ignore_errors=True)